@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-message parse cost of text vs binary UDP messages.
+
+    python -m benchmarks.bench_udp_protocol
+"""
+import timeit
+
+from src import udp_protocol
+from src.async_logger import logger
+from src.input_handler import InputHandler
+
+
+class ParseOnlyInputHandler(InputHandler):
+    """Input handler that stops after parsing, so the control law is not measured"""
+    def _track_object(self, target_id, x_center, y_center, frame, size=0, confidence=0.0):
+        pass
+
+
+MESSAGES = {
+    "coords": (b"SELECTED_COORDS:ID:0:X:273:Y:306:FRAME:388",
+               udp_protocol.pack_coords(0, 273, 306, 388)),
+    "mode": (b"MODE_CHANGED:AUTO", udp_protocol.pack_mode("AUTO")),
+    "button": (b"BUTTON_PRESSED:UP", udp_protocol.pack_button("up")),
+}
+
+
+def bench(handler, data, number):
+    # Best of five runs, in nanoseconds per message
+    runs = timeit.repeat(lambda: handler.on_udp_message(data), number=number, repeat=5)
+    return min(runs) / number * 1e9
+
+
+def main(number=20000):
+    # The mode and button handlers log at INFO; keep that cost out of the timings
+    logger.set_level('WARNING')
+    handler = ParseOnlyInputHandler()
+    print(f"{'message':<10}{'text ns':>12}{'binary ns':>12}{'speedup':>10}")
+    results = {}
+    for name, (text, binary) in MESSAGES.items():
+        handler.mode = "AUTO"
+        results[name] = (bench(handler, text, number), bench(handler, binary, number))
+    for name, (text_ns, binary_ns) in results.items():
+        print(f"{name:<10}{text_ns:>12.0f}{binary_ns:>12.0f}{text_ns / binary_ns:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Evaluate AUTO-mode tracking with and without the target predictor.
+
+A synthetic target moves sinusoidally in pan angle. Each vision frame is
+rendered from the simulated camera pointing (motor 1 on the bus simulator)
+and delivered to InputHandler after a fixed pipeline latency. The RMS and
+peak pixel error between the target and the image center are reported.
+
+    python -m benchmarks.eval_target_predictor --latency 0.1 --duration 8
+"""
+import argparse
+import bisect
+import math
+import time
+
+from config.config import DXL_ID_1, DXL_ID_2, dxl_limit_points_1, dxl_limit_points_2
+from src import udp_protocol
+from src.async_logger import logger
+from src.bus_simulator import BusSimulator
+from src.dynamixel_controller import DynamixelController
+from src.input_handler import InputHandler
+from src.loop_scheduler import LoopScheduler
+from src.target_predictor import TargetPredictor
+
+UNITS_TO_DEG = 360.0 / 4096
+
+
+def run_trial(use_predictor, duration, latency_s, amplitude_deg, frequency_hz, frame_rate, loop_hz):
+    middle_1 = sum(dxl_limit_points_1) / 2
+    middle_2 = sum(dxl_limit_points_2) / 2
+    with BusSimulator((DXL_ID_1, DXL_ID_2), initial_positions=(middle_1, middle_2)) as sim:
+        controller = DynamixelController(sim.port_name)
+        controller.initialize()
+        input_handler = InputHandler()
+        input_handler.mode = "AUTO"
+        input_handler.predictor = TargetPredictor(latency_s=latency_s, frame_rate=frame_rate) if use_predictor else None
+        deg_per_px = input_handler.camera_hfov_deg / input_handler.camera_width
+        center_x = input_handler.camera_width // 2
+        center_y = input_handler.camera_height // 2
+
+        def target_angle(t):
+            return middle_1 * UNITS_TO_DEG + amplitude_deg * math.sin(2 * math.pi * frequency_hz * t)
+
+        times, angles = [], []
+        errors = []
+        frame = 0
+        scheduler = LoopScheduler(loop_hz)
+        start = time.monotonic()
+        scheduler.start()
+        while True:
+            t = time.monotonic() - start
+            if t >= duration:
+                break
+            controller.read_present_positions()
+            camera = controller.present_position[0] * UNITS_TO_DEG
+            times.append(t)
+            angles.append(camera)
+            errors.append((camera - target_angle(t)) / deg_per_px)
+
+            # Deliver every frame whose capture time + latency has passed
+            while (frame / frame_rate) + latency_s <= t:
+                capture = frame / frame_rate
+                index = max(bisect.bisect_right(times, capture) - 1, 0)
+                x = center_x + (angles[index] - target_angle(capture)) / deg_per_px
+                x = int(min(max(x, 0), input_handler.camera_width))
+                input_handler.on_udp_message(udp_protocol.pack_coords(0, x, center_y, frame))
+                frame += 1
+
+            controller.update_motor_speeds(input_handler)
+            scheduler.wait_next_tick()
+        controller.cleanup()
+
+    # Skip the first second while the filter and motion settle
+    settled = [e for t, e in zip(times, errors) if t >= 1.0]
+    rms = math.sqrt(sum(e * e for e in settled) / len(settled))
+    return rms, max(abs(e) for e in settled)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=8.0)
+    parser.add_argument('--latency', type=float, default=0.1, help="Pipeline latency in seconds")
+    parser.add_argument('--amplitude', type=float, default=15.0, help="Target pan amplitude in degrees")
+    parser.add_argument('--frequency', type=float, default=0.2, help="Target oscillation frequency in Hz")
+    parser.add_argument('--frame-rate', type=float, default=30.0)
+    parser.add_argument('--loop-hz', type=float, default=100.0)
+    args = parser.parse_args()
+
+    # Connection and tracking messages of the trials would bury the results
+    logger.set_level('WARNING')
+    results = {}
+    for use_predictor in (False, True):
+        results[use_predictor] = run_trial(use_predictor, args.duration, args.latency, args.amplitude,
+                                           args.frequency, args.frame_rate, args.loop_hz)
+    for use_predictor, (rms, peak) in results.items():
+        label = "predictor" if use_predictor else "baseline"
+        print(f"{label:<10} RMS error {rms:7.1f} px   peak {peak:7.1f} px")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Control-loop jitter with the real-time mode off versus on.
+
+Runs the control tick against the in-process bus simulator at the control
+rate, with a feeder thread delivering target coordinates at the camera frame
+rate, first with the default scheduler and GC and then with RealtimeMode
+(core pinning, SCHED_FIFO where permitted, mlockall, frozen/scheduled GC).
+Reports LoopScheduler wake-up jitter and overruns for both runs. Run it on
+the target (Kria) as the user that runs the tracker, so the permissions
+match.
+
+    python -m benchmarks.realtime_jitter --seconds 10
+"""
+import argparse
+import threading
+import time
+
+from config.config import (
+    CONTROL_LOOP_RATE_HZ, VISION_FRAME_RATE, DXL_ID_1, DXL_ID_2, dxl_limit_points_1, dxl_limit_points_2,
+)
+from src import udp_protocol
+from src.async_logger import logger
+from src.bus_simulator import BusSimulator, FakePortHandler
+from src.dynamixel_controller import DynamixelController
+from src.input_handler import InputHandler
+from src.loop_scheduler import LoopScheduler
+from src.realtime import RealtimeMode
+
+TARGETS = ((400, 300), (120, 80), (680, 520), (400, 300), (680, 80), (120, 520))
+
+
+def run_loop(seconds, rate_hz, realtime=None):
+    middle = (sum(dxl_limit_points_1) / 2, sum(dxl_limit_points_2) / 2)
+    simulator = BusSimulator((DXL_ID_1, DXL_ID_2), use_pty=False, initial_positions=middle)
+    controller = DynamixelController(port_handler=FakePortHandler(simulator))
+    if not controller.initialize():
+        raise RuntimeError("Could not initialize the controller on the fake port")
+    input_handler = InputHandler()
+    input_handler.mode = "AUTO"
+    scheduler = LoopScheduler(rate_hz)
+    stop = threading.Event()
+
+    def feed():
+        frame = 0
+        while not stop.wait(1.0 / VISION_FRAME_RATE):
+            x, y = TARGETS[frame % len(TARGETS)]
+            input_handler.on_udp_message(udp_protocol.pack_coords(0, x, y, frame))
+            frame += 1
+
+    feeder = threading.Thread(target=feed, name="feeder", daemon=True)
+    feeder.start()
+    if realtime is not None:
+        realtime.pin_control([port.worker.thread for port in controller.ports])
+        realtime.pin_network(feeder)
+        realtime.start()
+
+    def tick():
+        controller.check_bounds_and_stop(input_handler)
+        input_handler.update_auto_control(1.0 / rate_hz)
+        controller.update_motor_speeds(input_handler)
+        if realtime is not None:
+            realtime.collect_if_due()
+
+    deadline = time.monotonic() + seconds
+    try:
+        scheduler.run(tick, lambda: time.monotonic() >= deadline)
+    finally:
+        stop.set()
+        feeder.join()
+        if realtime is not None:
+            realtime.stop()
+        controller.cleanup()
+    stats = scheduler.get_stats()
+    if realtime is not None:
+        stats.update(realtime.stats())
+    return stats
+
+
+def format_report(off, on):
+    rows = [
+        ("achieved rate (Hz)", 'achieved_hz'),
+        ("overruns", 'overruns'),
+        ("missed periods", 'missed_periods'),
+        ("jitter mean (us)", 'jitter_mean_us'),
+        ("jitter std (us)", 'jitter_std_us'),
+        ("jitter max (us)", 'jitter_max_us'),
+    ]
+    lines = [f"{'':<22}{'off':>12}{'on':>12}"]
+    for label, key in rows:
+        lines.append(f"{label:<22}{off[key]:>12.1f}{on[key]:>12.1f}")
+    lines.append(f"GC: {on['gc_collections']} scheduled collections, "
+                 f"longest {on['gc_collect_max_us']:.0f} us; memory locked: {on['memory_locked']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10.0, help="Duration of each run")
+    parser.add_argument('--rate', type=float, default=CONTROL_LOOP_RATE_HZ, help="Control loop rate (Hz)")
+    args = parser.parse_args()
+
+    logger.set_level('WARNING')
+    off = run_loop(args.seconds, args.rate)
+    on = run_loop(args.seconds, args.rate, RealtimeMode())
+    print(format_report(off, on))
+
+if __name__ == "__main__":
+    main()
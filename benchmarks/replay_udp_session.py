@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Replay a captured UDP session through InputHandler.on_udp_message.
+
+Datagrams recorded with UDP_CAPTURE_FILE are fed back in real time, sped
+up, or as fast as possible (--speed 0), while the control tick runs against
+the bus simulator or an in-memory stub controller. Reports messages/s,
+receive-to-bus-write latency from the latency tracer, and the pixel
+tracking error of the replayed targets, i.e. the offset from the image
+center that the control law was asked to correct.
+
+    python -m benchmarks.replay_udp_session /tmp/session.udpcap --speed 0 --backend stub
+"""
+import argparse
+import math
+import time
+
+from config.config import AXES, CONTROL_LOOP_RATE_HZ
+from src.async_logger import logger
+from src.bus_simulator import BusSimulator
+from src.dynamixel_controller import DynamixelController, POSITION_UNITS_PER_VELOCITY_UNIT
+from src.input_handler import InputHandler
+from src.latency_tracer import tracer
+from src.udp_capture import read_capture
+
+
+class ReplayInputHandler(InputHandler):
+    """Input handler that records the pixel offset of every target it acts on"""
+    def __init__(self):
+        super().__init__()
+        self.errors = []
+
+    def _center_object(self, x_center, y_center, velocity_x=0.0, velocity_y=0.0):
+        self.errors.append(math.hypot(x_center - self.camera_width / 2, y_center - self.camera_height / 2))
+        super()._center_object(x_center, y_center, velocity_x, velocity_y)
+
+
+class StubController:
+    """Stand-in for DynamixelController without a bus: integrates commanded velocities in memory"""
+    def __init__(self, axes=AXES):
+        self.axes = axes
+        self.positions = [sum(axis['limits']) / 2 for axis in axes]
+        self.velocities = [0] * len(axes)
+        self.last_time = None
+        self.setpoint_version = 0
+        self.writes = 0
+
+    def check_bounds_and_stop(self, input_handler):
+        now = time.monotonic()
+        if self.last_time is not None:
+            dt = now - self.last_time
+            for i, velocity in enumerate(self.velocities):
+                self.positions[i] += velocity * POSITION_UNITS_PER_VELOCITY_UNIT * dt
+        self.last_time = now
+
+    def update_motor_speeds(self, input_handler):
+        version, _, horizontal_speed, vertical_speed, _, _ = input_handler.setpoints.read()
+        if version == self.setpoint_version:
+            return
+        self.setpoint_version = version
+        frame = tracer.take_published()
+        tracer.bus_start(frame)
+        for i, axis in enumerate(self.axes):
+            if axis.get('role') == 'horizontal':
+                self.velocities[i] = horizontal_speed
+            elif axis.get('role') == 'vertical':
+                self.velocities[i] = vertical_speed
+        self.writes += 1
+        tracer.bus_done(frame)
+
+    def cleanup(self):
+        pass
+
+
+def replay(records, controller, speed=1.0, mode="AUTO", loop_hz=CONTROL_LOOP_RATE_HZ):
+    """Feed (received_ns, data) records to a fresh input handler; returns a result dict.
+
+    speed scales the recorded inter-arrival times (2.0 = twice as fast); with
+    speed=0 messages are sent back to back with one control tick after each.
+    """
+    input_handler = ReplayInputHandler()
+    input_handler.mode = mode
+    tracer.reset()
+
+    def control_tick():
+        controller.check_bounds_and_stop(input_handler)
+        input_handler.update_auto_control(tick_period)
+        controller.update_motor_speeds(input_handler)
+
+    tick_period = 1.0 / loop_hz
+    first_ns = records[0][0] if records else 0
+    start = time.monotonic()
+    next_tick = start
+    messages = 0
+    for received_ns, data in records:
+        if speed > 0:
+            due = start + (received_ns - first_ns) / 1e9 / speed
+            # Keep the control loop running at its own rate between messages
+            while next_tick <= due:
+                time.sleep(max(next_tick - time.monotonic(), 0))
+                control_tick()
+                next_tick = max(next_tick + tick_period, time.monotonic())
+            time.sleep(max(due - time.monotonic(), 0))
+        tracer.receive(time.monotonic_ns())
+        input_handler.on_udp_message(data)
+        messages += 1
+        if speed <= 0:
+            control_tick()
+        if input_handler.escaped:
+            break
+    elapsed = time.monotonic() - start
+
+    errors = sorted(input_handler.errors)
+    latency = tracer.report()["receive->bus_done"]
+    return {
+        "messages": messages,
+        "elapsed_s": elapsed,
+        "messages_per_s": messages / elapsed if elapsed > 0 else 0.0,
+        "traced_frames": latency["count"],
+        "latency_p50_us": latency["p50_us"],
+        "latency_p99_us": latency["p99_us"],
+        "latency_max_us": latency["max_us"],
+        "targets": len(errors),
+        "error_rms_px": math.sqrt(sum(e * e for e in errors) / len(errors)) if errors else 0.0,
+        "error_p95_px": errors[int(0.95 * (len(errors) - 1))] if errors else 0.0,
+    }
+
+
+def format_result(result):
+    return "\n".join([
+        f"Replayed {result['messages']} messages in {result['elapsed_s']:.3f} s "
+        f"({result['messages_per_s']:.0f} msg/s)",
+        f"  command latency (receive->bus_done, {result['traced_frames']} frames): "
+        f"p50={result['latency_p50_us']:.1f}us p99={result['latency_p99_us']:.1f}us "
+        f"max={result['latency_max_us']:.1f}us",
+        f"  tracking error ({result['targets']} targets): RMS {result['error_rms_px']:.1f} px, "
+        f"p95 {result['error_p95_px']:.1f} px",
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('capture', help="File recorded with UDP_CAPTURE_FILE")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Replay speed factor; 0 replays as fast as possible")
+    parser.add_argument('--backend', choices=('stub', 'simulator'), default='stub')
+    parser.add_argument('--mode', default="AUTO", help="Mode before the first message")
+    parser.add_argument('--loop-hz', type=float, default=CONTROL_LOOP_RATE_HZ)
+    args = parser.parse_args()
+
+    records = list(read_capture(args.capture))
+    if not records:
+        print(f"No datagrams in {args.capture}")
+        return
+    logger.set_level('WARNING')
+
+    if args.backend == 'stub':
+        result = replay(records, StubController(), args.speed, args.mode, args.loop_hz)
+    else:
+        axes = [axis for axis in AXES if axis['port'] == AXES[0]['port']]
+        with BusSimulator([axis['id'] for axis in axes],
+                          initial_positions=[sum(axis['limits']) / 2 for axis in axes]) as sim:
+            controller = DynamixelController(sim.port_name, axes)
+            if not controller.initialize():
+                return
+            try:
+                result = replay(records, controller, args.speed, args.mode, args.loop_hz)
+            finally:
+                controller.cleanup()
+    print(format_result(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Benchmark suite for the control path, with baselines and regression checks.
+
+Measures InputHandler.on_udp_message per message type, the AUTO control law,
+bus round trips and the full control-loop rate. Bus benchmarks run against
+the in-process simulator (FakePortHandler), so they measure host-side cost
+without serial wire time. Results are written as JSON and compared against
+the baseline committed in benchmarks/baseline.json (or --baseline); changes
+beyond --threshold are reported as regressions (exit status 1).
+
+    python -m benchmarks.run_benchmarks --quick
+    python -m benchmarks.run_benchmarks --quick --save-baseline
+    python -m benchmarks.run_benchmarks --baseline other.json --threshold 0.15 --output current.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+from config.config import DXL_ID_1, DXL_ID_2, dxl_limit_points_1, dxl_limit_points_2
+from src import udp_protocol
+from src.async_logger import logger
+from src.frame_sequencer import FrameSequencer
+from src.bus_simulator import BusSimulator, FakePortHandler
+from src.dynamixel_controller import DynamixelController
+from src.input_handler import InputHandler
+from src.pid_tuner import MultiAxisPID
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Units where a smaller value is better; everything else (rates) is higher-is-better
+LOWER_IS_BETTER = ('ns', 'us')
+
+UDP_MESSAGES = {
+    'coords_text': b"SELECTED_COORDS:ID:0:X:273:Y:306:FRAME:388",
+    'coords_binary': udp_protocol.pack_coords(0, 273, 306, 388),
+    'mode_text': b"MODE_CHANGED:AUTO",
+    'mode_binary': udp_protocol.pack_mode("AUTO"),
+    'button_text': b"BUTTON_PRESSED:UP",
+    'button_binary': udp_protocol.pack_button("up"),
+    'touch_miss_text': b"TOUCH_MISS:0",
+    'touch_miss_binary': udp_protocol.pack_touch_miss(),
+}
+
+# Target positions cycled through by the control-law benchmarks; symmetric
+# about the image center so the full-loop run does not drift into the limits
+TARGETS = ((400, 300), (120, 80), (680, 520), (400, 300), (680, 80), (120, 520))
+
+
+def best_of(fn, number, repeat=5):
+    """Best-of-repeat time per call of fn, in nanoseconds"""
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e9
+
+
+def bench_udp_messages(number):
+    handler = InputHandler()
+    # The same FRAME over and over would only measure the duplicate drop
+    handler.sequencer = None
+    results = {}
+    for name, data in UDP_MESSAGES.items():
+        handler.mode = "AUTO"
+        results[f'on_udp_message.{name}'] = {
+            'value': best_of(lambda: handler.on_udp_message(data), number), 'unit': 'ns',
+        }
+    return results
+
+
+def bench_frame_sequencer(number):
+    sequencer = FrameSequencer()
+    frames = iter(range(1, 10 ** 9))
+    return {'frame_sequencer.accept': {
+        'value': best_of(lambda: sequencer.accept(0, next(frames)), number), 'unit': 'ns',
+    }}
+
+
+def bench_center_object(number):
+    results = {}
+    for name, pid in (('stepped', False), ('pid', True)):
+        handler = InputHandler()
+        if pid:
+            handler.pid = MultiAxisPID((DXL_ID_1, DXL_ID_2))
+        targets = TARGETS * (number // len(TARGETS) + 1)
+
+        def run():
+            for x, y in targets[:number]:
+                handler._center_object(x, y)
+
+        results[f'center_object.{name}'] = {'value': best_of(run, 1) / number, 'unit': 'ns'}
+    return results
+
+
+def bench_bus(number, loop_iterations):
+    middle = (sum(dxl_limit_points_1) / 2, sum(dxl_limit_points_2) / 2)
+    simulator = BusSimulator((DXL_ID_1, DXL_ID_2), use_pty=False, initial_positions=middle)
+    controller = DynamixelController(port_handler=FakePortHandler(simulator))
+    if not controller.initialize():
+        raise RuntimeError("Could not initialize the controller on the fake port")
+    port = controller.ports[0]
+    results = {}
+    try:
+        results['bus.read_present_position'] = {
+            'value': best_of(lambda: controller.read_present_position(DXL_ID_1), number) / 1000, 'unit': 'us',
+        }
+        results['bus.read_present_positions_sync'] = {
+            'value': best_of(controller.read_present_positions, number) / 1000, 'unit': 'us',
+        }
+        velocities = iter(range(10 ** 9))
+        results['bus.set_goal_velocity'] = {
+            'value': best_of(lambda: port.call(port.set_goal_velocity, DXL_ID_1, next(velocities) % 40),
+                             number) / 1000,
+            'unit': 'us',
+        }
+
+        # Full control tick with a new target every iteration, as in AUTO mode
+        input_handler = InputHandler()
+        input_handler.mode = "AUTO"
+        messages = [udp_protocol.pack_coords(0, x, y, frame)
+                    for frame, (x, y) in enumerate(TARGETS * (loop_iterations // len(TARGETS) + 1))]
+        start = time.perf_counter()
+        for data in messages[:loop_iterations]:
+            input_handler.on_udp_message(data)
+            controller.check_bounds_and_stop(input_handler)
+            input_handler.update_auto_control(0.001)
+            controller.update_motor_speeds(input_handler)
+        port.call(lambda: None)  # wait for queued writes
+        elapsed = time.perf_counter() - start
+        results['loop.iteration_rate'] = {'value': loop_iterations / elapsed, 'unit': 'hz'}
+    finally:
+        controller.cleanup()
+    return results
+
+
+def run_all(quick=False):
+    scale = 10 if quick else 1
+    results = {}
+    results.update(bench_udp_messages(20000 // scale))
+    results.update(bench_frame_sequencer(20000 // scale))
+    results.update(bench_center_object(20000 // scale))
+    results.update(bench_bus(2000 // scale, 5000 // scale))
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'node': platform.node(),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Per-benchmark change against baseline; returns (lines, regressions)"""
+    lines = [f"{'benchmark':<38}{'baseline':>12}{'current':>12}{'change':>9}"]
+    regressions = []
+    for key in ('machine', 'python', 'quick'):
+        if current['meta'].get(key) != baseline['meta'].get(key):
+            lines.insert(0, f"Note: baseline {key} is {baseline['meta'].get(key)}, "
+                            f"this run {current['meta'].get(key)}")
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or not base['value']:
+            lines.append(f"{name:<38}{'-':>12}{result['value']:>12.2f}{'new':>9}")
+            continue
+        change = (result['value'] - base['value']) / base['value']
+        worse = change > threshold if result['unit'] in LOWER_IS_BETTER else change < -threshold
+        flag = "  REGRESSION" if worse else ""
+        lines.append(f"{name:<38}{base['value']:>12.2f}{result['value']:>12.2f}{change:>+9.1%}{flag}")
+        if worse:
+            regressions.append(name)
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="Write the results JSON here (default: stdout)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help=f"Compare against this results file (default {DEFAULT_BASELINE})")
+    parser.add_argument('--no-compare', action='store_true', help="Only print the results JSON")
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, default=None,
+                        help=f"Store the results as the baseline (default {DEFAULT_BASELINE})")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative change counted as a regression (default 0.10)")
+    parser.add_argument('--quick', action='store_true', help="Fewer iterations, for a smoke run")
+    args = parser.parse_args()
+
+    # Keep terminal output out of the measurements
+    logger.set_level('WARNING')
+    current = run_all(args.quick)
+
+    text = json.dumps(current, indent=2, sort_keys=True)
+    compare_to = None if args.no_compare or args.save_baseline else args.baseline
+    if compare_to is not None and not os.path.exists(compare_to):
+        print(f"No baseline at {compare_to}; save one with --save-baseline", file=sys.stderr)
+        compare_to = None
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    elif compare_to is None:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            f.write(text + "\n")
+        print(f"Baseline saved to {args.save_baseline}", file=sys.stderr)
+
+    if compare_to is not None:
+        with open(compare_to) as f:
+            baseline = json.load(f)
+        lines, regressions = compare(current, baseline, args.threshold)
+        print("\n".join(lines))
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("No regressions")
+
+if __name__ == "__main__":
+    main()
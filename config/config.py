@@ -1,16 +1,53 @@
 #!/usr/bin/env python3
+import os
 
+ADDR_BAUD_RATE = 8
+ADDR_RETURN_DELAY_TIME = 9
+ADDR_OPERATING_MODE = 11
+ADDR_MAX_POSITION_LIMIT = 48
+ADDR_MIN_POSITION_LIMIT = 52
 ADDR_TORQUE_ENABLE = 64
+ADDR_STATUS_RETURN_LEVEL = 68
 ADDR_GOAL_POSITION = 116
 ADDR_GOAL_VELOCITY = 104
+ADDR_PROFILE_ACCELERATION = 108
+ADDR_PROFILE_VELOCITY = 112
+ADDR_MOVING = 122
+ADDR_MOVING_STATUS = 123
+ADDR_PRESENT_VELOCITY = 128
 ADDR_PRESENT_POSITION = 132
 
+LEN_GOAL_VELOCITY = 4
+LEN_GOAL_POSITION = 4
+LEN_PRESENT_VELOCITY = 4
+LEN_PRESENT_POSITION = 4
+LEN_MOVING = 2  # Moving + Moving Status
+
+OPERATING_MODE_VELOCITY = 1
+OPERATING_MODE_POSITION = 3  # single turn, 0..4095, bounded by the Min/Max Position Limit registers
+OPERATING_MODE_EXTENDED_POSITION = 4
+MOVING_STATUS_IN_POSITION = 0x01
+
 DXL_MINIMUM_POSITION_VALUE = 0
 DXL_MAXIMUM_POSITION_VALUE = 2147483647
 
 BAUDRATE = 115200
 PROTOCOL_VERSION = 2.0
 
+# Baud Rate register value per bps (XL430); the SDK's PortHandler accepts up to 4 Mbps
+BAUD_RATE_VALUES = {9600: 0, 57600: 1, 115200: 2, 1000000: 3, 2000000: 4, 3000000: 5, 4000000: 6, 4500000: 7}
+
+# Bus calibration (python -m src.bus_calibration): the chosen baud rate per port is
+# stored here and used instead of BAUDRATE on the next start
+BUS_CALIBRATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bus_calibration.json')
+BUS_CALIBRATION_TRANSACTIONS = 200  # per transaction type and baud rate
+BUS_CALIBRATION_MAX_ERROR_RATE = 0.001  # a baud rate with more failed transactions is rejected
+
+# Bus supervision: a port counts as lost after this many consecutive failed
+# position reads (or an adapter error) and is re-opened every interval
+BUS_LOSS_READ_FAILURES = 5
+BUS_RECONNECT_INTERVAL_S = 0.1
+
 DXL_ID_1 = 1
 DXL_ID_2 = 2
 DEVICENAME = '/dev/tty.usbserial-FT89FLDB'
@@ -21,9 +58,110 @@ TORQUE_DISABLE = 0
 dxl_limit_points_1 = [0, 2000]
 dxl_limit_points_2 = [-300, 220]
 
+# Axis table: one entry per motor. 'port' selects the serial adapter (each
+# port gets its own I/O worker), 'role' maps the axis to the horizontal or
+# vertical speed of InputHandler (None for auxiliary axes such as zoom/focus),
+# and commanded speeds are scaled by direction * gain. IDs must be unique per port
+# (heads on separate adapters may reuse the same IDs).
+AXES = [
+    {'name': 'pan', 'id': DXL_ID_1, 'port': DEVICENAME, 'limits': dxl_limit_points_1,
+     'role': 'horizontal', 'direction': 1, 'gain': 1.0},
+    {'name': 'tilt', 'id': DXL_ID_2, 'port': DEVICENAME, 'limits': dxl_limit_points_2,
+     'role': 'vertical', 'direction': 1, 'gain': 1.0},
+]
+
 UDP_IP = "192.168.10.105"
 UDP_PORT = 8081
 
 SPEED_INCREMENT = 30
-POSITION_RETURN_SPEED = 20
-UDP_LISTEN_INTERVAL = 0.00005
\ No newline at end of file
+# Homing/bound recovery runs as an on-motor profiled move to the middle of the limits
+POSITION_RETURN_SPEED = 20  # Profile Velocity units (0.229 rpm)
+POSITION_RETURN_ACCELERATION = 20  # Profile Acceleration units (214.577 rev/min^2)
+POSITION_RETURN_TIMEOUT = 2.0  # seconds allowed beyond the expected travel time
+POSITION_RETURN_POLL_INTERVAL = 0.05  # seconds between Moving/In-Position polls
+HOME_ON_STARTUP = False
+
+UDP_SELECT_TIMEOUT = 0.1
+UDP_RECV_BUFFER_SIZE = 1024
+UDP_BINARY_PROTOCOL = True
+UDP_CAPTURE_FILE = None  # e.g. '/tmp/session.udpcap' to record every datagram for replay
+# Binary status uplink (positions, velocities, mode, bound flags, FRAME) to the vision server
+STATUS_UPLINK_RATE_HZ = 100  # samples per second, 0 disables (and skips Present Velocity reads)
+STATUS_UPLINK_MAX_DATAGRAM_HZ = 25  # above this rate samples are batched into one datagram
+
+CONTROL_LOOP_RATE_HZ = 200
+
+# Setpoint mailbox between input handling and the control loop (src/setpoint_mailbox.py);
+# a name puts it in shared memory so the network side can run in another process
+SETPOINT_SHARED_MEMORY = None
+
+# Opt-in real-time mode (Linux, src/realtime.py): core pinning, SCHED_FIFO,
+# mlockall and scheduled GC. Priorities need CAP_SYS_NICE (or root); without
+# it the mode degrades to pinning and GC control.
+REALTIME_MODE = False
+REALTIME_CONTROL_CORES = {3}  # control loop and bus I/O workers
+REALTIME_NETWORK_CORES = {2}  # UDP listener
+REALTIME_CONTROL_PRIORITY = 80  # SCHED_FIFO 1..99
+REALTIME_NETWORK_PRIORITY = 70
+REALTIME_GC_INTERVAL_S = 1.0  # collections run from the control loop at this interval
+
+# Velocity unit of Goal/Present Velocity (0.229 rpm) in degrees per second
+VELOCITY_UNIT_DEG_S = 0.229 * 6
+
+# Position unit of Goal/Present Position in degrees
+POSITION_UNIT_DEG = 360.0 / 4096
+
+CAMERA_HFOV_DEG = 60.0
+CAMERA_VFOV_DEG = 45.0
+CAMERA_DISTORTION_K1 = 0.0  # radial lens distortion used by the pixel -> position tables
+VISION_FRAME_RATE = 30
+
+# AUTO control law: 'velocity' streams goal velocities from the host loop;
+# 'position' sends absolute goal positions from the camera calibration tables
+# and leaves the trajectory to the motors' profile generator
+TRACKING_MODE = 'velocity'
+POSITION_TRACKING_PROFILE_VELOCITY = 100  # Profile Velocity units (0.229 rpm)
+POSITION_TRACKING_PROFILE_ACCELERATION = 50  # Profile Acceleration units (214.577 rev/min^2)
+POSITION_TRACKING_LATENCY_S = 0.1  # age of a frame: offsets apply to where the axes were then
+POSITION_HEALTH_CHECK_HZ = 5  # Present Position reads per second in position mode
+
+# Drop duplicate, out-of-order and stale (held back in the network) vision messages
+FRAME_SEQUENCING = True
+FRAME_MAX_AGE_S = 0.1  # lateness beyond the best observed frame latency
+
+# Which target ID AUTO mode follows when several are reported (src/target_table.py):
+# 'locked' stays on the current target until it is lost, 'nearest' takes the one
+# closest to the image center, 'largest' the biggest (W/H fields) and 'confident'
+# the highest CONF; OBJECT_SELECTED locks its ID under every policy. None follows
+# every message as it arrives.
+TARGET_SELECTION = 'locked'
+TARGET_MAX_AGE_S = 0.5  # a target not reported for this long is dropped
+TARGET_SWITCH_MARGIN = 0.2  # another target must score this much (relative) better to take over
+
+# Latency-compensating target prediction for AUTO mode
+TARGET_PREDICTION = False
+PREDICTOR_MAX_TARGETS = 16
+PREDICTOR_LATENCY_S = 0.1  # camera + inference + network + bus delay to compensate
+PREDICTOR_PROCESS_NOISE = 5.0e4  # (px/s^2)^2
+PREDICTOR_MEASUREMENT_NOISE = 9.0  # px^2
+PREDICTOR_MAX_FRAME_GAP = 10
+FEEDFORWARD_GAIN = 1.0
+
+# PID control law for AUTO mode (replaces the stepped proportional law)
+PID_CONTROL = False
+PID_PRESET = 'default'
+PID_PRESETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pid_presets.json')
+PID_TARGET_TIMEOUT_S = 0.5  # stop if no frame arrives for this long
+
+LATENCY_TRACING = True
+LATENCY_TRACE_SLOTS = 1024
+
+# Asynchronous logging (src/async_logger.py); DEBUG prints every message and motor write
+LOG_LEVEL = 'INFO'
+LOG_QUEUE_SIZE = 4096  # records; further messages are dropped and counted
+LOG_FLUSH_INTERVAL = 0.05  # seconds between terminal writes
+
+# Per-tick telemetry ring buffer (src/telemetry.py)
+TELEMETRY_ENABLED = True
+TELEMETRY_CAPACITY = 60000  # rows, one minute at 1 kHz
+TELEMETRY_FILE = None  # e.g. '/tmp/tracker_telemetry.npy' to keep the recording after exit
@@ -1,14 +1,29 @@
 #!/usr/bin/env python3
+import signal
 import keyboard
 from src.dynamixel_controller import DynamixelController
 from src.input_handler import InputHandler
 from src.network_handler import NetworkHandler
+from src.loop_scheduler import LoopScheduler
+from src.latency_tracer import tracer
+from src.async_logger import logger
+from src.telemetry import telemetry
+from src.status_uplink import StatusUplink
+from src.realtime import RealtimeMode
+from config.config import (
+    CONTROL_LOOP_RATE_HZ, TELEMETRY_FILE, HOME_ON_STARTUP, STATUS_UPLINK_RATE_HZ, REALTIME_MODE,
+)
 from src.utils import getch
 
 def main():
     input_handler = InputHandler()
     motor_controller = DynamixelController()
     network_handler = NetworkHandler(input_handler)
+    scheduler = LoopScheduler(CONTROL_LOOP_RATE_HZ)
+    uplink = None
+    realtime = RealtimeMode() if REALTIME_MODE else None
+    if TELEMETRY_FILE:
+        telemetry.open(TELEMETRY_FILE)
     
     try:
         if not motor_controller.initialize():
@@ -16,37 +31,73 @@ def main():
         
         keyboard.on_press(input_handler.on_key_press)
         
+        # kill -USR1 <pid> dumps the frame-to-servo latency histograms
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: tracer.print_report())
+        
         # Connect to server as a client
         if network_handler.connect_to_server():
             network_handler.start_udp_listener()
+            if STATUS_UPLINK_RATE_HZ > 0:
+                uplink = StatusUplink(network_handler.send_binary_status, len(motor_controller.axis_ids))
         else:
-            print("Proceeding with keyboard control only")
+            logger.warning("Proceeding with keyboard control only")
         
-        print("Press 'w', 's', 'a', 'd' or arrow keys to control the Dynamixel motors.")
-        print("Press 'q' or 'esc' to quit.")
+        logger.info("Press 'w', 's', 'a', 'd' or arrow keys to control the Dynamixel motors.")
+        logger.info("Press 'q' or 'esc' to quit.")
         
         input_handler.reset_speeds()
         motor_controller.move_to_middle_position(input_handler)
+        if HOME_ON_STARTUP:
+            motor_controller.start_homing()
+        
+        control_period = 1.0 / CONTROL_LOOP_RATE_HZ
         
-        import time
-        while True:
+        if realtime is not None:
+            # Control loop and bus I/O share the control cores; UDP gets its own
+            realtime.pin_control([port.worker.thread for port in motor_controller.ports])
+            realtime.pin_network(network_handler.thread)
+            realtime.start()
+        
+        def control_tick():
             motor_controller.check_bounds_and_stop(input_handler)
+            input_handler.update_auto_control(control_period)
             motor_controller.update_motor_speeds(input_handler)
-            
-            if input_handler.escaped:
-                print("Exiting...")
-                break
-            
-            # No delay - true real-time response
+            if uplink is not None:
+                uplink.tick(motor_controller, input_handler)
+            if realtime is not None:
+                realtime.collect_if_due()
+        
+        # Fixed-rate loop: CPU usage scales with CONTROL_LOOP_RATE_HZ
+        scheduler.run(control_tick, lambda: input_handler.escaped)
+        logger.info("Exiting...")
                 
     except KeyboardInterrupt:
-        print("\nInterrupted by user")
+        logger.info("Interrupted by user")
     except Exception as e:
-        print(f"Error: {e}")
+        logger.error("Error: %s", e)
     finally:
-        print("Cleaning up...")
+        logger.info("Cleaning up...")
+        # The reports below are printed directly; write the queued messages first
+        logger.flush()
+        if scheduler.ticks:
+            scheduler.print_stats()
+        if tracer.completed:
+            tracer.print_report()
+        if input_handler.sequencer is not None and input_handler.sequencer.accepted:
+            logger.info("Vision frames: %s", input_handler.sequencer.stats())
+        if input_handler.targets is not None and input_handler.targets.reports:
+            logger.info("Targets: %s", input_handler.targets.stats())
+        if uplink is not None:
+            logger.info("Status uplink: %s", uplink.stats())
+        if realtime is not None:
+            logger.info("Real-time mode: %s", realtime.stats())
+            realtime.stop()
         motor_controller.cleanup()
         network_handler.stop()
+        input_handler.setpoints.close()
+        telemetry.close()
+        logger.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Asynchronous, rate-limited logging for the control and network threads.
+
+Callers only append (level, message, args) to a bounded deque; a background
+thread formats the records and writes them to the terminal in batches, so a
+slow serial console or SSH session never stalls the control loop. When the
+queue is full new records are dropped and counted. Hot-path debug messages
+should be guarded with ``if logger.debug_enabled:``.
+"""
+import atexit
+import sys
+import threading
+import time
+from collections import deque
+
+from config.config import LOG_LEVEL, LOG_QUEUE_SIZE, LOG_FLUSH_INTERVAL
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVELS = {'DEBUG': DEBUG, 'INFO': INFO, 'WARNING': WARNING, 'ERROR': ERROR}
+LEVEL_NAMES = {level: name for name, level in LEVELS.items()}
+
+
+class AsyncLogger:
+    def __init__(self, level=LOG_LEVEL, capacity=LOG_QUEUE_SIZE,
+                 flush_interval=LOG_FLUSH_INTERVAL, stream=None):
+        self.records = deque()
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.stream = stream  # None: sys.stdout at write time
+        self.write_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.running = False
+        self.thread = None
+        self.exit_hook = False
+        # Call site (code, line) -> [calls, next allowed time, skipped since last record]
+        self.sites = {}
+        self.sites_lock = threading.Lock()
+        self.dropped = 0
+        self.suppressed = 0
+        self.set_level(level)
+
+    def set_level(self, level):
+        if isinstance(level, str):
+            level = LEVELS[level.upper()]
+        self.level = level
+        # Plain attributes so hot paths pay one lookup when disabled
+        self.debug_enabled = level <= DEBUG
+        self.info_enabled = level <= INFO
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="async-logger", daemon=True)
+        self.thread.start()
+        if not self.exit_hook:
+            # Once, however often the thread is restarted
+            atexit.register(self.stop)
+            self.exit_hook = True
+
+    def stop(self):
+        """Write everything still queued and stop the drain thread"""
+        self.running = False
+        if self.thread is not None:
+            self.wakeup.set()
+            if self.thread is not threading.current_thread():
+                self.thread.join()
+            self.thread = None
+        self.flush()
+        if self.dropped:
+            self._write(f"Logger dropped {self.dropped} messages (queue full)\n")
+            self.dropped = 0
+
+    def debug(self, msg, *args, interval=None, sample=None):
+        if self.level <= DEBUG:
+            self._log(DEBUG, msg, args, interval, sample)
+
+    def info(self, msg, *args, interval=None, sample=None):
+        if self.level <= INFO:
+            self._log(INFO, msg, args, interval, sample)
+
+    def warning(self, msg, *args, interval=None, sample=None):
+        if self.level <= WARNING:
+            self._log(WARNING, msg, args, interval, sample)
+
+    def error(self, msg, *args, interval=None, sample=None):
+        if self.level <= ERROR:
+            self._log(ERROR, msg, args, interval, sample)
+
+    def _log(self, level, msg, args, interval, sample):
+        """Queue a record; interval=seconds and sample=N limit each call site"""
+        skipped = 0
+        if interval or sample:
+            caller = sys._getframe(2)
+            key = (caller.f_code, caller.f_lineno)
+            # Call sites are shared by the control, network and bus threads
+            with self.sites_lock:
+                site = self.sites.get(key)
+                if site is None:
+                    site = self.sites[key] = [0, 0.0, 0]
+                site[0] += 1
+                if sample and (site[0] - 1) % sample:
+                    site[2] += 1
+                    self.suppressed += 1
+                    return
+                if interval:
+                    now = time.monotonic()
+                    if now < site[1]:
+                        site[2] += 1
+                        self.suppressed += 1
+                        return
+                    site[1] = now + interval
+                skipped = site[2]
+                site[2] = 0
+
+        if len(self.records) >= self.capacity:
+            self.dropped += 1
+            return
+        self.records.append((time.time(), level, msg, args, skipped))
+        if self.thread is None:
+            self.start()
+        elif level >= WARNING:
+            self.wakeup.set()
+
+    def _run(self):
+        while self.running:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def _format(self, record):
+        timestamp, level, msg, args, skipped = record
+        if args:
+            try:
+                msg = msg % args
+            except (TypeError, ValueError) as e:
+                msg = f"{msg} {args} (format error: {e})"
+        if skipped:
+            msg = f"{msg} [{skipped} similar suppressed]"
+        clock = time.strftime('%H:%M:%S', time.localtime(timestamp))
+        return f"{clock}.{int(timestamp * 1000) % 1000:03d} {LEVEL_NAMES[level]:<7} {msg}\n"
+
+    def flush(self):
+        lines = []
+        records = self.records
+        with self.write_lock:
+            while records:
+                lines.append(self._format(records.popleft()))
+            if lines:
+                self._write_locked("".join(lines))
+
+    def _write(self, text):
+        with self.write_lock:
+            self._write_locked(text)
+
+    def _write_locked(self, text):
+        stream = self.stream or sys.stdout
+        try:
+            stream.write(text)
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+
+    def stats(self):
+        return {
+            "queued": len(self.records),
+            "dropped": self.dropped,
+            "suppressed": self.suppressed,
+        }
+
+
+# Shared by DynamixelController, BusPort, InputHandler and NetworkHandler
+logger = AsyncLogger()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""Bus throughput calibration: baud rate, Return Delay Time and Status Return Level.
+
+Finds the motors of each port at whichever supported baud rate they answer
+and measures the round-trip time of every transaction type the tracker uses.
+It then sets Return Delay Time to 0 and Status Return Level to 1 (reads are
+answered, writes are not) and steps the motors and the PortHandler up through
+the faster baud rates. The fastest rate whose error rate stays within
+BUS_CALIBRATION_MAX_ERROR_RATE is kept and stored in BUS_CALIBRATION_FILE,
+which DynamixelController reads on the next start. Run it with the tracker
+stopped; torque is left disabled.
+
+    python -m src.bus_calibration
+    python -m src.bus_calibration --measure-only
+    python -m src.bus_calibration --simulate
+"""
+import argparse
+import json
+import os
+import time
+
+from dynamixel_sdk import COMM_SUCCESS
+from config.config import (
+    AXES, BAUDRATE, BAUD_RATE_VALUES, BUS_CALIBRATION_FILE, BUS_CALIBRATION_TRANSACTIONS,
+    BUS_CALIBRATION_MAX_ERROR_RATE, STATUS_UPLINK_RATE_HZ, ADDR_BAUD_RATE, ADDR_RETURN_DELAY_TIME,
+    ADDR_STATUS_RETURN_LEVEL, ADDR_TORQUE_ENABLE, ADDR_GOAL_VELOCITY, ADDR_PRESENT_POSITION,
+    LEN_PRESENT_POSITION, TORQUE_DISABLE,
+)
+from .async_logger import logger
+from .bus_port import BusPort
+
+# After a Baud Rate write the motor still answers at the old rate, then switches
+BAUD_SWITCH_SETTLE_S = 0.02
+
+# Instruction packet of a 4-byte register write
+WRITE_PACKET_LENGTH = 16
+
+TRANSACTION_TYPES = ('ping', 'read', 'write', 'sync_read', 'tick')
+
+
+def load_bus_calibration(path=BUS_CALIBRATION_FILE):
+    """{device name: calibration} stored by a previous run, {} if there is none"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Failed to load bus calibration from %s: %s", path, e)
+        return {}
+
+
+def save_bus_calibration(calibrations, path=BUS_CALIBRATION_FILE):
+    stored = load_bus_calibration(path)
+    stored.update(calibrations)
+    with open(path, 'w') as f:
+        json.dump(stored, f, indent=2, sort_keys=True)
+
+
+class BusCalibrator:
+    """Calibrates the motors of one BusPort, talking to the port directly"""
+    def __init__(self, port, transactions=BUS_CALIBRATION_TRANSACTIONS,
+                 max_error_rate=BUS_CALIBRATION_MAX_ERROR_RATE):
+        self.port = port
+        self.transactions = transactions
+        self.max_error_rate = max_error_rate
+        # Rates both the motors and the host PortHandler support
+        self.baudrates = sorted(bps for bps in BAUD_RATE_VALUES if port.portHandler.getCFlagBaud(bps) > 0)
+
+    def _set_host_baudrate(self, baudrate):
+        return self.port.set_baudrate(baudrate)
+
+    def scan(self):
+        """{baudrate: [dxl_id, ...]} of the port's motors answering at each supported rate"""
+        port = self.port
+        order = sorted(self.baudrates, key=lambda bps: bps != port.baudrate)
+        found = {}
+        remaining = set(port.dxl_ids)
+        for baudrate in order:
+            if not self._set_host_baudrate(baudrate):
+                continue
+            ids = sorted(remaining.intersection(port.ping_motors()))
+            if ids:
+                found[baudrate] = ids
+                remaining.difference_update(ids)
+                if not remaining:
+                    break
+        return found
+
+    def move_motors(self, baudrate, found):
+        """Switch the motors of found (see scan) and the port to baudrate; True if all answer there"""
+        port = self.port
+        for current, ids in found.items():
+            if current == baudrate:
+                continue
+            self._set_host_baudrate(current)
+            for dxl_id in ids:
+                # Not acknowledged at the new rate, so never wait for the status packet
+                port.packetHandler.write1ByteTxOnly(port.portHandler, dxl_id, ADDR_BAUD_RATE,
+                                                    BAUD_RATE_VALUES[baudrate])
+            time.sleep(BAUD_SWITCH_SETTLE_S)
+        if not self._set_host_baudrate(baudrate):
+            return False
+        return set(port.dxl_ids).issubset(port.ping_motors())
+
+    def set_baudrate(self, baudrate):
+        return self.move_motors(baudrate, {self.port.baudrate: self.port.dxl_ids})
+
+    def minimize_latency(self, status_return_level=1):
+        """Return Delay Time 0 and the given Status Return Level on every motor (EEPROM, torque off)"""
+        port = self.port
+        for dxl_id in port.dxl_ids:
+            port.write_register(dxl_id, ADDR_TORQUE_ENABLE, 1, TORQUE_DISABLE)
+            port.write_register(dxl_id, ADDR_RETURN_DELAY_TIME, 1, 0)
+            # The status packet of this write may already follow the new level
+            port.packetHandler.write1ByteTxOnly(port.portHandler, dxl_id, ADDR_STATUS_RETURN_LEVEL,
+                                                status_return_level)
+        # Reading the configuration back also switches write_register() to the new level
+        config = port.read_configuration()
+        if config is None or any(c['status_return_level'] != status_return_level for c in config.values()):
+            return False
+        for dxl_id in port.dxl_ids:
+            delay, result, error = port.packetHandler.read1ByteTxRx(port.portHandler, dxl_id,
+                                                                     ADDR_RETURN_DELAY_TIME)
+            if result != COMM_SUCCESS or error or delay != 0:
+                return False
+        return True
+
+    def measure(self):
+        """Round-trip time of each transaction type at the current settings.
+
+        'tick' is one control tick's traffic (sync write of goal velocities,
+        sync read of the present positions), which bounds the loop rate. A
+        write without status packet returns once its bytes are queued, so it
+        also waits for their wire time; otherwise back-to-back writes would
+        pile up in the adapter and delay the next measurement. Measuring
+        stops early once the error budget is spent.
+        """
+        port = self.port
+        handler, packet = port.portHandler, port.packetHandler
+        dxl_id = port.dxl_ids[0]
+        port.groupSyncWrite.clearParam()
+        for target in port.dxl_ids:
+            port.groupSyncWrite.addParam(target, [0, 0, 0, 0])
+
+        def ping():
+            return packet.ping(handler, dxl_id)[1] == COMM_SUCCESS
+
+        def read():
+            _, result, error = packet.read4ByteTxRx(handler, dxl_id, ADDR_PRESENT_POSITION)
+            return result == COMM_SUCCESS and not error
+
+        def write():
+            result, error = port.write_register(dxl_id, ADDR_GOAL_VELOCITY, 4, 0)
+            if port.status_return_level < 2:
+                time.sleep(WRITE_PACKET_LENGTH * handler.tx_time_per_byte / 1000)
+            return result == COMM_SUCCESS and not error
+
+        def sync_read():
+            group = port.groupSyncRead
+            return group.txRxPacket() == COMM_SUCCESS and all(
+                group.isAvailable(target, ADDR_PRESENT_POSITION, LEN_PRESENT_POSITION) for target in port.dxl_ids)
+
+        def tick():
+            return port.groupSyncWrite.txPacket() == COMM_SUCCESS and sync_read()
+
+        transactions = dict(zip(TRANSACTION_TYPES, (ping, read, write, sync_read, tick)))
+        error_budget = self.max_error_rate * self.transactions * len(transactions)
+        rtt_us = {}
+        errors = 0
+        performed = 0
+        for name, transaction in transactions.items():
+            times = []
+            for _ in range(self.transactions):
+                start = time.perf_counter_ns()
+                ok = transaction()
+                times.append(time.perf_counter_ns() - start)
+                performed += 1
+                if not ok:
+                    errors += 1
+                    if errors > error_budget:
+                        break
+            times.sort()
+            rtt_us[name] = {'mean': sum(times) / len(times) / 1000,
+                            'p99': times[int(0.99 * (len(times) - 1))] / 1000}
+            if errors > error_budget:
+                break
+        error_rate = errors / performed
+        tick_us = rtt_us['tick']['mean'] if 'tick' in rtt_us else None
+        return {
+            'baudrate': port.baudrate,
+            'rtt_us': rtt_us,
+            'error_rate': error_rate,
+            'passed': errors <= error_budget,
+            'loop_hz': 1e6 / tick_us if tick_us else 0.0,
+        }
+
+    def calibrate(self, status_return_level=1, measure_only=False):
+        """Returns (before, after) measurements; after is None if nothing was changed"""
+        port = self.port
+        found = self.scan()
+        missing = set(port.dxl_ids).difference(*found.values())
+        if missing:
+            logger.error("No answer from motor(s) %s on %s at any baud rate", sorted(missing), port.device_name)
+            return None, None
+        if len(found) > 1:
+            # Motors left at different rates (e.g. an interrupted run): gather them at the slowest
+            if measure_only or not self.move_motors(min(found), found):
+                logger.error("Motors on %s answer at different baud rates: %s", port.device_name, found)
+                return None, None
+        # Learn the current Status Return Level, so writes wait for status packets only if they come
+        if port.read_configuration() is None:
+            logger.error("Could not read the configuration of the motors on %s", port.device_name)
+            return None, None
+        before = self.measure()
+        if measure_only:
+            return before, None
+
+        if not self.minimize_latency(status_return_level):
+            logger.error("Could not set Return Delay Time/Status Return Level on %s", port.device_name)
+            return before, None
+        best = self.measure()
+        if not best['passed']:
+            logger.error("Error rate %.2f%% on %s even at %d bps", best['error_rate'] * 100, port.device_name,
+                         best['baudrate'])
+            return before, None
+        for baudrate in self.baudrates:
+            if baudrate <= best['baudrate']:
+                continue
+            if not self.set_baudrate(baudrate):
+                logger.warning("Motors on %s do not answer at %d bps", port.device_name, baudrate)
+                break
+            result = self.measure()
+            if not result['passed']:
+                logger.warning("%d bps on %s rejected: error rate %.2f%%", baudrate, port.device_name,
+                               result['error_rate'] * 100)
+                break
+            best = result
+
+        if port.baudrate != best['baudrate'] and not self.set_baudrate(best['baudrate']):
+            # The motors did not follow the last switch: find them and bring them back
+            if not self.move_motors(best['baudrate'], self.scan()):
+                logger.error("Could not return the motors on %s to %d bps", port.device_name, best['baudrate'])
+                return before, None
+        return before, best
+
+
+def format_report(device_name, before, after):
+    lines = [f"{device_name}: {before['baudrate']} bps -> {after['baudrate']} bps" if after
+             else f"{device_name}: {before['baudrate']} bps"]
+    lines.append(f"{'':<12}{'before':>20}{'after':>20}" if after else f"{'':<12}{'now':>20}")
+    for name in TRANSACTION_TYPES:
+        row = f"{name:<12}"
+        for result in (before, after) if after else (before,):
+            rtt = result['rtt_us'].get(name)
+            row += f"{rtt['mean']:>11.0f} us (p99 {rtt['p99']:.0f})" if rtt else f"{'-':>20}"
+        lines.append(row)
+    lines.append(f"{'errors':<12}" + "".join(f"{r['error_rate'] * 100:>19.2f}%" for r in (before, after) if r))
+    lines.append(f"{'loop rate':<12}" + "".join(f"{r['loop_hz']:>17.0f} Hz" for r in (before, after) if r))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate Dynamixel bus baud rate and response latency")
+    parser.add_argument('--port', action='append', help="Serial port to calibrate (default: every port in AXES)")
+    parser.add_argument('--transactions', type=int, default=BUS_CALIBRATION_TRANSACTIONS,
+                        help="Transactions per type and baud rate")
+    parser.add_argument('--max-error-rate', type=float, default=BUS_CALIBRATION_MAX_ERROR_RATE)
+    parser.add_argument('--keep-write-status', action='store_true',
+                        help="Keep Status Return Level 2, so every write is acknowledged")
+    parser.add_argument('--measure-only', action='store_true', help="Measure the current settings, change nothing")
+    parser.add_argument('--simulate', action='store_true', help="Calibrate the bus simulator instead (not saved)")
+    args = parser.parse_args()
+
+    ports = {}
+    for axis in AXES:
+        ports.setdefault(axis['port'], []).append(axis['id'])
+    if args.port:
+        ports = {name: ids for name, ids in ports.items() if name in args.port}
+    simulator = None
+    if args.simulate:
+        from src.bus_simulator import BusSimulator
+        simulator = BusSimulator([dxl_id for ids in ports.values() for dxl_id in ids], BAUDRATE).start()
+        ports = {simulator.port_name: [dxl_id for ids in ports.values() for dxl_id in ids]}
+
+    stored = load_bus_calibration()
+    calibrations = {}
+    try:
+        for device_name, ids in ports.items():
+            port = BusPort(device_name, ids, read_velocities=STATUS_UPLINK_RATE_HZ > 0,
+                           baudrate=stored.get(device_name, {}).get('baudrate', BAUDRATE))
+            if not port.open(port.baudrate):
+                continue
+            try:
+                before, after = BusCalibrator(port, args.transactions, args.max_error_rate).calibrate(
+                    1 if not args.keep_write_status else 2, args.measure_only)
+            finally:
+                port.close()
+            if before is None:
+                continue
+            print(format_report(device_name, before, after))
+            if after is not None:
+                calibrations[device_name] = {
+                    'baudrate': after['baudrate'],
+                    'return_delay_time': 0,
+                    'status_return_level': port.status_return_level,
+                    'loop_hz': round(after['loop_hz']),
+                    'tick_us': round(after['rtt_us']['tick']['mean']),
+                }
+    finally:
+        if simulator is not None:
+            simulator.stop()
+        logger.stop()
+
+    if calibrations and simulator is None:
+        save_bus_calibration(calibrations)
+        print(f"Saved bus calibration to {BUS_CALIBRATION_FILE}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from dynamixel_sdk import *
+from config.config import *
+from .latency_tracer import tracer
+from .async_logger import logger
+
+# Command priorities (lower runs first)
+PRIORITY_EMERGENCY = 0   # emergency stop, torque off
+PRIORITY_CONTROL = 1     # per-tick position reads and goal velocity writes
+PRIORITY_NORMAL = 2      # configuration and recovery
+PRIORITY_BACKGROUND = 3  # diagnostics
+
+# Status packet of a ping: header, ID, length, instruction, error, model (2), firmware, CRC (2)
+PING_STATUS_LENGTH = 14
+
+
+class BusWorker:
+    """Single thread that executes every transaction on one port, by priority.
+
+    Commands submitted with a coalescing key replace a still-queued command
+    with the same key instead of adding another one.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.queue = []
+        self.pending = {}
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.executed = 0
+        self.coalesced = 0
+        self.on_error = None  # called with the exception of a failed command
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Finish queued commands, then stop the thread"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def submit(self, fn, *args, priority=PRIORITY_NORMAL, key=None, future=False):
+        """Queue fn(*args) without blocking; returns a Future if future=True"""
+        result = Future() if future else None
+        with self.condition:
+            queued = self.pending.get(key) if key is not None else None
+            if queued is not None:
+                # Latest wins: keep the queue slot, replace the work
+                queued[3] = fn
+                queued[4] = args
+                if result is not None:
+                    queued[5].append(result)
+                self.coalesced += 1
+                return result
+            entry = [priority, next(self.sequence), key, fn, args, [result] if result is not None else []]
+            heapq.heappush(self.queue, entry)
+            if key is not None:
+                self.pending[key] = entry
+            self.condition.notify()
+        return result
+
+    def call(self, fn, *args, priority=PRIORITY_NORMAL):
+        """Run fn(*args) on the worker and wait for its result"""
+        if self.thread is None or threading.current_thread() is self.thread:
+            return fn(*args)
+        return self.submit(fn, *args, priority=priority, future=True).result()
+
+    def discard(self, key):
+        """Drop a queued command that has not started yet"""
+        with self.condition:
+            entry = self.pending.pop(key, None)
+            if entry is not None:
+                entry[3] = None
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.queue and self.running:
+                    self.condition.wait()
+                if not self.queue:
+                    return
+                entry = heapq.heappop(self.queue)
+                if entry[2] is not None and self.pending.get(entry[2]) is entry:
+                    del self.pending[entry[2]]
+            _, _, _, fn, args, futures = entry
+            if fn is None:
+                for f in futures:
+                    f.cancel()
+                continue
+            try:
+                value = fn(*args)
+            except Exception as e:
+                for f in futures:
+                    f.set_exception(e)
+                logger.error("Bus command failed on %s: %s", self.name, e, interval=1.0)
+                if self.on_error is not None:
+                    self.on_error(e)
+                continue
+            self.executed += 1
+            for f in futures:
+                f.set_result(value)
+
+
+class BusPort:
+    """One serial adapter (U2D2) and the motors daisy-chained on it.
+
+    All traffic on the port goes through its BusWorker, so transactions on
+    separate adapters run in parallel while each bus stays strictly serial.
+    Goal velocities (and, for position tracking, goal positions) are
+    coalesced per motor and unchanged values are not written again.
+    """
+    def __init__(self, device_name, dxl_ids, port_handler=None, read_velocities=False, baudrate=BAUDRATE):
+        self.device_name = device_name
+        self.dxl_ids = list(dxl_ids)
+        self.baudrate = baudrate
+        # Lowest Status Return Level on the bus (read_configuration); below 2 writes are not acknowledged
+        self.status_return_level = 2
+        self.portHandler = port_handler or PortHandler(device_name)
+        self.packetHandler = PacketHandler(PROTOCOL_VERSION)
+        self.worker = BusWorker(f"bus-io-{device_name}")
+        self.setpoint_lock = threading.Lock()
+        self.pending_velocities = {}
+        self.pending_frame = None
+        self.last_velocities = {}
+        self.pending_positions = {}
+        self.pending_position_frame = None
+        self.last_positions = {}
+        self.position_ids = set()  # motors tracking goal positions instead of velocities
+        self.writes_suppressed = 0
+        self.present_velocities = {}
+        # Link health: consecutive failed position reads and adapter errors
+        self.read_failures = 0
+        self.port_error = False
+        self.worker.on_error = self._on_worker_error
+
+        # One instruction packet per tick for all motors instead of one per ID;
+        # Present Velocity sits right before Present Position, so the same read
+        # can cover both for a few bytes more per motor
+        self.read_velocities = read_velocities
+        if read_velocities:
+            self.groupSyncRead = GroupSyncRead(
+                self.portHandler, self.packetHandler, ADDR_PRESENT_VELOCITY,
+                LEN_PRESENT_VELOCITY + LEN_PRESENT_POSITION
+            )
+        else:
+            self.groupSyncRead = GroupSyncRead(
+                self.portHandler, self.packetHandler, ADDR_PRESENT_POSITION, LEN_PRESENT_POSITION
+            )
+        self.groupSyncWrite = GroupSyncWrite(
+            self.portHandler, self.packetHandler, ADDR_GOAL_VELOCITY, LEN_GOAL_VELOCITY
+        )
+        self.groupSyncWritePosition = GroupSyncWrite(
+            self.portHandler, self.packetHandler, ADDR_GOAL_POSITION, LEN_GOAL_POSITION
+        )
+        for dxl_id in self.dxl_ids:
+            self.groupSyncRead.addParam(dxl_id)
+
+    def open(self, baudrate):
+        if not self.portHandler.openPort():
+            logger.error("Failed to open the port %s", self.device_name)
+            return False
+        logger.info("Succeeded to open the port %s", self.device_name)
+
+        if not self.portHandler.setBaudRate(baudrate):
+            logger.error("Failed to change the baudrate on %s", self.device_name)
+            return False
+        logger.info("Succeeded to change the baudrate")
+        self.worker.start()
+        return True
+
+    def set_baudrate(self, baudrate):
+        """Switch the adapter to another rate (the motors stay where they are); runs on the I/O worker"""
+        if not self.portHandler.setBaudRate(baudrate):
+            return False
+        self.portHandler.is_using = False
+        self.baudrate = baudrate
+        return True
+
+    def _on_worker_error(self, error):
+        # pyserial raises OSError subclasses when the USB adapter goes away
+        if isinstance(error, OSError):
+            self.port_error = True
+
+    @property
+    def lost(self):
+        """True once the adapter failed or the motors stopped answering position reads"""
+        return self.port_error or self.read_failures >= BUS_LOSS_READ_FAILURES
+
+    def reopen(self, baudrate):
+        """Close and re-open the adapter after a USB glitch; runs on the I/O worker"""
+        try:
+            if self.portHandler.is_open:
+                self.portHandler.closePort()
+        except Exception:
+            pass
+        try:
+            if not (self.portHandler.openPort() and self.portHandler.setBaudRate(baudrate)):
+                return False
+        except Exception as e:
+            logger.warning("Re-opening %s failed: %s", self.device_name, e, interval=1.0)
+            return False
+        # A transaction cut off by the failure leaves the port marked busy
+        self.portHandler.is_using = False
+        self.port_error = False
+        self.read_failures = 0
+        # Register contents are unknown after a reconnect
+        self.last_velocities.clear()
+        self.last_positions.clear()
+        return True
+
+    def discard_setpoints(self):
+        """Drop queued goal writes (e.g. while the bus is down)"""
+        with self.setpoint_lock:
+            self.pending_velocities = {}
+            self.pending_frame = None
+            self.pending_positions = {}
+            self.pending_position_frame = None
+        self.worker.discard('goal_velocity')
+        self.worker.discard('goal_position')
+
+    def submit(self, fn, *args, priority=PRIORITY_NORMAL, key=None, future=False):
+        return self.worker.submit(fn, *args, priority=priority, key=key, future=future)
+
+    def call(self, fn, *args, priority=PRIORITY_NORMAL):
+        return self.worker.call(fn, *args, priority=priority)
+
+    def queue_goal_velocities(self, velocities, frame=None):
+        """Non-blocking goal velocity update, coalesced into one sync write per flush"""
+        with self.setpoint_lock:
+            for dxl_id, velocity in velocities.items():
+                velocity = int(velocity)
+                if dxl_id not in self.pending_velocities and self.last_velocities.get(dxl_id) == velocity:
+                    self.writes_suppressed += 1
+                    continue
+                self.pending_velocities[dxl_id] = velocity
+            if not self.pending_velocities:
+                return
+            if frame is not None:
+                self.pending_frame = frame
+        self.submit(self._flush_goal_velocities, priority=PRIORITY_CONTROL, key='goal_velocity')
+
+    def _flush_goal_velocities(self):
+        with self.setpoint_lock:
+            velocities = self.pending_velocities
+            self.pending_velocities = {}
+            frame = self.pending_frame
+            self.pending_frame = None
+        # Drop values that ended up equal to what the motors already have
+        velocities = {i: v for i, v in velocities.items() if self.last_velocities.get(i) != v}
+        if not velocities:
+            return
+        tracer.bus_start(frame)
+        self.set_goal_velocities(velocities)
+        tracer.bus_done(frame)
+
+    def queue_goal_positions(self, positions, frame=None):
+        """Non-blocking goal position update, coalesced into one sync write per flush"""
+        with self.setpoint_lock:
+            for dxl_id, position in positions.items():
+                position = int(position)
+                if dxl_id not in self.pending_positions and self.last_positions.get(dxl_id) == position:
+                    self.writes_suppressed += 1
+                    continue
+                self.pending_positions[dxl_id] = position
+            if not self.pending_positions:
+                return
+            if frame is not None:
+                self.pending_position_frame = frame
+        self.submit(self._flush_goal_positions, priority=PRIORITY_CONTROL, key='goal_position')
+
+    def _flush_goal_positions(self):
+        with self.setpoint_lock:
+            positions = self.pending_positions
+            self.pending_positions = {}
+            frame = self.pending_position_frame
+            self.pending_position_frame = None
+        positions = {i: p for i, p in positions.items() if self.last_positions.get(i) != p}
+        if not positions:
+            return
+        tracer.bus_start(frame)
+        self.set_goal_positions(positions)
+        tracer.bus_done(frame)
+
+    def emergency_stop(self, disable_torque=False):
+        """Stop every motor ahead of all queued work, dropping pending setpoint writes"""
+        self.discard_setpoints()
+        return self.submit(self._emergency_stop, disable_torque, priority=PRIORITY_EMERGENCY, future=True)
+
+    def _emergency_stop(self, disable_torque):
+        velocity_ids = [dxl_id for dxl_id in self.dxl_ids if dxl_id not in self.position_ids]
+        if velocity_ids:
+            self.set_goal_velocities({dxl_id: 0 for dxl_id in velocity_ids})
+        if self.position_ids:
+            # Position-tracking motors stop where they are
+            positions = self.read_present_positions()
+            self.set_goal_positions({dxl_id: positions[dxl_id] for dxl_id in self.position_ids
+                                     if positions.get(dxl_id) is not None})
+        if disable_torque:
+            for dxl_id in self.dxl_ids:
+                self.disable_torque(dxl_id)
+
+    def close(self):
+        self.worker.stop()
+        if self.portHandler.is_open:
+            self.portHandler.closePort()
+
+    def ping_motors(self):
+        """Broadcast ping; returns {dxl_id: model number} of the motors that answered.
+
+        Unlike PacketHandler.broadcastPing, which always waits out the reply
+        window of all 253 IDs (about a second at 115200 bps), this returns as
+        soon as every motor configured on the port has answered.
+        """
+        txpacket = [0] * 10
+        txpacket[PKT_ID] = BROADCAST_ID
+        txpacket[PKT_LENGTH_L] = 3
+        txpacket[PKT_LENGTH_H] = 0
+        txpacket[PKT_INSTRUCTION] = INST_PING
+        dxl_comm_result = self.packetHandler.txPacket(self.portHandler, txpacket)
+        if dxl_comm_result != COMM_SUCCESS:
+            self.portHandler.is_using = False
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+            return {}
+
+        expected = set(self.dxl_ids)
+        # Replies come back in ID order, one slot (up to 3 ms) per ID
+        self.portHandler.setPacketTimeoutMillis(
+            len(expected) * PING_STATUS_LENGTH * self.portHandler.tx_time_per_byte + 3.0 * max(expected) + 16.0
+        )
+        found = {}
+        rxpacket = []
+        while not expected.issubset(found):
+            rxpacket += self.portHandler.readPort(PING_STATUS_LENGTH * len(expected))
+            while len(rxpacket) >= PING_STATUS_LENGTH:
+                if rxpacket[0:3] != [0xFF, 0xFF, 0xFD]:
+                    del rxpacket[0]
+                    continue
+                crc = DXL_MAKEWORD(rxpacket[PING_STATUS_LENGTH - 2], rxpacket[PING_STATUS_LENGTH - 1])
+                if self.packetHandler.updateCRC(0, rxpacket, PING_STATUS_LENGTH - 2) == crc:
+                    found[rxpacket[PKT_ID]] = DXL_MAKEWORD(rxpacket[PKT_PARAMETER0 + 1], rxpacket[PKT_PARAMETER0 + 2])
+                    del rxpacket[0:PING_STATUS_LENGTH]
+                else:
+                    del rxpacket[0:3]
+            if self.portHandler.isPacketTimeout():
+                break
+        self.portHandler.is_using = False
+        return found
+
+    def read_configuration(self):
+        """One bulk read of Operating Mode through Status Return Level per motor.
+
+        Returns {dxl_id: {'mode', 'max_limit', 'min_limit', 'torque',
+        'status_return_level'}}, or None if the read failed. Also records the
+        bus's lowest Status Return Level for write_register().
+        """
+        length = ADDR_STATUS_RETURN_LEVEL + 1 - ADDR_OPERATING_MODE
+        group = GroupBulkRead(self.portHandler, self.packetHandler)
+        for dxl_id in self.dxl_ids:
+            group.addParam(dxl_id, ADDR_OPERATING_MODE, length)
+        dxl_comm_result = group.txRxPacket()
+        if dxl_comm_result != COMM_SUCCESS:
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+            return None
+        config = {}
+        for dxl_id in self.dxl_ids:
+            if not group.isAvailable(dxl_id, ADDR_OPERATING_MODE, length):
+                return None
+            limits = [group.getData(dxl_id, address, 4) for address in (ADDR_MAX_POSITION_LIMIT, ADDR_MIN_POSITION_LIMIT)]
+            config[dxl_id] = {
+                'mode': group.getData(dxl_id, ADDR_OPERATING_MODE, 1),
+                'max_limit': limits[0] - 4294967296 if limits[0] > 0x7FFFFFFF else limits[0],
+                'min_limit': limits[1] - 4294967296 if limits[1] > 0x7FFFFFFF else limits[1],
+                'torque': group.getData(dxl_id, ADDR_TORQUE_ENABLE, 1),
+                'status_return_level': group.getData(dxl_id, ADDR_STATUS_RETURN_LEVEL, 1),
+            }
+        self.status_return_level = min(c['status_return_level'] for c in config.values())
+        return config
+
+    def start_velocity_mode(self, dxl_id, config=None):
+        """Velocity mode with torque on, skipping the writes config (read_configuration) shows are done"""
+        self.position_ids.discard(dxl_id)
+        torque = config is not None and config['torque']
+        if config is None or config['mode'] != OPERATING_MODE_VELOCITY:
+            if not self.set_operating_mode(dxl_id):
+                return False
+            torque = False
+        if torque:
+            return True
+        return self.enable_torque(dxl_id)
+
+    def set_operating_mode(self, dxl_id, mode=OPERATING_MODE_VELOCITY):
+        self.last_velocities.pop(dxl_id, None)
+        self.last_positions.pop(dxl_id, None)
+        # Disable torque first
+        dxl_comm_result, dxl_error = self.write_register(dxl_id, ADDR_TORQUE_ENABLE, 1, TORQUE_DISABLE)
+        if dxl_comm_result != COMM_SUCCESS:
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+            return False
+
+        dxl_comm_result, dxl_error = self.write_register(dxl_id, ADDR_OPERATING_MODE, 1, mode)
+        if dxl_comm_result != COMM_SUCCESS:
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+            return False
+        elif dxl_error != 0:
+            logger.error("%s", self.packetHandler.getRxPacketError(dxl_error), interval=1.0)
+            return False
+
+        if mode == OPERATING_MODE_VELOCITY:
+            logger.info("Motor %d set to velocity control mode", dxl_id)
+        else:
+            logger.info("Motor %d set to operating mode %d", dxl_id, mode)
+        return True
+
+    def write_register(self, dxl_id, address, length, value):
+        """Write one register; returns (comm_result, error) like the SDK's TxRx writes.
+
+        Motors at Status Return Level 1 or 0 send no status packet for writes,
+        so the write is sent without waiting for one (and reports no error).
+        """
+        data = list((int(value) & ((1 << (8 * length)) - 1)).to_bytes(length, 'little'))
+        if self.status_return_level < 2:
+            return self.packetHandler.writeTxOnly(self.portHandler, dxl_id, address, length, data), 0
+        return self.packetHandler.writeTxRx(self.portHandler, dxl_id, address, length, data)
+
+    def write_4byte(self, dxl_id, address, value):
+        """Write a signed 32-bit register, returning True on success"""
+        if value < 0:
+            value = value + 4294967296  # Convert negative to unsigned 32-bit
+        dxl_comm_result, dxl_error = self.write_register(dxl_id, address, 4, value)
+        if dxl_comm_result != COMM_SUCCESS:
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+            return False
+        elif dxl_error != 0:
+            logger.error("%s", self.packetHandler.getRxPacketError(dxl_error), interval=1.0)
+            return False
+        return True
+
+    def start_profiled_move(self, dxl_id, position, profile_velocity, profile_acceleration):
+        """Switch to extended position mode and let the motor's profile generator drive to position"""
+        # Extended position mode keeps the multi-turn Present Position of velocity mode
+        if not self.set_operating_mode(dxl_id, OPERATING_MODE_EXTENDED_POSITION):
+            return False
+        if not (self.write_4byte(dxl_id, ADDR_PROFILE_ACCELERATION, profile_acceleration)
+                and self.write_4byte(dxl_id, ADDR_PROFILE_VELOCITY, profile_velocity)
+                and self.enable_torque(dxl_id)):
+            return False
+        return self.write_4byte(dxl_id, ADDR_GOAL_POSITION, position)
+
+    def finish_profiled_move(self, dxl_id):
+        """Return a motor to velocity mode, stopped"""
+        if not self.set_operating_mode(dxl_id, OPERATING_MODE_VELOCITY):
+            return False
+        # Profiles would otherwise shape velocity commands too
+        for address in (ADDR_PROFILE_ACCELERATION, ADDR_PROFILE_VELOCITY, ADDR_GOAL_VELOCITY):
+            if not self.write_4byte(dxl_id, address, 0):
+                return False
+        self.last_velocities[dxl_id] = 0
+        return self.enable_torque(dxl_id)
+
+    def start_position_tracking(self, dxl_id, mode, limits, profile_velocity, profile_acceleration,
+                                config=None):
+        """Put a motor into position mode for goal-position tracking, holding it inside limits.
+
+        In single-turn position mode the limits go into the Min/Max Position
+        Limit registers, so the motor itself rejects goals outside them. Mode
+        and limits are left alone if config (read_configuration) shows them set.
+        Returns the present position, or None on failure.
+        """
+        self.position_ids.discard(dxl_id)
+        configured = (config is not None and config['mode'] == mode
+                      and (mode != OPERATING_MODE_POSITION
+                           or (config['min_limit'], config['max_limit']) == tuple(limits)))
+        torque = configured and config['torque']
+        if not configured:
+            if not self.set_operating_mode(dxl_id, mode):
+                return None
+            if mode == OPERATING_MODE_POSITION:
+                # EEPROM area: written while torque is still off
+                if not (self.write_4byte(dxl_id, ADDR_MIN_POSITION_LIMIT, limits[0])
+                        and self.write_4byte(dxl_id, ADDR_MAX_POSITION_LIMIT, limits[1])):
+                    return None
+        if not (self.write_4byte(dxl_id, ADDR_PROFILE_ACCELERATION, profile_acceleration)
+                and self.write_4byte(dxl_id, ADDR_PROFILE_VELOCITY, profile_velocity)):
+            return None
+        position = self.read_present_position(dxl_id)
+        if position is None:
+            return None
+        hold = min(max(position, limits[0]), limits[1])
+        if not ((torque or self.enable_torque(dxl_id)) and self.write_4byte(dxl_id, ADDR_GOAL_POSITION, hold)):
+            return None
+        self.last_positions[dxl_id] = hold
+        self.position_ids.add(dxl_id)
+        return position
+
+    def read_moving_status(self, dxl_ids):
+        """Sync-read (Moving, Moving Status) per motor; None if the read failed"""
+        group = GroupSyncRead(self.portHandler, self.packetHandler, ADDR_MOVING, LEN_MOVING)
+        for dxl_id in dxl_ids:
+            group.addParam(dxl_id)
+        dxl_comm_result = group.txRxPacket()
+        if dxl_comm_result != COMM_SUCCESS:
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+            return None
+        status = {}
+        for dxl_id in dxl_ids:
+            if group.isAvailable(dxl_id, ADDR_MOVING, LEN_MOVING):
+                status[dxl_id] = (group.getData(dxl_id, ADDR_MOVING, 1),
+                                  group.getData(dxl_id, ADDR_MOVING_STATUS, 1))
+        return status
+
+    def enable_torque(self, dxl_id):
+        dxl_comm_result, dxl_error = self.write_register(dxl_id, ADDR_TORQUE_ENABLE, 1, TORQUE_ENABLE)
+        if dxl_comm_result != COMM_SUCCESS:
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+            return False
+        elif dxl_error != 0:
+            logger.error("%s", self.packetHandler.getRxPacketError(dxl_error), interval=1.0)
+            return False
+        return True
+
+    def disable_torque(self, dxl_id):
+        self.last_velocities.pop(dxl_id, None)
+        dxl_comm_result, dxl_error = self.write_register(dxl_id, ADDR_TORQUE_ENABLE, 1, TORQUE_DISABLE)
+        if dxl_comm_result != COMM_SUCCESS:
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+        elif dxl_error != 0:
+            logger.error("%s", self.packetHandler.getRxPacketError(dxl_error), interval=1.0)
+        else:
+            logger.info("Dynamixel %d has been successfully disconnected", dxl_id)
+
+    def read_present_position(self, dxl_id):
+        dxl_present_position, dxl_comm_result, dxl_error = self.packetHandler.read4ByteTxRx(
+            self.portHandler, dxl_id, ADDR_PRESENT_POSITION
+        )
+        if dxl_comm_result != COMM_SUCCESS:
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+            return None
+        elif dxl_error != 0:
+            logger.error("%s", self.packetHandler.getRxPacketError(dxl_error), interval=1.0)
+            return None
+        else:
+            if dxl_present_position > DXL_MAXIMUM_POSITION_VALUE:
+                dxl_present_position = dxl_present_position - (DXL_MAXIMUM_POSITION_VALUE + 1) * 2
+        return dxl_present_position
+
+    def read_present_positions(self):
+        """Read all motor positions with one sync read, falling back to per-ID reads.
+
+        Motors that could not be read map to None (unknown), never to a position.
+        """
+        dxl_comm_result = self.groupSyncRead.txRxPacket()
+        if dxl_comm_result != COMM_SUCCESS:
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+            positions = {dxl_id: self.read_present_position(dxl_id) for dxl_id in self.dxl_ids}
+            if None in positions.values():
+                self.read_failures += 1
+            else:
+                self.read_failures = 0
+            return positions
+        self.read_failures = 0
+
+        positions = {}
+        for dxl_id in self.dxl_ids:
+            if not self.groupSyncRead.isAvailable(dxl_id, ADDR_PRESENT_POSITION, LEN_PRESENT_POSITION):
+                positions[dxl_id] = self.read_present_position(dxl_id)
+                continue
+            dxl_present_position = self.groupSyncRead.getData(
+                dxl_id, ADDR_PRESENT_POSITION, LEN_PRESENT_POSITION
+            )
+            if dxl_present_position > DXL_MAXIMUM_POSITION_VALUE:
+                dxl_present_position = dxl_present_position - (DXL_MAXIMUM_POSITION_VALUE + 1) * 2
+            positions[dxl_id] = dxl_present_position
+            if self.read_velocities:
+                velocity = self.groupSyncRead.getData(dxl_id, ADDR_PRESENT_VELOCITY, LEN_PRESENT_VELOCITY)
+                self.present_velocities[dxl_id] = velocity - 4294967296 if velocity > 0x7FFFFFFF else velocity
+        return positions
+
+    def set_goal_velocity(self, dxl_id, velocity):
+        # Convert velocity to proper format for Dynamixel (signed 32-bit)
+        if velocity < 0:
+            velocity = velocity + 4294967296  # Convert negative to unsigned 32-bit
+
+        dxl_comm_result, dxl_error = self.write_register(dxl_id, ADDR_GOAL_VELOCITY, 4, velocity)
+        if dxl_comm_result != COMM_SUCCESS:
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+            self.last_velocities.pop(dxl_id, None)
+        elif dxl_error != 0:
+            logger.error("%s", self.packetHandler.getRxPacketError(dxl_error), interval=1.0)
+            self.last_velocities.pop(dxl_id, None)
+        else:
+            self.last_velocities[dxl_id] = int(velocity) - 4294967296 if velocity > 0x7FFFFFFF else int(velocity)
+            logger.debug("Motor %d speed set to %d", dxl_id, velocity)
+
+    def set_goal_positions(self, positions):
+        """Write goal positions for several motors with one sync write (no status packets)"""
+        self.groupSyncWritePosition.clearParam()
+        for dxl_id, position in positions.items():
+            value = int(position)
+            if value < 0:
+                value = value + 4294967296  # Convert negative to unsigned 32-bit
+            self.groupSyncWritePosition.addParam(dxl_id, [
+                DXL_LOBYTE(DXL_LOWORD(value)), DXL_HIBYTE(DXL_LOWORD(value)),
+                DXL_LOBYTE(DXL_HIWORD(value)), DXL_HIBYTE(DXL_HIWORD(value)),
+            ])
+
+        dxl_comm_result = self.groupSyncWritePosition.txPacket()
+        if dxl_comm_result != COMM_SUCCESS:
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+            for dxl_id in positions:
+                self.last_positions.pop(dxl_id, None)
+        else:
+            for dxl_id, position in positions.items():
+                self.last_positions[dxl_id] = int(position)
+            logger.debug("Motor positions set to %s", positions)
+
+    def set_goal_velocities(self, velocities):
+        """Write goal velocities for several motors with one sync write (no status packets)"""
+        self.groupSyncWrite.clearParam()
+        for dxl_id, velocity in velocities.items():
+            value = int(velocity)
+            if value < 0:
+                value = value + 4294967296  # Convert negative to unsigned 32-bit
+            self.groupSyncWrite.addParam(dxl_id, [
+                DXL_LOBYTE(DXL_LOWORD(value)), DXL_HIBYTE(DXL_LOWORD(value)),
+                DXL_LOBYTE(DXL_HIWORD(value)), DXL_HIBYTE(DXL_HIWORD(value)),
+            ])
+
+        dxl_comm_result = self.groupSyncWrite.txPacket()
+        if dxl_comm_result != COMM_SUCCESS:
+            logger.error("%s", self.packetHandler.getTxRxResult(dxl_comm_result), interval=1.0)
+            for dxl_id, velocity in velocities.items():
+                self.set_goal_velocity(dxl_id, velocity)
+        else:
+            for dxl_id, velocity in velocities.items():
+                self.last_velocities[dxl_id] = int(velocity)
+            logger.debug("Motor speeds set to %s", velocities)
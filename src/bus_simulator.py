@@ -0,0 +1,662 @@
+#!/usr/bin/env python3
+"""Software-in-the-loop Dynamixel Protocol 2.0 bus simulator.
+
+Opens a pseudo-terminal and answers instruction packets on its slave side for
+a set of virtual XL430-W250-T motors, so DynamixelController can run unmodified
+with DEVICENAME (or device_name) pointed at simulator.port_name. With
+use_pty=False the motors are reached in-process through FakePortHandler,
+without serial timing, for benchmarks of the host-side code.
+
+    python -m src.bus_simulator --ids 1 2 --baudrate 115200
+"""
+import argparse
+import os
+import pty
+import random
+import select
+import struct
+import termios
+import threading
+import time
+import tty
+
+from dynamixel_sdk import PortHandler
+
+# Instructions
+INST_PING = 0x01
+INST_READ = 0x02
+INST_WRITE = 0x03
+INST_REG_WRITE = 0x04
+INST_ACTION = 0x05
+INST_FACTORY_RESET = 0x06
+INST_REBOOT = 0x08
+INST_STATUS = 0x55
+INST_SYNC_READ = 0x82
+INST_SYNC_WRITE = 0x83
+INST_BULK_READ = 0x92
+INST_BULK_WRITE = 0x93
+
+BROADCAST_ID = 0xFE
+
+# Status packet error codes
+ERR_RESULT_FAIL = 0x01
+ERR_INSTRUCTION = 0x02
+ERR_CRC = 0x03
+ERR_DATA_RANGE = 0x04
+ERR_DATA_LENGTH = 0x05
+ERR_DATA_LIMIT = 0x06
+ERR_ACCESS = 0x07
+
+HEADER = b'\xff\xff\xfd\x00'
+
+# XL430-W250-T control table addresses
+ADDR_MODEL_NUMBER = 0
+ADDR_FIRMWARE_VERSION = 6
+ADDR_ID = 7
+ADDR_BAUD_RATE = 8
+ADDR_RETURN_DELAY_TIME = 9
+ADDR_OPERATING_MODE = 11
+ADDR_MOVING_THRESHOLD = 24
+ADDR_VELOCITY_LIMIT = 44
+ADDR_MAX_POSITION_LIMIT = 48
+ADDR_MIN_POSITION_LIMIT = 52
+ADDR_TORQUE_ENABLE = 64
+ADDR_STATUS_RETURN_LEVEL = 68
+ADDR_REGISTERED_INSTRUCTION = 69
+ADDR_HARDWARE_ERROR_STATUS = 70
+ADDR_GOAL_VELOCITY = 104
+ADDR_PROFILE_ACCELERATION = 108
+ADDR_PROFILE_VELOCITY = 112
+ADDR_GOAL_POSITION = 116
+ADDR_REALTIME_TICK = 120
+ADDR_MOVING = 122
+ADDR_MOVING_STATUS = 123
+ADDR_PRESENT_VELOCITY = 128
+ADDR_PRESENT_POSITION = 132
+ADDR_PRESENT_INPUT_VOLTAGE = 144
+ADDR_PRESENT_TEMPERATURE = 146
+CONTROL_TABLE_SIZE = 147
+EEPROM_END = 64
+
+# Addresses the host may not write: model/firmware info and RAM status fields
+READ_ONLY_RANGES = ((0, 7), (ADDR_REGISTERED_INSTRUCTION, 71), (ADDR_REALTIME_TICK, CONTROL_TABLE_SIZE))
+
+MODEL_XL430_W250 = 1060
+OPERATING_MODE_VELOCITY = 1
+OPERATING_MODE_POSITION = 3
+OPERATING_MODE_EXTENDED_POSITION = 4
+
+VELOCITY_UNIT_RPM = 0.229
+PROFILE_ACCELERATION_UNIT = 214.577  # rev/min^2
+POSITION_UNITS_PER_REV = 4096
+
+# Baud Rate register value -> bps
+BAUD_RATE_TABLE = {0: 9600, 1: 57600, 2: 115200, 3: 1000000, 4: 2000000,
+                   5: 3000000, 6: 4000000, 7: 4500000}
+
+# termios speed constant -> bps, for following the host's port settings
+TERMIOS_BAUD_TABLE = {
+    getattr(termios, 'B%d' % bps): bps
+    for bps in (9600, 19200, 38400, 57600, 115200, 230400, 460800, 500000, 576000,
+                921600, 1000000, 1152000, 2000000, 2500000, 3000000, 3500000, 4000000)
+    if hasattr(termios, 'B%d' % bps)
+}
+
+
+def _make_crc_table():
+    table = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x8005) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+CRC_TABLE = _make_crc_table()
+
+
+def crc16(data):
+    """Dynamixel Protocol 2.0 CRC-16 (polynomial 0x8005)"""
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) ^ CRC_TABLE[((crc >> 8) ^ byte) & 0xFF]) & 0xFFFF
+    return crc
+
+
+def add_stuffing(payload):
+    """Insert 0xFD after every FF FF FD sequence in the instruction/parameter field"""
+    return payload.replace(b'\xff\xff\xfd', b'\xff\xff\xfd\xfd')
+
+
+def remove_stuffing(payload):
+    return payload.replace(b'\xff\xff\xfd\xfd', b'\xff\xff\xfd')
+
+
+def build_packet(dxl_id, instruction, params=b''):
+    """Build a complete Protocol 2.0 packet (header, length, stuffing, CRC)"""
+    body = add_stuffing(bytes([instruction]) + bytes(params))
+    packet = HEADER + struct.pack('<BH', dxl_id, len(body) + 2) + body
+    return packet + struct.pack('<H', crc16(packet))
+
+
+def build_status_packet(dxl_id, error, params=b''):
+    return build_packet(dxl_id, INST_STATUS, bytes([error]) + bytes(params))
+
+
+class VirtualMotor:
+    """Control table and simple dynamics model of one XL430-W250-T"""
+    def __init__(self, dxl_id, baud_index=2, position=2048):
+        self.table = bytearray(CONTROL_TABLE_SIZE)
+        self.registered = None
+        self.position = float(position)
+        self.velocity = 0.0  # position units per second
+        self.last_update = time.monotonic()
+        self.start_time = self.last_update
+        self.reset(dxl_id, baud_index)
+
+    def reset(self, dxl_id, baud_index=2):
+        self.table[:] = bytes(CONTROL_TABLE_SIZE)
+        self.write_value(ADDR_MODEL_NUMBER, 2, MODEL_XL430_W250)
+        self.write_value(ADDR_FIRMWARE_VERSION, 1, 46)
+        self.write_value(ADDR_ID, 1, dxl_id)
+        self.write_value(ADDR_BAUD_RATE, 1, baud_index)
+        self.write_value(ADDR_RETURN_DELAY_TIME, 1, 250)
+        self.write_value(ADDR_OPERATING_MODE, 1, OPERATING_MODE_POSITION)
+        self.write_value(ADDR_MOVING_THRESHOLD, 4, 10)
+        self.write_value(ADDR_VELOCITY_LIMIT, 4, 265)
+        self.write_value(ADDR_MAX_POSITION_LIMIT, 4, 4095)
+        self.write_value(ADDR_MIN_POSITION_LIMIT, 4, 0)
+        self.write_value(ADDR_STATUS_RETURN_LEVEL, 1, 2)
+        self.write_value(ADDR_PRESENT_INPUT_VOLTAGE, 2, 120)
+        self.write_value(ADDR_PRESENT_TEMPERATURE, 1, 30)
+        self.write_value(ADDR_GOAL_POSITION, 4, int(self.position))
+        self.velocity = 0.0
+        self.registered = None
+        self._sync_present()
+
+    @property
+    def dxl_id(self):
+        return self.table[ADDR_ID]
+
+    @property
+    def baudrate(self):
+        return BAUD_RATE_TABLE.get(self.table[ADDR_BAUD_RATE], 57600)
+
+    @property
+    def return_delay_s(self):
+        return self.table[ADDR_RETURN_DELAY_TIME] * 2e-6
+
+    @property
+    def status_return_level(self):
+        return self.table[ADDR_STATUS_RETURN_LEVEL]
+
+    def read_value(self, address, size, signed=False):
+        fmt = {1: 'B', 2: 'H', 4: 'I'}[size]
+        if signed:
+            fmt = fmt.lower()
+        return struct.unpack_from('<' + fmt, self.table, address)[0]
+
+    def write_value(self, address, size, value):
+        mask = (1 << (8 * size)) - 1
+        self.table[address:address + size] = (int(value) & mask).to_bytes(size, 'little')
+
+    def read(self, address, length, now):
+        if address + length > CONTROL_TABLE_SIZE:
+            return ERR_DATA_RANGE, b''
+        self.update(now)
+        return 0, bytes(self.table[address:address + length])
+
+    def write(self, address, data, now):
+        """Apply a host write; returns a status packet error code"""
+        end = address + len(data)
+        if end > CONTROL_TABLE_SIZE:
+            return ERR_DATA_RANGE
+        for lo, hi in READ_ONLY_RANGES:
+            if address < hi and end > lo:
+                return ERR_ACCESS
+        if address < EEPROM_END and self.table[ADDR_TORQUE_ENABLE]:
+            return ERR_ACCESS
+
+        self.update(now)
+        mode = self.table[ADDR_OPERATING_MODE]
+        if address <= ADDR_GOAL_POSITION and ADDR_GOAL_POSITION + 4 <= end and mode == OPERATING_MODE_POSITION:
+            goal = struct.unpack_from('<i', bytes(data), ADDR_GOAL_POSITION - address)[0]
+            if not (self.read_value(ADDR_MIN_POSITION_LIMIT, 4, True) <= goal
+                    <= self.read_value(ADDR_MAX_POSITION_LIMIT, 4, True)):
+                return ERR_DATA_LIMIT
+
+        self.table[address:end] = data
+        if address <= ADDR_OPERATING_MODE < end:
+            # Changing mode resets the goal to the present position
+            self.write_value(ADDR_GOAL_POSITION, 4, int(round(self.position)))
+            self.write_value(ADDR_GOAL_VELOCITY, 4, 0)
+        if address <= ADDR_TORQUE_ENABLE < end and self.table[ADDR_TORQUE_ENABLE]:
+            if mode != OPERATING_MODE_VELOCITY:
+                self.write_value(ADDR_GOAL_POSITION, 4, int(round(self.position)))
+        return 0
+
+    def update(self, now):
+        """Integrate the dynamics model up to time now"""
+        dt = now - self.last_update
+        if dt <= 0:
+            return
+        self.last_update = now
+
+        if not self.table[ADDR_TORQUE_ENABLE]:
+            self.velocity = 0.0
+            self._sync_present()
+            return
+
+        rpm_to_units = VELOCITY_UNIT_RPM / 60.0 * POSITION_UNITS_PER_REV
+        velocity_limit = self.read_value(ADDR_VELOCITY_LIMIT, 4) * rpm_to_units
+        mode = self.table[ADDR_OPERATING_MODE]
+
+        if mode == OPERATING_MODE_VELOCITY:
+            target = self.read_value(ADDR_GOAL_VELOCITY, 4, True) * rpm_to_units
+            target = max(-velocity_limit, min(velocity_limit, target))
+            acceleration = self.read_value(ADDR_PROFILE_ACCELERATION, 4)
+            if acceleration:
+                # rev/min^2 -> position units/s^2
+                max_step = acceleration * PROFILE_ACCELERATION_UNIT / 3600.0 * POSITION_UNITS_PER_REV * dt
+                delta = max(-max_step, min(max_step, target - self.velocity))
+                self.velocity += delta
+            else:
+                self.velocity = target
+            self.position += self.velocity * dt
+        elif mode in (OPERATING_MODE_POSITION, OPERATING_MODE_EXTENDED_POSITION):
+            goal = self.read_value(ADDR_GOAL_POSITION, 4, True)
+            profile_velocity = self.read_value(ADDR_PROFILE_VELOCITY, 4) * rpm_to_units
+            speed = min(profile_velocity, velocity_limit) if profile_velocity else velocity_limit
+            error = goal - self.position
+            step = speed * dt
+            if abs(error) <= step:
+                self.position = float(goal)
+                self.velocity = 0.0
+            else:
+                self.velocity = speed if error > 0 else -speed
+                self.position += self.velocity * dt
+        else:
+            self.velocity = 0.0
+
+        self._sync_present()
+
+    def _sync_present(self):
+        rpm_to_units = VELOCITY_UNIT_RPM / 60.0 * POSITION_UNITS_PER_REV
+        present_velocity = int(round(self.velocity / rpm_to_units))
+        self.write_value(ADDR_PRESENT_POSITION, 4, int(round(self.position)))
+        self.write_value(ADDR_PRESENT_VELOCITY, 4, present_velocity)
+
+        moving = present_velocity != 0
+        in_position = 0
+        if self.table[ADDR_OPERATING_MODE] != OPERATING_MODE_VELOCITY:
+            threshold = self.read_value(ADDR_MOVING_THRESHOLD, 4)
+            goal = self.read_value(ADDR_GOAL_POSITION, 4, True)
+            in_position = int(abs(goal - self.position) <= threshold)
+            moving = moving or not in_position
+        self.table[ADDR_MOVING] = int(moving and bool(self.table[ADDR_TORQUE_ENABLE]))
+        self.table[ADDR_MOVING_STATUS] = in_position
+        tick = int((time.monotonic() - self.start_time) * 1000) % 32768
+        self.write_value(ADDR_REALTIME_TICK, 2, tick)
+
+
+class BusSimulator:
+    """Serves a pty that behaves like a Dynamixel bus with N virtual motors"""
+    def __init__(self, motor_ids=(1, 2), baudrate=115200, return_delay_us=None,
+                 drop_rate=0.0, initial_positions=None, use_pty=True):
+        # Motors start at this baud rate; bus timing follows the speed the host
+        # configures on the port, so baud-rate changes are simulated faithfully
+        self.baudrate = baudrate
+        self.drop_rate = drop_rate
+        baud_index = {bps: idx for idx, bps in BAUD_RATE_TABLE.items()}[baudrate]
+        self.motors = {}
+        for i, dxl_id in enumerate(motor_ids):
+            position = initial_positions[i] if initial_positions else 2048
+            motor = VirtualMotor(dxl_id, baud_index, position)
+            if return_delay_us is not None:
+                motor.write_value(ADDR_RETURN_DELAY_TIME, 1, return_delay_us // 2)
+            self.motors[dxl_id] = motor
+
+        # In-process mode: replies collect in self.responses for FakePortHandler
+        self.host_baud = baudrate
+        self.responses = bytearray()
+        if use_pty:
+            self.master_fd, self.slave_fd = pty.openpty()
+            tty.setraw(self.master_fd)
+            tty.setraw(self.slave_fd)
+            self.port_name = os.ttyname(self.slave_fd)
+        else:
+            self.master_fd = self.slave_fd = None
+            self.port_name = None
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self._buffer = bytearray()
+        self._bus_free_at = 0.0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {
+            'rx_packets': 0, 'tx_packets': 0, 'rx_bytes': 0, 'tx_bytes': 0,
+            'crc_errors': 0, 'dropped': 0, 'bus_busy_s': 0.0,
+        }
+
+    def start(self):
+        if self.master_fd is None:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        for fd in (self.master_fd, self.slave_fd):
+            if fd is None:
+                continue
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def host_baudrate(self):
+        """Baud rate the host has configured on the port"""
+        if self.slave_fd is None:
+            return self.host_baud
+        try:
+            return TERMIOS_BAUD_TABLE.get(termios.tcgetattr(self.slave_fd)[5], self.baudrate)
+        except termios.error:
+            return self.baudrate
+
+    def motor_state(self, dxl_id):
+        """Current position (units) and velocity (units/s) of a virtual motor"""
+        with self.lock:
+            motor = self.motors[dxl_id]
+            motor.update(time.monotonic())
+            return motor.position, motor.velocity
+
+    def set_motor_position(self, dxl_id, position):
+        with self.lock:
+            motor = self.motors[dxl_id]
+            motor.update(time.monotonic())
+            motor.position = float(position)
+            motor._sync_present()
+
+    def _serve(self):
+        while self.running:
+            ready, _, _ = select.select([self.master_fd], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                chunk = os.read(self.master_fd, 4096)
+            except OSError:
+                # Host side closed; wait for it to reopen
+                time.sleep(0.01)
+                continue
+            self.feed(chunk)
+    
+    def feed(self, data):
+        """Process bytes written by the host"""
+        self.stats['rx_bytes'] += len(data)
+        self._buffer.extend(data)
+        for packet in self._extract_packets():
+            self._handle_packet(packet)
+
+    def _extract_packets(self):
+        buf = self._buffer
+        while True:
+            start = buf.find(HEADER)
+            if start < 0:
+                # Keep a possible partial header
+                del buf[:max(0, len(buf) - 3)]
+                return
+            del buf[:start]
+            if len(buf) < 7:
+                return
+            length = buf[5] | (buf[6] << 8)
+            total = 7 + length
+            if len(buf) < total:
+                return
+            packet = bytes(buf[:total])
+            del buf[:total]
+            if crc16(packet[:-2]) != (packet[-2] | (packet[-1] << 8)):
+                self.stats['crc_errors'] += 1
+                continue
+            self.stats['rx_packets'] += 1
+            yield packet
+
+    def _wire_time(self, n_bytes):
+        # 8N1: 10 bit times per byte
+        if self.master_fd is None:
+            return 0.0
+        return n_bytes * 10.0 / self.host_baudrate()
+
+    def _sleep_until(self, deadline):
+        if self.master_fd is None:
+            return
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def _listening(self, motor):
+        # A motor only decodes traffic sent at its own baud rate
+        return motor.baudrate == self.host_baudrate()
+
+    def _respond(self, motor, error, params=b''):
+        if self.drop_rate and random.random() < self.drop_rate:
+            self.stats['dropped'] += 1
+            return
+        packet = build_status_packet(motor.dxl_id, error, params)
+        wire_time = self._wire_time(len(packet))
+        self.stats['bus_busy_s'] += wire_time
+        # Replies follow the previous traffic after the return delay, then
+        # take their own wire time before the host can see them
+        self._bus_free_at = max(self._bus_free_at, time.monotonic()) + motor.return_delay_s + wire_time
+        self._sleep_until(self._bus_free_at)
+        if self.master_fd is None:
+            self.responses.extend(packet)
+        else:
+            try:
+                os.write(self.master_fd, packet)
+            except OSError:
+                return
+        self.stats['tx_packets'] += 1
+        self.stats['tx_bytes'] += len(packet)
+
+    def _handle_packet(self, packet):
+        dxl_id = packet[4]
+        instruction = packet[7]
+        params = remove_stuffing(packet[8:-2])
+        wire_time = self._wire_time(len(packet))
+        self.stats['bus_busy_s'] += wire_time
+        now = time.monotonic()
+        # The pty delivers instantly; account for the instruction's time on the wire
+        self._bus_free_at = max(self._bus_free_at, now) + wire_time
+
+        with self.lock:
+            motors = [m for m in self.motors.values() if self._listening(m)]
+            if dxl_id == BROADCAST_ID:
+                self._handle_broadcast(instruction, params, motors, now)
+                return
+            targets = [m for m in motors if m.dxl_id == dxl_id]
+            if not targets:
+                return
+            self._handle_unicast(targets[0], instruction, params, now)
+
+    def _handle_unicast(self, motor, instruction, params, now):
+        level = motor.status_return_level
+        if instruction == INST_PING:
+            self._respond(motor, 0, struct.pack('<HB', MODEL_XL430_W250, motor.table[ADDR_FIRMWARE_VERSION]))
+        elif instruction == INST_READ:
+            if len(params) != 4:
+                if level >= 1:
+                    self._respond(motor, ERR_DATA_LENGTH)
+                return
+            address, length = struct.unpack('<HH', params)
+            error, data = motor.read(address, length, now)
+            if level >= 1:
+                self._respond(motor, error, data)
+        elif instruction in (INST_WRITE, INST_REG_WRITE):
+            if len(params) < 3:
+                error = ERR_DATA_LENGTH
+            else:
+                address = params[0] | (params[1] << 8)
+                if instruction == INST_WRITE:
+                    error = motor.write(address, params[2:], now)
+                else:
+                    motor.registered = (address, params[2:])
+                    motor.table[ADDR_REGISTERED_INSTRUCTION] = 1
+                    error = 0
+            if level >= 2:
+                self._respond(motor, error)
+        elif instruction == INST_ACTION:
+            self._action(motor, now)
+            if level >= 2:
+                self._respond(motor, 0)
+        elif instruction == INST_REBOOT:
+            if level >= 2:
+                self._respond(motor, 0)
+            motor.update(now)
+            motor.write_value(ADDR_TORQUE_ENABLE, 1, 0)
+            motor.velocity = 0.0
+        elif instruction == INST_FACTORY_RESET:
+            if level >= 2:
+                self._respond(motor, 0)
+            # 0xFF: reset all, 0x01: keep ID, 0x02: keep ID and baud rate
+            option = params[0] if params else 0xFF
+            dxl_id = motor.dxl_id if option in (0x01, 0x02) else 1
+            baud_index = motor.table[ADDR_BAUD_RATE] if option == 0x02 else 1
+            motor.reset(dxl_id, baud_index)
+        elif level >= 2:
+            self._respond(motor, ERR_INSTRUCTION)
+
+    def _action(self, motor, now):
+        if motor.registered:
+            address, data = motor.registered
+            motor.write(address, data, now)
+            motor.registered = None
+            motor.table[ADDR_REGISTERED_INSTRUCTION] = 0
+
+    def _handle_broadcast(self, instruction, params, motors, now):
+        if instruction == INST_PING:
+            for motor in sorted(motors, key=lambda m: m.dxl_id):
+                self._respond(motor, 0, struct.pack('<HB', MODEL_XL430_W250,
+                                                    motor.table[ADDR_FIRMWARE_VERSION]))
+        elif instruction == INST_ACTION:
+            for motor in motors:
+                self._action(motor, now)
+        elif instruction == INST_WRITE and len(params) >= 3:
+            address = params[0] | (params[1] << 8)
+            for motor in motors:
+                motor.write(address, params[2:], now)
+        elif instruction == INST_SYNC_WRITE and len(params) >= 4:
+            address, length = struct.unpack_from('<HH', params)
+            by_id = {m.dxl_id: m for m in motors}
+            offset = 4
+            while offset + 1 + length <= len(params):
+                motor = by_id.get(params[offset])
+                if motor:
+                    motor.write(address, params[offset + 1:offset + 1 + length], now)
+                offset += 1 + length
+        elif instruction == INST_BULK_WRITE:
+            by_id = {m.dxl_id: m for m in motors}
+            offset = 0
+            while offset + 5 <= len(params):
+                target, address, length = struct.unpack_from('<BHH', params, offset)
+                data = params[offset + 5:offset + 5 + length]
+                if target in by_id:
+                    by_id[target].write(address, data, now)
+                offset += 5 + length
+        elif instruction == INST_SYNC_READ and len(params) >= 4:
+            address, length = struct.unpack_from('<HH', params)
+            by_id = {m.dxl_id: m for m in motors}
+            for target in params[4:]:
+                motor = by_id.get(target)
+                if motor is None:
+                    # Missing motor breaks the daisy chain of replies
+                    return
+                error, data = motor.read(address, length, now)
+                self._respond(motor, error, data)
+        elif instruction == INST_BULK_READ:
+            by_id = {m.dxl_id: m for m in motors}
+            for offset in range(0, len(params) - 4, 5):
+                target, address, length = struct.unpack_from('<BHH', params, offset)
+                motor = by_id.get(target)
+                if motor is None:
+                    return
+                error, data = motor.read(address, length, now)
+                self._respond(motor, error, data)
+
+
+class FakePortHandler(PortHandler):
+    """PortHandler wired to an in-process BusSimulator(use_pty=False).
+
+    Writes are answered synchronously, so transactions cost only the
+    host-side packet handling and no serial wire time.
+    """
+    def __init__(self, simulator, port_name='fake'):
+        super().__init__(port_name)
+        self.simulator = simulator
+
+    def openPort(self):
+        return self.setBaudRate(self.baudrate)
+
+    def closePort(self):
+        self.is_open = False
+
+    def clearPort(self):
+        self.simulator.responses.clear()
+
+    def setBaudRate(self, baudrate):
+        self.baudrate = baudrate
+        self.tx_time_per_byte = (1000.0 / baudrate) * 10.0
+        self.simulator.host_baud = baudrate
+        self.is_open = True
+        return True
+
+    def getBytesAvailable(self):
+        return len(self.simulator.responses)
+
+    def readPort(self, length):
+        responses = self.simulator.responses
+        data = bytes(responses[:length])
+        del responses[:length]
+        return data
+
+    def writePort(self, packet):
+        self.simulator.feed(bytes(packet))
+        return len(packet)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dynamixel Protocol 2.0 bus simulator")
+    parser.add_argument('--ids', type=int, nargs='+', default=[1, 2], help="Motor IDs to simulate")
+    parser.add_argument('--baudrate', type=int, default=115200, choices=sorted(BAUD_RATE_TABLE.values()),
+                        help="Initial motor baud rate")
+    parser.add_argument('--return-delay-us', type=int, default=None, help="Return delay time in microseconds")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="Probability of dropping a status packet")
+    args = parser.parse_args()
+
+    simulator = BusSimulator(args.ids, args.baudrate, args.return_delay_us, args.drop_rate)
+    simulator.start()
+    print(f"Simulating motors {args.ids} on {simulator.port_name}")
+    print("Set DEVICENAME in config/config.py to this path. Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+        print(f"Bus statistics: {simulator.stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Pixel to motor-position lookup tables for position-setpoint tracking.
+
+A pinhole model with the camera's field of view and one radial distortion
+term maps every pixel column (row) to the pan (tilt) rotation, in motor
+position units, that brings it to the image center. The tables are built
+once per resolution, so a lookup is two array indexings per frame.
+"""
+import math
+from array import array
+
+from config.config import CAMERA_HFOV_DEG, CAMERA_VFOV_DEG, CAMERA_DISTORTION_K1, POSITION_UNIT_DEG
+
+
+class CameraCalibration:
+    def __init__(self, width, height, hfov_deg=CAMERA_HFOV_DEG, vfov_deg=CAMERA_VFOV_DEG,
+                 distortion_k1=CAMERA_DISTORTION_K1):
+        self.hfov_deg = hfov_deg
+        self.vfov_deg = vfov_deg
+        self.distortion_k1 = distortion_k1
+        self.rebuild(width, height)
+
+    def _table(self, size, fov_deg, sign):
+        center = size / 2
+        focal = center / math.tan(math.radians(fov_deg) / 2)
+        table = array('l', [0] * (size + 1))
+        for pixel in range(size + 1):
+            normalized = (pixel - center) / focal
+            # Undo barrel (k1 < 0) or pincushion (k1 > 0) distortion along the axis
+            normalized *= 1.0 + self.distortion_k1 * normalized * normalized
+            table[pixel] = int(round(sign * math.degrees(math.atan(normalized)) / POSITION_UNIT_DEG))
+        return table
+
+    def rebuild(self, width, height):
+        self.width = width
+        self.height = height
+        # Object left of center needs a positive pan move, below center a positive tilt move
+        self.pan_offsets = self._table(width, self.hfov_deg, -1)
+        self.tilt_offsets = self._table(height, self.vfov_deg, 1)
+
+    def offsets(self, x, y):
+        """Pan and tilt offsets (position units) that center pixel (x, y)"""
+        x = min(max(int(x), 0), self.width)
+        y = min(max(int(y), 0), self.height)
+        return self.pan_offsets[x], self.tilt_offsets[y]
@@ -1,177 +1,584 @@
 #!/usr/bin/env python3
+import threading
 import time
-from dynamixel_sdk import *
+from array import array
 from config.config import *
-from .utils import getch
+from .bus_port import BusPort, PRIORITY_CONTROL, PRIORITY_EMERGENCY
+from .setpoint_mailbox import OFFSETS
+from .bus_calibration import load_bus_calibration
+from .latency_tracer import tracer
+from .async_logger import logger
+from .telemetry import telemetry
+
+# Per-axis homing state
+HOMING_IDLE = 0
+HOMING_MOVING = 1     # profiled move in extended position mode
+HOMING_FINISHING = 2  # switching back to velocity mode
+
+# Position units (0.088 deg) per second for one velocity unit (0.229 rpm)
+POSITION_UNITS_PER_VELOCITY_UNIT = 0.229 * 4096 / 60
+# Ticks of position estimates kept to look back over POSITION_TRACKING_LATENCY_S
+POSITION_HISTORY = 128
 
 class DynamixelController:
-    def __init__(self):
-        self.portHandler = PortHandler(DEVICENAME)
-        self.packetHandler = PacketHandler(PROTOCOL_VERSION)
+    def __init__(self, device_name=None, axes=AXES, port_handler=None):
+        # device_name overrides the port of every axis (single bus, e.g. the simulator);
+        # port_handler replaces the serial PortHandler of a single bus (e.g. FakePortHandler),
+        # or of several given as {port name: handler}
+        self.axes = [dict(axis, port=device_name or axis['port']) for axis in axes]
+        n_axes = len(self.axes)
         
-    def initialize(self):
-        if not self.portHandler.openPort():
-            print("Failed to open the port")
-            print("Press any key to terminate...")
-            getch()
-            return False
+        # Array-backed per-axis state, indexed by position in the axis table
+        self.axis_ids = array('i', (axis['id'] for axis in self.axes))
+        self.limit_min = array('l', (axis['limits'][0] for axis in self.axes))
+        self.limit_max = array('l', (axis['limits'][1] for axis in self.axes))
+        self.speed_scale = array('d', (axis.get('direction', 1) * axis.get('gain', 1.0) for axis in self.axes))
+        self.roles = [axis.get('role') for axis in self.axes]
+        self.present_position = array('l', [0] * n_axes)
+        self.present_velocity = array('l', [0] * n_axes)  # read only for the status uplink
+        self.position_known = array('b', [0] * n_axes)  # 0 while the last read of the axis failed
+        self.goal_velocity = array('l', [0] * n_axes)
+        self.bound_exceeded = array('b', [0] * n_axes)
+        self.recovering = array('b', [HOMING_IDLE] * n_axes)
+        self.homing_deadline = array('d', [0.0] * n_axes)
+        self.homing_polls = {}
+        self.homing_finish = {}
+        self.next_homing_poll = 0.0
+        # Motor IDs only need to be unique per port (two heads may both use IDs 1 and 2),
+        # so state is kept per axis and an ID is looked up through its port
+        self.axis_index = {}
+        for i, axis in enumerate(self.axes):
+            key = (axis['port'], axis['id'])
+            if key in self.axis_index:
+                raise ValueError(f"Motor {axis['id']} is listed twice on {axis['port']}")
+            self.axis_index[key] = i
+        self.motor_ids = list(self.axis_ids)
+        telemetry.resize(n_axes)
         
-        print("Succeeded to open the port")
+        # Position-setpoint tracking: goals go to the motors, the host keeps an
+        # estimate of each axis (advanced at the profile speed, corrected by
+        # low-rate health checks) and a short history of it for latency lookback
+        self.position_tracking = TRACKING_MODE == 'position'
+        self.direction = array('b', (axis.get('direction', 1) for axis in self.axes))
+        self.goal_position = array('d', [0.0] * n_axes)
+        self.position_estimate = array('d', [0.0] * n_axes)
+        self.estimate_history = [array('d', [0.0] * POSITION_HISTORY) for _ in range(n_axes)]
+        self.estimate_times = array('d', [0.0] * POSITION_HISTORY)
+        self.estimate_head = 0
+        self.last_tick = None
+        self.tick_dt = 0.0
+        # Version of the last setpoint acted on (see src/setpoint_mailbox.py)
+        self.setpoint_version = 0
+        self.profile_speed = max(POSITION_TRACKING_PROFILE_VELOCITY, 1) * POSITION_UNITS_PER_VELOCITY_UNIT
+        self.health_polls = {}
+        self.next_health_check = 0.0
         
-        if not self.portHandler.setBaudRate(BAUDRATE):
-            print("Failed to change the baudrate")
-            print("Press any key to terminate...")
-            getch()
-            return False
+        # One BusPort (and I/O worker) per serial adapter, at its calibrated baud rate if any
+        self.ports = []
+        self.port_of_axis = []
+        ports_by_name = {}
+        calibration = load_bus_calibration()
+        # Ports opened at a stored rate rather than BAUDRATE, see _find_baudrate()
+        self.calibrated_ports = {name for name, stored in calibration.items() if 'baudrate' in stored}
+        for axis in self.axes:
+            if axis['port'] not in ports_by_name:
+                ports_by_name[axis['port']] = BusPort(
+                    axis['port'], [a['id'] for a in self.axes if a['port'] == axis['port']],
+                    port_handler.get(axis['port']) if isinstance(port_handler, dict) else port_handler,
+                    read_velocities=STATUS_UPLINK_RATE_HZ > 0,
+                    baudrate=calibration.get(axis['port'], {}).get('baudrate', BAUDRATE),
+                )
+                self.ports.append(ports_by_name[axis['port']])
+            self.port_of_axis.append(ports_by_name[axis['port']])
         
-        print("Succeeded to change the baudrate")
+        if port_handler is not None and not isinstance(port_handler, dict) and len(self.ports) > 1:
+            raise ValueError("port_handler can only replace the port of a single-bus axis table")
         
-        # Set operating mode to velocity control for both motors
-        if not self.set_operating_mode(DXL_ID_1):
-            return False
-        if not self.set_operating_mode(DXL_ID_2):
-            return False
+        # Ports that failed and are being re-opened by _reconnect()
+        self.ports_down = set()
+        self.reconnect_threads = []
+        self.supervising = True
         
-        if not self.enable_torque(DXL_ID_1):
-            return False
-        print("Dynamixel 1 has been successfully connected")
+        # First bus, for code that talks to a single adapter directly
+        self.portHandler = self.ports[0].portHandler
+        self.packetHandler = self.ports[0].packetHandler
         
-        if not self.enable_torque(DXL_ID_2):
+    def initialize(self):
+        """Open every port and bring its motors up, configuring the ports in parallel"""
+        start = time.monotonic()
+        for port in self.ports:
+            if not port.open(port.baudrate):
+                return False
+        futures = [port.submit(self._init_port, port, True, future=True) for port in self.ports]
+        if not all(future.result() for future in futures):
             return False
-        print("Dynamixel 2 has been successfully connected")
-        
+        logger.info("Bus ready in %.0f ms", (time.monotonic() - start) * 1000)
         return True
     
-    def set_operating_mode(self, dxl_id):
-        # Disable torque first
-        dxl_comm_result, dxl_error = self.packetHandler.write1ByteTxRx(
-            self.portHandler, dxl_id, ADDR_TORQUE_ENABLE, TORQUE_DISABLE
-        )
-        if dxl_comm_result != COMM_SUCCESS:
-            print("%s" % self.packetHandler.getTxRxResult(dxl_comm_result))
-            return False
+    def _init_port(self, port, startup=False):
+        """Discover the motors of one port and configure them, writing only what differs.
         
-        # Set to velocity control mode (1)
-        dxl_comm_result, dxl_error = self.packetHandler.write1ByteTxRx(
-            self.portHandler, dxl_id, 11, 1  # Operating mode address = 11, velocity mode = 1
-        )
-        if dxl_comm_result != COMM_SUCCESS:
-            print("%s" % self.packetHandler.getTxRxResult(dxl_comm_result))
+        Runs on the port's I/O worker, at startup and after a reconnect.
+        """
+        found = port.ping_motors()
+        missing = [dxl_id for dxl_id in port.dxl_ids if dxl_id not in found]
+        if missing and startup and port.device_name in self.calibrated_ports and self._find_baudrate(port):
+            missing = []
+        if missing:
+            logger.error("No answer from motor(s) %s on %s at %d bps", missing, port.device_name,
+                         port.baudrate, interval=1.0)
             return False
-        elif dxl_error != 0:
-            print("%s" % self.packetHandler.getRxPacketError(dxl_error))
+        config = port.read_configuration()
+        if config is None:
             return False
         
-        print(f"Motor {dxl_id} set to velocity control mode")
+        now = time.monotonic()
+        for i, dxl_id in enumerate(self.axis_ids):
+            if self.port_of_axis[i] is not port:
+                continue
+            self.recovering[i] = HOMING_IDLE
+            self.position_known[i] = 0
+            if self.position_tracking:
+                if not self._start_position_tracking(i, config[dxl_id], now):
+                    return False
+                continue
+            if not port.start_velocity_mode(dxl_id, config[dxl_id]):
+                return False
+            logger.info("Dynamixel %d has been successfully connected", dxl_id)
+        self.homing_polls.pop(port, None)
+        
+        if not self.position_tracking:
+            # Registers kept from before (a previous run or the glitch) may hold a speed
+            port.set_goal_velocities({dxl_id: 0 for dxl_id in port.dxl_ids})
+            for i, dxl_id in enumerate(self.axis_ids):
+                if self.port_of_axis[i] is port:
+                    self.goal_velocity[i] = 0
         return True
     
-    def enable_torque(self, dxl_id):
-        dxl_comm_result, dxl_error = self.packetHandler.write1ByteTxRx(
-            self.portHandler, dxl_id, ADDR_TORQUE_ENABLE, TORQUE_ENABLE
-        )
-        if dxl_comm_result != COMM_SUCCESS:
-            print("%s" % self.packetHandler.getTxRxResult(dxl_comm_result))
-            return False
-        elif dxl_error != 0:
-            print("%s" % self.packetHandler.getRxPacketError(dxl_error))
+    def _find_baudrate(self, port):
+        """Look for the motors at BAUDRATE, then at every other rate; True once all answer.
+        
+        The stored calibration goes stale when the motors were moved back or
+        swapped. The port keeps the rate found for reconnects.
+        """
+        calibrated = port.baudrate
+        logger.warning("Motors on %s do not answer at the calibrated %d bps, the bus calibration is stale; "
+                       "scanning (re-run python -m src.bus_calibration)", port.device_name, calibrated)
+        rates = [bps for bps in BAUD_RATE_VALUES if bps != calibrated and port.portHandler.getCFlagBaud(bps) > 0]
+        for baudrate in sorted(rates, key=lambda bps: bps != BAUDRATE):
+            if port.set_baudrate(baudrate) and set(port.dxl_ids).issubset(port.ping_motors()):
+                logger.warning("Motors on %s answer at %d bps", port.device_name, baudrate)
+                return True
+        port.set_baudrate(calibrated)
+        return False
+    
+    def _start_position_tracking(self, i, config, now):
+        """Configure axis i for goal-position tracking, holding its present position"""
+        dxl_id = self.axis_ids[i]
+        port = self.port_of_axis[i]
+        limits = (self.limit_min[i], self.limit_max[i])
+        # Single-turn mode enforces the limits on the motor; ranges outside
+        # 0..4095 need extended mode and are clamped on the host only
+        if 0 <= limits[0] and limits[1] <= 4095:
+            mode = OPERATING_MODE_POSITION
+        else:
+            mode = OPERATING_MODE_EXTENDED_POSITION
+            logger.warning("Motor %d limits %d..%d are outside single-turn range; "
+                           "clamping goals on the host", dxl_id, limits[0], limits[1], interval=60.0)
+        position = port.start_position_tracking(dxl_id, mode, limits, POSITION_TRACKING_PROFILE_VELOCITY,
+                                                POSITION_TRACKING_PROFILE_ACCELERATION, config)
+        if position is None:
             return False
+        self.present_position[i] = position
+        self.position_known[i] = 1
+        self.goal_position[i] = min(max(position, limits[0]), limits[1])
+        self.position_estimate[i] = position
+        for slot in range(POSITION_HISTORY):
+            self.estimate_history[i][slot] = position
+            if not self.estimate_times[slot]:
+                self.estimate_times[slot] = now
+        logger.info("Dynamixel %d has been successfully connected (position tracking, mode %d)", dxl_id, mode)
         return True
     
-    def disable_torque(self, dxl_id):
-        dxl_comm_result, dxl_error = self.packetHandler.write1ByteTxRx(
-            self.portHandler, dxl_id, ADDR_TORQUE_ENABLE, TORQUE_DISABLE
-        )
-        if dxl_comm_result != COMM_SUCCESS:
-            print("%s" % self.packetHandler.getTxRxResult(dxl_comm_result))
-        elif dxl_error != 0:
-            print("%s" % self.packetHandler.getRxPacketError(dxl_error))
+    def _port_lost(self, port):
+        """Stop using a failed port and re-open it in the background; UDP and other ports keep running"""
+        if port in self.ports_down:
+            return
+        self.ports_down.add(port)
+        port.discard_setpoints()
+        logger.error("Lost the bus on %s, reconnecting", port.device_name)
+        thread = threading.Thread(target=self._reconnect, args=(port,),
+                                  name=f"reconnect-{port.device_name}", daemon=True)
+        self.reconnect_threads.append(thread)
+        thread.start()
+    
+    def _reconnect(self, port):
+        lost_at = time.monotonic()
+        attempts = 0
+        while self.supervising:
+            attempts += 1
+            try:
+                if port.call(port.reopen, port.baudrate) and port.call(self._init_port, port):
+                    break
+            except Exception as e:
+                logger.warning("Reconnect attempt on %s failed: %s", port.device_name, e, interval=1.0)
+            time.sleep(BUS_RECONNECT_INTERVAL_S)
         else:
-            print("Dynamixel has been successfully disconnected")
+            return
+        self.ports_down.discard(port)
+        logger.info("Bus on %s back after %.0f ms (%d attempt(s))",
+                    port.device_name, (time.monotonic() - lost_at) * 1000, attempts)
+    
+    def _axis(self, dxl_id):
+        """Axis index of a motor ID that is used on a single port only"""
+        indices = [i for i, axis_id in enumerate(self.axis_ids) if axis_id == dxl_id]
+        if len(indices) != 1:
+            raise ValueError(f"Motor {dxl_id} is {'on several ports' if indices else 'not in the axis table'}; "
+                             "address it by axis index")
+        return indices[0]
+    
+    def _port(self, dxl_id):
+        return self.port_of_axis[self._axis(dxl_id)]
+    
+    def _run_on_ports(self, method, port_args):
+        """Run method(port, *args) on each port's I/O worker and wait for all results"""
+        futures = [
+            port.submit(method, port, *args, priority=PRIORITY_CONTROL, future=True)
+            for port, args in port_args
+        ]
+        return [future.result() for future in futures]
+    
+    def set_operating_mode(self, dxl_id):
+        port = self._port(dxl_id)
+        return port.call(port.set_operating_mode, dxl_id)
+    
+    def enable_torque(self, dxl_id):
+        port = self._port(dxl_id)
+        return port.call(port.enable_torque, dxl_id)
+    
+    def disable_torque(self, dxl_id):
+        port = self._port(dxl_id)
+        port.call(port.disable_torque, dxl_id, priority=PRIORITY_EMERGENCY)
     
     def read_present_position(self, dxl_id):
-        dxl_present_position, dxl_comm_result, dxl_error = self.packetHandler.read4ByteTxRx(
-            self.portHandler, dxl_id, ADDR_PRESENT_POSITION
-        )
-        if dxl_comm_result != COMM_SUCCESS:
-            print("%s" % self.packetHandler.getTxRxResult(dxl_comm_result))
-            return 0
-        elif dxl_error != 0:
-            print("%s" % self.packetHandler.getRxPacketError(dxl_error))
-            return 0
-        else:
-            if dxl_present_position > DXL_MAXIMUM_POSITION_VALUE:
-                dxl_present_position = dxl_present_position - (DXL_MAXIMUM_POSITION_VALUE + 1) * 2
-        return dxl_present_position
+        port = self._port(dxl_id)
+        return port.call(port.read_present_position, dxl_id, priority=PRIORITY_CONTROL)
+    
+    def read_present_positions(self):
+        """Sync-read every live port (in parallel across ports) into present_position.
+        
+        Returns {axis index: position}. Axes that could not be read keep their
+        last position with position_known cleared; a port that keeps failing is
+        handed to the reconnect supervisor.
+        """
+        ports = [port for port in self.ports if port not in self.ports_down]
+        futures = [port.submit(port.read_present_positions, priority=PRIORITY_CONTROL, future=True)
+                   for port in ports]
+        positions = {}
+        for port, future in zip(ports, futures):
+            name = port.device_name
+            try:
+                for dxl_id, position in future.result().items():
+                    positions[self.axis_index[name, dxl_id]] = position
+            except Exception:
+                port.port_error = True
+            if port.lost:
+                self._port_lost(port)
+                continue
+            for dxl_id, velocity in port.present_velocities.items():
+                self.present_velocity[self.axis_index[name, dxl_id]] = velocity
+        for i, position in positions.items():
+            if position is None:
+                self.position_known[i] = 0
+                continue
+            self.present_position[i] = position
+            self.position_known[i] = 1
+        return positions
     
     def set_goal_velocity(self, dxl_id, velocity):
-        # Convert velocity to proper format for Dynamixel (signed 32-bit)
-        if velocity < 0:
-            velocity = velocity + 4294967296  # Convert negative to unsigned 32-bit
-        
-        dxl_comm_result, dxl_error = self.packetHandler.write4ByteTxRx(
-            self.portHandler, dxl_id, ADDR_GOAL_VELOCITY, int(velocity)
-        )
-        if dxl_comm_result != COMM_SUCCESS:
-            print("%s" % self.packetHandler.getTxRxResult(dxl_comm_result))
-        elif dxl_error != 0:
-            print("%s" % self.packetHandler.getRxPacketError(dxl_error))
-        else:
-            print(f"Motor {dxl_id} speed set to {velocity}")
+        self.set_goal_velocities({self._axis(dxl_id): velocity})
+    
+    def set_goal_velocities(self, velocities, frame=None):
+        """Queue {axis index: velocity} without blocking; each port coalesces them into one sync write"""
+        by_port = {}
+        for i, velocity in velocities.items():
+            by_port.setdefault(self.port_of_axis[i], {})[self.axis_ids[i]] = velocity
+            self.goal_velocity[i] = int(velocity)
+        for port, port_velocities in by_port.items():
+            if port not in self.ports_down:
+                port.queue_goal_velocities(port_velocities, frame)
+    
+    def set_goal_positions(self, positions, frame=None):
+        """Queue {axis index: position} clamped to the axis limits, without blocking"""
+        by_port = {}
+        for i, position in positions.items():
+            position = min(max(position, self.limit_min[i]), self.limit_max[i])
+            self.goal_position[i] = position
+            by_port.setdefault(self.port_of_axis[i], {})[self.axis_ids[i]] = int(round(position))
+        for port, port_positions in by_port.items():
+            if port not in self.ports_down:
+                port.queue_goal_positions(port_positions, frame)
+    
+    def emergency_stop(self, disable_torque=False):
+        """Stop every axis ahead of all queued bus traffic; returns one Future per port.
+        
+        Ports whose I/O worker never started (the open failed) are skipped: nothing
+        would ever run their commands, and their motors never got a setpoint.
+        """
+        for i in range(len(self.goal_velocity)):
+            self.goal_velocity[i] = 0
+        return [port.emergency_stop(disable_torque) for port in self.ports
+                if port not in self.ports_down and port.worker.running]
+    
+    def set_axis_velocity(self, name, velocity):
+        """Command an auxiliary axis (e.g. zoom/focus) by name, applying direction and gain"""
+        for i, axis in enumerate(self.axes):
+            if axis['name'] == name:
+                self.set_goal_velocities({i: int(round(velocity * self.speed_scale[i]))})
+                return True
+        return False
+    
+    def _axes_with_role(self, role):
+        return [i for i, axis_role in enumerate(self.roles) if axis_role == role]
     
     def move_to_middle_position(self, input_handler):
+        """Home the out-of-bounds axes to the middle of their limits without blocking"""
         input_handler.reset_speeds()
-        print("Moving to middle position")
-        
-        dxl_position_1 = self.read_present_position(DXL_ID_1)
-        dxl_position_2 = self.read_present_position(DXL_ID_2)
         
         if input_handler.horizontal_bound_exceeded:
             input_handler.horizontal_bound_exceeded = False
-            middle_pos_1 = (dxl_limit_points_1[1] + dxl_limit_points_1[0]) / 2
-            if dxl_position_1 > middle_pos_1:
-                self.set_goal_velocity(DXL_ID_1, -POSITION_RETURN_SPEED)
-            else:
-                self.set_goal_velocity(DXL_ID_1, POSITION_RETURN_SPEED)
-        
+            for i in self._axes_with_role('horizontal'):
+                self.bound_exceeded[i] = 1
         if input_handler.vertical_bound_exceeded:
             input_handler.vertical_bound_exceeded = False
-            middle_pos_2 = (dxl_limit_points_2[1] + dxl_limit_points_2[0]) / 2
-            if dxl_position_2 > middle_pos_2:
-                self.set_goal_velocity(DXL_ID_2, -POSITION_RETURN_SPEED)
-            else:
-                self.set_goal_velocity(DXL_ID_2, POSITION_RETURN_SPEED)
+            for i in self._axes_with_role('vertical'):
+                self.bound_exceeded[i] = 1
+        
+        flagged = [i for i in range(len(self.axis_ids)) if self.bound_exceeded[i]]
+        if not flagged:
+            if self.position_tracking:
+                self.set_goal_positions({i: self.position_estimate[i] for i in range(len(self.axis_ids))})
+                return
+            self.set_goal_velocities({i: 0 for i in range(len(self.axis_ids)) if not self.recovering[i]})
+            return
+        logger.info("Moving to middle position")
+        for i in flagged:
+            self.bound_exceeded[i] = 0
+        self.start_homing(flagged)
+    
+    def start_homing(self, indices=None):
+        """Start on-motor profiled moves of the given axes (default all) to the middle of their limits.
         
-        time.sleep(0.5)
-        self.set_goal_velocity(DXL_ID_1, 0)
-        self.set_goal_velocity(DXL_ID_2, 0)
+        Travel time follows the distance through the Profile Velocity/Acceleration
+        registers; check_bounds_and_stop() polls Moving/In-Position and puts each
+        axis back into velocity mode when it has arrived.
+        """
+        if indices is None:
+            indices = range(len(self.axis_ids))
+        if self.position_tracking:
+            # Already in position mode: the middle is just another goal
+            self.set_goal_positions({i: (self.limit_min[i] + self.limit_max[i]) / 2 for i in indices})
+            logger.info("Homing motors %s", [self.axis_ids[i] for i in indices])
+            return
+        now = time.monotonic()
+        # Profile Velocity in position units (0.088 deg) per second
+        speed = max(POSITION_RETURN_SPEED, 1) * POSITION_UNITS_PER_VELOCITY_UNIT
+        for i in indices:
+            if self.recovering[i] or self.port_of_axis[i] in self.ports_down:
+                continue
+            dxl_id = self.axis_ids[i]
+            middle = int(round((self.limit_min[i] + self.limit_max[i]) / 2))
+            self.recovering[i] = HOMING_MOVING
+            travel_time = abs(self.present_position[i] - middle) / speed
+            self.homing_deadline[i] = now + travel_time + POSITION_RETURN_TIMEOUT
+            self.goal_velocity[i] = 0
+            port = self.port_of_axis[i]
+            port.submit(port.start_profiled_move, dxl_id, middle,
+                        POSITION_RETURN_SPEED, POSITION_RETURN_ACCELERATION)
+            logger.info("Homing motor %d to %d", dxl_id, middle)
+        self.next_homing_poll = now + POSITION_RETURN_POLL_INTERVAL
+    
+    def _update_homing(self):
+        """Advance homing from the results of asynchronous Moving/In-Position polls"""
+        for i, future in list(self.homing_finish.items()):
+            if future.done():
+                del self.homing_finish[i]
+                self.recovering[i] = HOMING_IDLE
+                if future.exception() is not None or not future.result():
+                    logger.error("Motor %d did not return to velocity mode", self.axis_ids[i])
+        
+        now = time.monotonic()
+        for port, future in list(self.homing_polls.items()):
+            if not future.done():
+                continue
+            del self.homing_polls[port]
+            status = future.result() if future.exception() is None else None
+            for i, dxl_id in enumerate(self.axis_ids):
+                if self.recovering[i] != HOMING_MOVING or self.port_of_axis[i] is not port:
+                    continue
+                moving, moving_status = status.get(dxl_id, (1, 0)) if status else (1, 0)
+                arrived = not moving and moving_status & MOVING_STATUS_IN_POSITION
+                if not arrived and now < self.homing_deadline[i]:
+                    continue
+                if arrived:
+                    logger.info("Motor %d homed", dxl_id)
+                else:
+                    logger.warning("Motor %d homing timed out", dxl_id)
+                self.recovering[i] = HOMING_FINISHING
+                self.homing_finish[i] = port.submit(port.finish_profiled_move, dxl_id, future=True)
+        
+        if now < self.next_homing_poll:
+            return
+        self.next_homing_poll = now + POSITION_RETURN_POLL_INTERVAL
+        moving_ids = {}
+        for i, dxl_id in enumerate(self.axis_ids):
+            if self.recovering[i] == HOMING_MOVING:
+                moving_ids.setdefault(self.port_of_axis[i], []).append(dxl_id)
+        for port, dxl_ids in moving_ids.items():
+            if port not in self.homing_polls and port not in self.ports_down:
+                self.homing_polls[port] = port.submit(port.read_moving_status, dxl_ids, future=True)
+    
+    def _advance_position_estimate(self):
+        """Move the host-side position estimate toward the goals at the profile speed"""
+        now = time.monotonic()
+        self.tick_dt = now - self.last_tick if self.last_tick is not None else 0.0
+        self.last_tick = now
+        step = self.profile_speed * self.tick_dt
+        head = (self.estimate_head + 1) % POSITION_HISTORY
+        for i in range(len(self.axis_ids)):
+            error = self.goal_position[i] - self.position_estimate[i]
+            self.position_estimate[i] += min(max(error, -step), step)
+            self.estimate_history[i][head] = self.position_estimate[i]
+        self.estimate_times[head] = now
+        self.estimate_head = head
+        return now
+    
+    def _estimate_at(self, when):
+        """History slot of the newest estimate taken at or before time when"""
+        slot = self.estimate_head
+        for _ in range(POSITION_HISTORY - 1):
+            if self.estimate_times[slot] <= when:
+                return slot
+            slot = (slot - 1) % POSITION_HISTORY
+        return slot
+    
+    def _check_position_health(self, now):
+        """Low-rate Present Position read replacing the per-tick poll in position mode"""
+        for port, future in list(self.health_polls.items()):
+            if not future.done():
+                continue
+            del self.health_polls[port]
+            if future.exception() is not None:
+                port.port_error = True
+            if port.lost:
+                self._port_lost(port)
+                continue
+            for dxl_id, position in future.result().items():
+                i = self.axis_index[port.device_name, dxl_id]
+                if position is None:
+                    self.position_known[i] = 0
+                    continue
+                self.position_known[i] = 1
+                self.present_position[i] = position
+                self.present_velocity[i] = port.present_velocities.get(dxl_id, 0)
+                self.position_estimate[i] = position
+                if position < self.limit_min[i] or position > self.limit_max[i]:
+                    # Goals are always clamped, so the axis was pushed or started outside
+                    logger.warning("Motor %d out of bounds: %d", dxl_id, position, interval=1.0)
+                    self.set_goal_positions({i: position})
+        
+        if now < self.next_health_check:
+            return
+        self.next_health_check = now + 1.0 / POSITION_HEALTH_CHECK_HZ
+        for port in self.ports:
+            if port not in self.health_polls and port not in self.ports_down:
+                self.health_polls[port] = port.submit(port.read_present_positions, future=True)
     
     def check_bounds_and_stop(self, input_handler):
-        dxl_position_1 = self.read_present_position(DXL_ID_1)
-        dxl_position_2 = self.read_present_position(DXL_ID_2)
-        
-        if (dxl_position_2 < dxl_limit_points_2[0] or 
-            dxl_position_2 > dxl_limit_points_2[1]):
-            input_handler.vertical_speed = 0
-            self.set_goal_velocity(DXL_ID_2, 0)
-            print(f"Motor 2 out of bounds: {dxl_position_2}")
-            input_handler.vertical_bound_exceeded = True
-            self.move_to_middle_position(input_handler)
+        if self.position_tracking:
+            self._check_position_health(self._advance_position_estimate())
+            if telemetry.enabled:
+                telemetry.begin_tick(self.present_position)
+            return
+        if self.homing_polls or self.homing_finish or HOMING_MOVING in self.recovering:
+            self._update_homing()
+        self.read_present_positions()
+        if telemetry.enabled:
+            telemetry.begin_tick(self.present_position)
+        
+        stopped = {}
+        for i, dxl_id in enumerate(self.axis_ids):
+            # Unknown positions (failed reads) never trigger a recovery
+            if self.recovering[i] or not self.position_known[i]:
+                continue
+            position = self.present_position[i]
+            if position < self.limit_min[i] or position > self.limit_max[i]:
+                stopped[i] = 0
+                self.bound_exceeded[i] = 1
+                logger.warning("Motor %d out of bounds: %d", dxl_id, position)
         
-        if (dxl_position_1 < dxl_limit_points_1[0] or 
-            dxl_position_1 > dxl_limit_points_1[1]):
-            input_handler.horizontal_speed = 0
-            self.set_goal_velocity(DXL_ID_1, 0)
-            print(f"Motor 1 out of bounds: {dxl_position_1}")
-            input_handler.horizontal_bound_exceeded = True
+        if stopped:
+            self.set_goal_velocities(stopped)
+            # Clears the speed setpoints through the mailbox (reset_speeds), so the
+            # stop gets a version of its own and cannot be overwritten unseen
             self.move_to_middle_position(input_handler)
     
+    def _update_goal_positions(self, input_handler):
+        goals = {}
+        version, kind, horizontal_speed, vertical_speed, pan_offset, tilt_offset = input_handler.setpoints.read()
+        changed = version != self.setpoint_version
+        self.setpoint_version = version
+        if changed and kind == OFFSETS:
+            # The offsets were measured on a frame taken where the axes were a latency ago
+            slot = self._estimate_at(time.monotonic() - POSITION_TRACKING_LATENCY_S)
+            for i, role in enumerate(self.roles):
+                offset = (pan_offset if role == 'horizontal'
+                          else tilt_offset if role == 'vertical' else 0)
+                if offset:
+                    goals[i] = self.estimate_history[i][slot] + self.direction[i] * offset
+        elif changed or horizontal_speed or vertical_speed:
+            # MANUAL jog: integrate the speeds into the goals; zero speeds hold the axes
+            for i, role in enumerate(self.roles):
+                speed = (horizontal_speed if role == 'horizontal'
+                         else vertical_speed if role == 'vertical' else 0)
+                if speed:
+                    step = speed * self.speed_scale[i] * POSITION_UNITS_PER_VELOCITY_UNIT * self.tick_dt
+                    goals[i] = self.goal_position[i] + step
+                elif role is not None:
+                    goals[i] = self.position_estimate[i]
+        if goals:
+            self.set_goal_positions(goals, tracer.take_published())
+    
     def update_motor_speeds(self, input_handler):
-        if input_handler.speed_change:
-            self.set_goal_velocity(DXL_ID_1, input_handler.horizontal_speed)
-            self.set_goal_velocity(DXL_ID_2, input_handler.vertical_speed)
-            input_handler.speed_change = False
+        if self.position_tracking:
+            self._update_goal_positions(input_handler)
+        elif input_handler.setpoints.version != self.setpoint_version:
+            version, _, horizontal_speed, vertical_speed, _, _ = input_handler.setpoints.read()
+            self.setpoint_version = version
+            velocities = {}
+            for i, role in enumerate(self.roles):
+                if self.recovering[i]:
+                    continue
+                if role == 'horizontal':
+                    velocities[i] = int(round(horizontal_speed * self.speed_scale[i]))
+                elif role == 'vertical':
+                    velocities[i] = int(round(vertical_speed * self.speed_scale[i]))
+            self.set_goal_velocities(velocities, tracer.take_published())
+        if telemetry.enabled:
+            telemetry.end_tick(self.goal_velocity, input_handler.mode,
+                               self.goal_position if self.position_tracking else None)
     
     def cleanup(self):
-        self.disable_torque(DXL_ID_1)
-        self.disable_torque(DXL_ID_2)
-        self.portHandler.closePort()
\ No newline at end of file
+        self.supervising = False
+        for thread in self.reconnect_threads:
+            thread.join()
+        for future in self.emergency_stop(disable_torque=True):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error("Emergency stop failed: %s", e)
+        for port in self.ports:
+            try:
+                port.close()
+            except Exception as e:
+                logger.error("Closing %s failed: %s", port.device_name, e)
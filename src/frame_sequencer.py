@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Per-target FRAME sequencing and staleness gate for vision messages.
+
+UDP may reorder, duplicate or hold back datagrams; after a network hiccup a
+burst of old observations arrives at once. Each target ID gets a slot with
+the newest FRAME acted on and its lateness: how much later than the best
+latency seen for that target it arrived. Lateness carries over from one
+accepted frame to the next as the arrival interval minus the FRAME step
+times the frame period. The period is estimated per target from the same
+FRAME/arrival pairs, so a camera running slower or faster than
+VISION_FRAME_RATE does not pile up lateness. A message later than max_age_s
+is stale. Late frames that keep coming for longer than a burst lasts mean
+the baseline is off, and it is re-seeded. Checks are constant time and
+allocation free.
+"""
+import time
+from array import array
+
+from config.config import VISION_FRAME_RATE, PREDICTOR_MAX_TARGETS, FRAME_MAX_AGE_S
+from .target_slots import TargetSlots
+
+# A backward FRAME jump spanning this much camera time, or after this much
+# silence, is a restarted vision server rather than reordering
+FRAME_RESTART_GAP_S = 10.0
+FRAME_RESTART_SILENCE_S = 1.0
+# How fast the latency baseline may rise (s/s), to follow a lasting change in network delay
+BASELINE_DRIFT = 1.0e-3
+# Camera time the frame period estimate averages over once warmed up
+PERIOD_WINDOW_S = 4.0
+# Re-seed the baseline after this much camera time of late frames in a row,
+# spread over at least FRAME_RESEED_SPAN_S (the burst after a hiccup arrives all at once)
+FRAME_RESEED_LATE_S = 0.5
+FRAME_RESEED_SPAN_S = 0.25
+
+
+class FrameSequencer:
+    def __init__(self, max_targets=PREDICTOR_MAX_TARGETS, max_age_s=FRAME_MAX_AGE_S,
+                 frame_rate=VISION_FRAME_RATE):
+        self.max_targets = max_targets
+        self.max_age_s = max_age_s
+        self.frame_period = 1.0 / frame_rate
+        # Frame counts for this camera's rate
+        self.restart_gap = max(int(FRAME_RESTART_GAP_S * frame_rate), 1)
+        self.period_window = max(int(PERIOD_WINDOW_S * frame_rate), 1)
+        self.reseed_late = max(int(FRAME_RESEED_LATE_S * frame_rate), 1)
+        self.slots = TargetSlots(max_targets)
+        self.last_frames = array('q', [0] * max_targets)
+        self.last_times = array('d', [0.0] * max_targets)  # arrival of the last accepted frame
+        self.lateness = array('d', [0.0] * max_targets)  # of the last accepted frame
+        self.periods = array('d', [0.0] * max_targets)
+        self.period_weights = array('d', [0.0] * max_targets)  # frames in the period average
+        self.late_counts = array('q', [0] * max_targets)  # late frames in a row
+        self.late_since = array('d', [0.0] * max_targets)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.accepted = 0
+        self.duplicates = 0
+        self.out_of_order = 0
+        self.late = 0
+        self.gaps = 0
+        self.missing = 0  # frames skipped over by the gaps
+        self.restarts = 0
+        self.reseeds = 0
+
+    def _start(self, slot, frame, now):
+        self.last_frames[slot] = frame
+        self.last_times[slot] = now
+        self.lateness[slot] = 0.0
+        self.periods[slot] = self.frame_period
+        self.period_weights[slot] = 0.0
+        self.late_counts[slot] = 0
+        self.accepted += 1
+        return True
+
+    def accept(self, target_id, frame, now=None):
+        """True if this observation is the freshest of its target and not stale"""
+        if now is None:
+            now = time.monotonic()
+        key = target_id if target_id is not None else 0
+        slot = self.slots.get(key)
+        if slot is None:
+            return self._start(self.slots.add(key, now), frame, now)
+        self.slots.touch(slot, now)
+
+        step = frame - self.last_frames[slot]
+        if step <= 0:
+            if step == 0:
+                self.duplicates += 1
+                return False
+            if step > -self.restart_gap and now - self.last_times[slot] < FRAME_RESTART_SILENCE_S:
+                self.out_of_order += 1
+                return False
+            self.restarts += 1
+            return self._start(slot, frame, now)
+
+        elapsed = now - self.last_times[slot]
+        period = self.periods[slot]
+        lateness = self.lateness[slot] + elapsed - step * period - BASELINE_DRIFT * elapsed
+        if lateness > self.max_age_s:
+            late_count = self.late_counts[slot]
+            if late_count == 0:
+                self.late_since[slot] = now
+            elif late_count + 1 >= self.reseed_late and now - self.late_since[slot] >= FRAME_RESEED_SPAN_S:
+                # Late for longer than a burst lasts: the baseline is off, not the frames
+                self.reseeds += 1
+                return self._start(slot, frame, now)
+            # Newer than anything acted on, but held back in the network: skip it
+            # without advancing, so a fresh frame of the same burst still passes
+            self.late_counts[slot] = late_count + 1
+            self.late += 1
+            return False
+        self.lateness[slot] = lateness if lateness > 0.0 else 0.0
+        self.late_counts[slot] = 0
+
+        # Step-weighted running average of the frame period. The errors of a
+        # burst add up to its true duration, so bursts do not bias it.
+        weight = min(self.period_weights[slot] + step, max(self.period_window, step))
+        self.period_weights[slot] = weight
+        period += (elapsed - step * period) / weight
+        self.periods[slot] = min(max(period, 0.5 * self.frame_period), 2.0 * self.frame_period)
+        self.last_times[slot] = now
+
+        if step > 1:
+            self.gaps += 1
+            self.missing += step - 1
+        self.last_frames[slot] = frame
+        self.accepted += 1
+        return True
+
+    def reset(self):
+        self.slots.clear()
+
+    def stats(self):
+        return {
+            'accepted': self.accepted,
+            'duplicates': self.duplicates,
+            'out_of_order': self.out_of_order,
+            'late': self.late,
+            'gaps': self.gaps,
+            'missing': self.missing,
+            'restarts': self.restarts,
+            'reseeds': self.reseeds,
+        }
@@ -1,12 +1,30 @@
 #!/usr/bin/env python3
-from config.config import SPEED_INCREMENT
+import struct
+import time
+from config.config import (
+    SPEED_INCREMENT, TARGET_PREDICTION, FEEDFORWARD_GAIN, VELOCITY_UNIT_DEG_S,
+    CAMERA_HFOV_DEG, CAMERA_VFOV_DEG, DXL_ID_1, DXL_ID_2, PID_CONTROL, PID_PRESET,
+    PID_TARGET_TIMEOUT_S, TRACKING_MODE, FRAME_SEQUENCING, SETPOINT_SHARED_MEMORY, TARGET_SELECTION,
+)
+from . import udp_protocol
+from .latency_tracer import tracer
+from .async_logger import logger
+from .telemetry import telemetry
+from .camera_calibration import CameraCalibration
+from .target_predictor import TargetPredictor
+from .frame_sequencer import FrameSequencer
+from .target_table import TargetTable
+from .setpoint_mailbox import SetpointMailbox
+from .pid_tuner import MultiAxisPID
+from .pid_presets import PIDPresets
 
 class InputHandler:
     def __init__(self):
+        # Working speeds; the control loop only sees what is published to self.setpoints
         self.horizontal_speed = 0
         self.vertical_speed = 0
+        self.setpoints = SetpointMailbox(SETPOINT_SHARED_MEMORY)
         self.escaped = False
-        self.speed_change = False
         self.horizontal_bound_exceeded = False
         self.vertical_bound_exceeded = False
         self.mode = "MANUAL"  # Default mode
@@ -22,130 +40,278 @@ class InputHandler:
         self.auto_speed = 30  # Fixed speed for auto mode movements
         self.min_auto_speed = 5  # Minimum speed to prevent stalling
         self.max_auto_speed = 30  # Maximum speed for fast movements
+        
+        # Act only on the freshest observation of each target
+        self.sequencer = FrameSequencer() if FRAME_SEQUENCING else None
+        
+        # With several objects reported, follow one of them instead of every message
+        self.targets = TargetTable() if TARGET_SELECTION else None
+        if self.targets is not None:
+            self.targets.set_center(self.camera_width / 2, self.camera_height / 2)
+        
+        # Optional latency compensation: aim at the predicted position and
+        # add a feed-forward term for the target's velocity
+        self.predictor = TargetPredictor() if TARGET_PREDICTION else None
+        self.camera_hfov_deg = CAMERA_HFOV_DEG
+        self.camera_vfov_deg = CAMERA_VFOV_DEG
+        self.feedforward_gain = FEEDFORWARD_GAIN
+        
+        # Optional PID law: frames only update the error, the control loop
+        # runs the PID at its own rate through update_auto_control()
+        self.pid = None
+        if PID_CONTROL:
+            self.pid = MultiAxisPID((DXL_ID_1, DXL_ID_2))
+            PIDPresets().apply_preset(PID_PRESET, self.pid)
+        self.pid_error_x = 0.0
+        self.pid_error_y = 0.0
+        self.pid_feedforward_h = 0.0
+        self.pid_feedforward_v = 0.0
+        self.pid_target_time = None
+        self.pid_traced_frame = None  # frame whose setpoint a PID tick last traced
+        self.last_frame = None
+        
+        # Position-setpoint law: pixel -> goal offset tables, applied by the controller
+        self.position_tracking = TRACKING_MODE == 'position'
+        self.calibration = CameraCalibration(self.camera_width, self.camera_height)
+        
+        # Table-driven dispatch for text (COMMAND:arg:...) and binary messages
+        self._text_handlers = {
+            'MODE_CHANGED': self._on_mode_changed,
+            'OBJECT_SELECTED': self._on_object_selected,
+            'SELECTED_COORDS': self._on_selected_coords,
+            'TOUCH_MISS': self._on_touch_miss,
+            'BUTTON_PRESSED': self._on_button_pressed,
+        }
+        self._binary_handlers = {
+            udp_protocol.MSG_COORDS: self._on_binary_coords,
+            udp_protocol.MSG_DETECTION: self._on_binary_detection,
+            udp_protocol.MSG_MODE: self._on_binary_mode,
+            udp_protocol.MSG_BUTTON: self._on_binary_button,
+            udp_protocol.MSG_TOUCH_MISS: self._on_binary_touch_miss,
+        }
+        # Direction -> (vertical speed delta, horizontal speed delta)
+        self._direction_actions = {
+            'up': (-SPEED_INCREMENT, 0),
+            'down': (SPEED_INCREMENT, 0),
+            'left': (0, SPEED_INCREMENT),
+            'right': (0, -SPEED_INCREMENT),
+        }
     
     def on_key_press(self, event):
         if event.name == 'w' or event.name == 'up':
-            self.vertical_speed -= SPEED_INCREMENT
-            self.speed_change = True
-            print("Up/W pressed")
+            self._adjust_speeds(-SPEED_INCREMENT, 0)
+            logger.info("Up/W pressed")
         elif event.name == 's' or event.name == 'down':
-            self.vertical_speed += SPEED_INCREMENT
-            self.speed_change = True
-            print("Down/S pressed")
+            self._adjust_speeds(SPEED_INCREMENT, 0)
+            logger.info("Down/S pressed")
         elif event.name == 'a' or event.name == 'left':
-            self.horizontal_speed += SPEED_INCREMENT
-            self.speed_change = True
-            print("Left/A pressed")
+            self._adjust_speeds(0, SPEED_INCREMENT)
+            logger.info("Left/A pressed")
         elif event.name == 'd' or event.name == 'right':
-            self.horizontal_speed -= SPEED_INCREMENT
-            self.speed_change = True
-            print("Right/D pressed")
+            self._adjust_speeds(0, -SPEED_INCREMENT)
+            logger.info("Right/D pressed")
         elif event.name == 'esc' or event.name == 'q':
-            print("Escape/Q pressed, exiting...")
+            logger.info("Escape/Q pressed, exiting...")
             self.escaped = True
             return False
     
     def on_udp_message(self, data):
+        if udp_protocol.is_binary(data):
+            handler = self._binary_handlers.get(data[2])
+            if handler is not None and data[1] == udp_protocol.VERSION:
+                return handler(data)
+            return
+        
         message = data.decode('utf-8')
-        print(f"Received UDP message: {message}")
+        if logger.debug_enabled:
+            logger.debug("Received UDP message: %s", message)
         
         # Parse messages with colons
         if ':' in message:
             parts = message.split(':')
-            command_type = parts[0]
-            
-            # Handle mode changes
-            if command_type == 'MODE_CHANGED':
-                self.mode = parts[1]
-                print(f"Mode changed to: {self.mode}")
-                if self.mode == "AUTO":
-                    self.reset_speeds()  # Stop motors when switching to AUTO
-                return
-            
-            # Handle object detection in AUTO mode
-            elif command_type == 'OBJECT_SELECTED' or command_type == 'SELECTED_COORDS':
-                if self.mode == "AUTO":
-                    self._handle_object_tracking(message)
-                return
-            
-            # Handle touch miss - stop motors immediately
-            elif command_type == 'TOUCH_MISS':
-                print("TOUCH_MISS received - stopping motors")
-                self.horizontal_speed = 0
-                self.vertical_speed = 0
-                self.speed_change = True
-                return
-            
-            # Handle manual button presses (works in any mode)
-            elif command_type == 'BUTTON_PRESSED':
-                direction = parts[1].lower()
-                if direction == 'up':
-                    self.vertical_speed -= SPEED_INCREMENT
-                    self.speed_change = True
-                    print("Up arrow pressed via UDP")
-                elif direction == 'down':
-                    self.vertical_speed += SPEED_INCREMENT
-                    self.speed_change = True
-                    print("Down arrow pressed via UDP")
-                elif direction == 'left':
-                    self.horizontal_speed += SPEED_INCREMENT
-                    self.speed_change = True
-                    print("Left arrow pressed via UDP")
-                elif direction == 'right':
-                    self.horizontal_speed -= SPEED_INCREMENT
-                    self.speed_change = True
-                    print("Right arrow pressed via UDP")
-                elif direction == 'esc' or direction == 'stop':
-                    print("Stop/Escape pressed via UDP")
-                    self.escaped = True
-                    return False
+            handler = self._text_handlers.get(parts[0])
+            if handler is not None:
+                return handler(parts)
         
         # Handle simple messages (backward compatibility) - works in any mode
         else:
-            if message.lower() == 'up':
-                self.vertical_speed -= SPEED_INCREMENT
-                self.speed_change = True
-                print("Up arrow pressed via UDP")
-            elif message.lower() == 'down':
-                self.vertical_speed += SPEED_INCREMENT
-                self.speed_change = True
-                print("Down arrow pressed via UDP")
-            elif message.lower() == 'left':
-                self.horizontal_speed += SPEED_INCREMENT
-                self.speed_change = True
-                print("Left arrow pressed via UDP")
-            elif message.lower() == 'right':
-                self.horizontal_speed -= SPEED_INCREMENT
-                self.speed_change = True
-                print("Right arrow pressed via UDP")
-            elif message.lower() == 'esc':
-                print("Escape pressed via UDP, exiting...")
+            direction = message.lower()
+            if direction == 'esc':
+                logger.info("Escape pressed via UDP, exiting...")
                 self.escaped = True
                 return False
+            self._apply_direction(direction)
+    
+    def _on_mode_changed(self, parts):
+        self._set_mode(parts[1])
+    
+    def _set_mode(self, mode):
+        self.mode = mode
+        logger.info("Mode changed to: %s", self.mode)
+        if self.mode == "AUTO":
+            self.reset_speeds()  # Stop motors when switching to AUTO
+    
+    def _on_selected_coords(self, parts):
+        # Handle object detection in AUTO mode
+        if self.mode == "AUTO":
+            self._handle_object_tracking(parts)
+    
+    def _on_object_selected(self, parts):
+        # The operator picked an object: follow its ID whatever the selection policy says
+        if self.targets is not None and len(parts) >= 3 and parts[1] == 'ID':
+            try:
+                self.targets.lock(int(parts[2]))
+                logger.info("Locked on target %s", parts[2])
+            except ValueError:
+                pass
+        self._on_selected_coords(parts)
+    
+    def _on_touch_miss(self, parts):
+        # Handle touch miss - stop motors immediately
+        logger.info("TOUCH_MISS received - stopping motors")
+        if self.targets is not None:
+            self.targets.unlock()
+        self._set_speeds(0, 0)
+    
+    def _on_button_pressed(self, parts):
+        # Handle manual button presses (works in any mode)
+        direction = parts[1].lower()
+        if direction == 'esc' or direction == 'stop':
+            logger.info("Stop/Escape pressed via UDP")
+            self.escaped = True
+            return False
+        self._apply_direction(direction)
+    
+    def _apply_direction(self, direction):
+        action = self._direction_actions.get(direction)
+        if action is None:
+            return
+        self._adjust_speeds(*action)
+        logger.info("%s arrow pressed via UDP", direction.capitalize())
+    
+    def _adjust_speeds(self, vertical_delta, horizontal_delta):
+        # Keyboard and UDP threads both step the speeds: read-modify-write under the write lock
+        with self.setpoints.write_lock:
+            self.vertical_speed += vertical_delta
+            self.horizontal_speed += horizontal_delta
+            self.setpoints.publish_speeds(self.horizontal_speed, self.vertical_speed)
+    
+    def _set_speeds(self, horizontal_speed, vertical_speed):
+        with self.setpoints.write_lock:
+            self.horizontal_speed = horizontal_speed
+            self.vertical_speed = vertical_speed
+            self.setpoints.publish_speeds(horizontal_speed, vertical_speed)
+    
+    def _on_binary_coords(self, data):
+        try:
+            _, _, _, target_id, x_center, y_center, frame = udp_protocol.COORDS.unpack_from(data)
+        except struct.error:
+            return
+        if self.mode == "AUTO":
+            self._track_object(target_id, x_center, y_center, frame)
+    
+    def _on_binary_detection(self, data):
+        try:
+            (_, _, _, target_id, x_center, y_center, frame,
+             width, height, confidence) = udp_protocol.DETECTION.unpack_from(data)
+        except struct.error:
+            return
+        if self.mode == "AUTO":
+            self._track_object(target_id, x_center, y_center, frame, width * height, confidence / 100.0)
+    
+    def _on_binary_mode(self, data):
+        mode = udp_protocol.MODE_CODES.get(data[3]) if len(data) >= udp_protocol.MODE.size else None
+        if mode is not None:
+            self._set_mode(mode)
     
-    def _handle_object_tracking(self, message):
+    def _on_binary_button(self, data):
+        button = udp_protocol.BUTTON_CODES.get(data[3]) if len(data) >= udp_protocol.BUTTON.size else None
+        if button == 'stop':
+            logger.info("Stop/Escape pressed via UDP")
+            self.escaped = True
+            return False
+        if button is not None:
+            self._apply_direction(button)
+    
+    def _on_binary_touch_miss(self, data):
+        self._on_touch_miss(None)
+    
+    def _handle_object_tracking(self, parts):
         """Handle object tracking in AUTO mode"""
         try:
-            # Parse: SELECTED_COORDS:ID:0:X:273:Y:306:FRAME:388
-            parts = message.split(':')
-            
-            # Find X and Y values (these are already the center coordinates)
-            x_center = None
-            y_center = None
-            
-            for i, part in enumerate(parts):
-                if part == 'X' and i + 1 < len(parts):
-                    x_center = int(parts[i + 1])
-                elif part == 'Y' and i + 1 < len(parts):
-                    y_center = int(parts[i + 1])
+            # Parse: SELECTED_COORDS:ID:0:X:273:Y:306:FRAME:388[:W:40:H:60:CONF:0.87]
+            if len(parts) >= 9 and parts[3] == 'X' and parts[5] == 'Y' and parts[7] == 'FRAME':
+                # Fixed layout sent by the vision server: index directly
+                if len(parts) == 9:
+                    self._track_object(int(parts[2]), int(parts[4]), int(parts[6]), int(parts[8]))
+                    return
+                fields = dict(zip(parts[9::2], parts[10::2]))
+                self._track_object(int(parts[2]), int(parts[4]), int(parts[6]), int(parts[8]),
+                                   *self._detection_fields(fields))
+                return
             
-            if x_center is not None and y_center is not None:
-                self._center_object(x_center, y_center)
+            # Other field orders: key/value pairs after the command
+            fields = dict(zip(parts[1::2], parts[2::2]))
+            if 'X' in fields and 'Y' in fields:
+                target_id = int(fields['ID']) if 'ID' in fields else None
+                frame = int(fields['FRAME']) if 'FRAME' in fields else None
+                self._track_object(target_id, int(fields['X']), int(fields['Y']), frame,
+                                   *self._detection_fields(fields))
             
         except Exception as e:
-            print(f"Error parsing object tracking message: {e}")
+            logger.warning("Error parsing object tracking message: %s", e, interval=1.0)
+    
+    @staticmethod
+    def _detection_fields(fields):
+        """(size, confidence) from the optional W/H/CONF fields of a text message"""
+        size = int(fields['W']) * int(fields['H']) if 'W' in fields and 'H' in fields else 0
+        confidence = float(fields['CONF']) if 'CONF' in fields else 0.0
+        return size, confidence
+    
+    def _track_object(self, target_id, x_center, y_center, frame, size=0, confidence=0.0):
+        """Act on one observation of a tracked object (already the center coordinates)"""
+        if frame is not None and self.sequencer is not None and not self.sequencer.accept(target_id, frame):
+            return
+        if self.targets is not None and not self.targets.update(target_id, x_center, y_center, frame,
+                                                                size, confidence):
+            return
+        tracer.parsed(frame)
+        self.last_frame = frame
+        version = self.setpoints.sequence
+        if self.predictor is not None:
+            x_pred, y_pred, velocity_x, velocity_y = self.predictor.update(target_id, x_center, y_center, frame)
+            x_pred = min(max(int(x_pred), 0), self.camera_width)
+            y_pred = min(max(int(y_pred), 0), self.camera_height)
+            if self.position_tracking:
+                self._aim_at(x_pred, y_pred)
+            else:
+                self._center_object(x_pred, y_pred, velocity_x, velocity_y)
+        elif self.position_tracking:
+            self._aim_at(x_center, y_center)
+        else:
+            self._center_object(x_center, y_center)
+        if self.setpoints.sequence != version:
+            tracer.setpoint(frame)
+    
+    def _aim_at(self, x_center, y_center):
+        """Position-setpoint law: goal offsets (position units) that bring the object to the center"""
+        if telemetry.enabled:
+            telemetry.target(x_center, y_center, self.last_frame)
+        camera_center_x = self.camera_width // 2
+        camera_center_y = self.camera_height // 2
+        pan_offset, tilt_offset = self.calibration.offsets(x_center, y_center)
+        # Same dead zone as the velocity law: hold the axis while the object is inside it
+        if abs(x_center - camera_center_x) <= self.center_box_width // 2:
+            pan_offset = 0
+        if camera_center_y - self.upper_line_offset <= y_center <= camera_center_y + self.lower_line_offset:
+            tilt_offset = 0
+        if pan_offset or tilt_offset:
+            self.setpoints.publish_offsets(pan_offset, tilt_offset)
+            if logger.debug_enabled:
+                logger.debug("AUTO mode: object at (%d, %d), offsets pan=%d tilt=%d",
+                             x_center, y_center, pan_offset, tilt_offset)
     
-    def _center_object(self, x_center, y_center):
+    def _center_object(self, x_center, y_center, velocity_x=0.0, velocity_y=0.0):
         """Proportional control to keep object in center with smooth approach"""
         camera_center_x = self.camera_width // 2
         camera_center_y = self.camera_height // 2
@@ -158,12 +324,29 @@ class InputHandler:
         upper_line = camera_center_y - self.upper_line_offset
         lower_line = camera_center_y + self.lower_line_offset
         
-        print(f"Object at ({x_center}, {y_center})")
-        print(f"Center box: ({box_left}-{box_right}), Lines: {upper_line}-{lower_line}")
+        if telemetry.enabled:
+            telemetry.target(x_center, y_center, self.last_frame)
         
-        # Reset speeds
-        self.horizontal_speed = 0
-        self.vertical_speed = 0
+        if self.pid is not None:
+            # Error outside the dead zone; update_auto_control() turns it into speeds
+            self.pid_error_x = min(x_center - box_left, 0) + max(x_center - box_right, 0)
+            self.pid_error_y = min(y_center - upper_line, 0) + max(y_center - lower_line, 0)
+            gain = self.feedforward_gain / VELOCITY_UNIT_DEG_S
+            self.pid_feedforward_h = -velocity_x * self.camera_hfov_deg / self.camera_width * gain
+            self.pid_feedforward_v = velocity_y * self.camera_vfov_deg / self.camera_height * gain
+            self.pid_target_time = time.monotonic()
+            return
+        
+        # Per-frame diagnostics cost one flag check unless LOG_LEVEL is DEBUG
+        debug = logger.debug_enabled
+        if debug:
+            logger.debug("Object at (%d, %d)", x_center, y_center)
+            logger.debug("Center box: (%d-%d), Lines: %d-%d", box_left, box_right, upper_line, lower_line)
+        
+        # Speeds are worked out locally and published with the working values under
+        # the write lock below, so a keyboard step cannot interleave with them
+        horizontal_speed = 0
+        vertical_speed = 0
         
         # Proportional horizontal control
         if x_center < box_left:
@@ -174,8 +357,9 @@ class InputHandler:
             # Calculate proportional speed (closer = slower)
             speed_ratio = min(distance / max_distance, 1.0)
             speed = int(self.min_auto_speed + (self.max_auto_speed - self.min_auto_speed) * speed_ratio)
-            self.horizontal_speed = speed  # Move right
-            print(f"Object left of center box (dist: {distance}) - moving right at speed {speed}")
+            horizontal_speed = speed  # Move right
+            if debug:
+                logger.debug("Object left of center box (dist: %d) - moving right at speed %d", distance, speed)
         elif x_center > box_right:
             # Distance from right edge of center box
             distance = x_center - box_right
@@ -184,10 +368,11 @@ class InputHandler:
             # Calculate proportional speed (closer = slower)
             speed_ratio = min(distance / max_distance, 1.0)
             speed = int(self.min_auto_speed + (self.max_auto_speed - self.min_auto_speed) * speed_ratio)
-            self.horizontal_speed = -speed  # Move left
-            print(f"Object right of center box (dist: {distance}) - moving left at speed {speed}")
-        else:
-            print("Object horizontally centered")
+            horizontal_speed = -speed  # Move left
+            if debug:
+                logger.debug("Object right of center box (dist: %d) - moving left at speed %d", distance, speed)
+        elif debug:
+            logger.debug("Object horizontally centered")
         
         # Proportional vertical control
         if y_center < upper_line:
@@ -198,8 +383,9 @@ class InputHandler:
             # Calculate proportional speed (closer = slower)
             speed_ratio = min(distance / max_distance, 1.0)
             speed = int(self.min_auto_speed + (self.max_auto_speed - self.min_auto_speed) * speed_ratio)
-            self.vertical_speed = -speed  # Move up
-            print(f"Object above upper line (dist: {distance}) - moving up at speed {speed}")
+            vertical_speed = -speed  # Move up
+            if debug:
+                logger.debug("Object above upper line (dist: %d) - moving up at speed %d", distance, speed)
         elif y_center > lower_line:
             # Distance from lower line
             distance = y_center - lower_line
@@ -208,30 +394,73 @@ class InputHandler:
             # Calculate proportional speed (closer = slower)
             speed_ratio = min(distance / max_distance, 1.0)
             speed = int(self.min_auto_speed + (self.max_auto_speed - self.min_auto_speed) * speed_ratio)
-            self.vertical_speed = speed  # Move down
-            print(f"Object below lower line (dist: {distance}) - moving down at speed {speed}")
-        else:
-            print("Object vertically centered")
+            vertical_speed = speed  # Move down
+            if debug:
+                logger.debug("Object below lower line (dist: %d) - moving down at speed %d", distance, speed)
+        elif debug:
+            logger.debug("Object vertically centered")
+        
+        # Feed-forward: follow the target's image velocity (px/s) converted to motor units
+        if velocity_x or velocity_y:
+            gain = self.feedforward_gain / VELOCITY_UNIT_DEG_S
+            feedforward_h = -velocity_x * self.camera_hfov_deg / self.camera_width * gain
+            feedforward_v = velocity_y * self.camera_vfov_deg / self.camera_height * gain
+            limit = self.max_auto_speed
+            horizontal_speed = int(min(max(horizontal_speed + feedforward_h, -limit), limit))
+            vertical_speed = int(min(max(vertical_speed + feedforward_v, -limit), limit))
+        
+        with self.setpoints.write_lock:
+            self.horizontal_speed = horizontal_speed
+            self.vertical_speed = vertical_speed
+            if horizontal_speed != 0 or vertical_speed != 0:
+                self.setpoints.publish_speeds(horizontal_speed, vertical_speed)
+        if horizontal_speed != 0 or vertical_speed != 0:
+            if debug:
+                logger.debug("AUTO mode: H=%d, V=%d", horizontal_speed, vertical_speed)
+        elif debug:
+            logger.debug("AUTO mode: Object centered")
+    
+    def update_auto_control(self, dt):
+        """Run one PID step at the control-loop rate (PID law only)"""
+        if self.pid is None or self.mode != "AUTO" or self.pid_target_time is None:
+            return
         
-        if self.horizontal_speed != 0 or self.vertical_speed != 0:
-            self.speed_change = True
-            print(f"AUTO mode: H={self.horizontal_speed}, V={self.vertical_speed}")
+        if time.monotonic() - self.pid_target_time > PID_TARGET_TIMEOUT_S:
+            # Target lost: stop and drop the integral state
+            self.pid_target_time = None
+            self.pid.reset()
+            horizontal_speed = vertical_speed = 0
         else:
-            print("AUTO mode: Object centered")
+            outputs = self.pid.update({DXL_ID_1: self.pid_error_x, DXL_ID_2: self.pid_error_y}, dt)
+            # Object right of center (positive error) needs a negative pan speed
+            horizontal_speed = int(round(self.pid_feedforward_h - outputs[DXL_ID_1]))
+            vertical_speed = int(round(self.pid_feedforward_v + outputs[DXL_ID_2]))
+        
+        if horizontal_speed != self.horizontal_speed or vertical_speed != self.vertical_speed:
+            self._set_speeds(horizontal_speed, vertical_speed)
+            if self.pid_target_time is not None and self.last_frame != self.pid_traced_frame:
+                # Only the first setpoint after a frame; later ticks are the PID settling
+                tracer.setpoint(self.last_frame)
+                self.pid_traced_frame = self.last_frame
     
     def set_camera_resolution(self, width, height):
         """Set camera resolution for centering calculations"""
         self.camera_width = width
         self.camera_height = height
-        print(f"Camera resolution set to {width}x{height}")
+        self.calibration.rebuild(width, height)
+        if self.targets is not None:
+            self.targets.set_center(width / 2, height / 2)
+        logger.info("Camera resolution set to %dx%d", width, height)
     
     def set_center_box_size(self, width, height):
         """Set the size of the center dead zone box"""
         self.center_box_width = width
         self.center_box_height = height
-        print(f"Center box size set to {width}x{height}")
+        logger.info("Center box size set to %dx%d", width, height)
     
     def reset_speeds(self):
-        self.horizontal_speed = 0
-        self.vertical_speed = 0
-        self.speed_change = False
\ No newline at end of file
+        # Published like any other setpoint, so it cannot swallow a newer one
+        self._set_speeds(0, 0)
+        if self.pid is not None:
+            self.pid.reset()
+            self.pid_target_time = None
\ No newline at end of file
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Frame-keyed latency tracing from UDP receive to the servo bus write.
+
+Probes store time.monotonic_ns() stamps in preallocated per-stage tables
+indexed by FRAME number, and completed frames are folded into log-linear
+(HDR-style) histograms, so the tracer can stay enabled in production.
+"""
+import threading
+import time
+
+from config.config import LATENCY_TRACING, LATENCY_TRACE_SLOTS
+
+# Pipeline stages, in order
+STAGE_RECEIVE = 0
+STAGE_PARSED = 1
+STAGE_SETPOINT = 2
+STAGE_BUS_START = 3
+STAGE_BUS_DONE = 4
+STAGE_NAMES = ("receive", "parsed", "setpoint", "bus_start", "bus_done")
+
+# Intervals reported as histograms: (name, from stage, to stage)
+INTERVALS = (
+    ("receive->parsed", STAGE_RECEIVE, STAGE_PARSED),
+    ("parsed->setpoint", STAGE_PARSED, STAGE_SETPOINT),
+    ("setpoint->bus_start", STAGE_SETPOINT, STAGE_BUS_START),
+    ("bus_start->bus_done", STAGE_BUS_START, STAGE_BUS_DONE),
+    ("receive->bus_done", STAGE_RECEIVE, STAGE_BUS_DONE),
+)
+
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_EXPONENT = 30  # values up to ~34 s in ns
+
+
+class LatencyHistogram:
+    """Log-linear histogram of nanosecond values with ~3% relative precision"""
+    def __init__(self):
+        self.counts = [0] * (2 * SUB_BUCKETS + MAX_EXPONENT * SUB_BUCKETS)
+        self.total = 0
+        self.max_value = 0
+
+    def _index(self, value):
+        if value < 2 * SUB_BUCKETS:
+            return value
+        exponent = value.bit_length() - SUB_BUCKET_BITS - 1
+        index = 2 * SUB_BUCKETS + (exponent - 1) * SUB_BUCKETS + (value >> exponent) - SUB_BUCKETS
+        return min(index, len(self.counts) - 1)
+
+    def _value(self, index):
+        """Upper bound of the values stored in a bucket"""
+        if index < 2 * SUB_BUCKETS:
+            return index
+        exponent = (index - 2 * SUB_BUCKETS) // SUB_BUCKETS + 1
+        mantissa = (index - 2 * SUB_BUCKETS) % SUB_BUCKETS + SUB_BUCKETS
+        return ((mantissa + 1) << exponent) - 1
+
+    def record(self, value):
+        if value < 0:
+            return
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        if value > self.max_value:
+            self.max_value = value
+
+    def percentile(self, percent):
+        if self.total == 0:
+            return 0
+        threshold = self.total * percent / 100.0
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= threshold:
+                return min(self._value(index), self.max_value)
+        return self.max_value
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.total = 0
+        self.max_value = 0
+
+
+class LatencyTracer:
+    def __init__(self, slots=LATENCY_TRACE_SLOTS, enabled=LATENCY_TRACING):
+        # Power of two so slot = frame & mask
+        size = 1
+        while size < slots:
+            size <<= 1
+        self.mask = size - 1
+        self.enabled = enabled
+        self.frames = [-1] * size
+        self.stamps = [[0] * size for _ in STAGE_NAMES]
+        self.histograms = {name: LatencyHistogram() for name, _, _ in INTERVALS}
+        self.last_receive_ns = 0
+        self.published_frame = None
+        self.completed = 0
+        self.lock = threading.Lock()
+
+    def receive(self, timestamp_ns=None):
+        """Note the arrival time of the datagram about to be dispatched"""
+        if self.enabled:
+            self.last_receive_ns = timestamp_ns or time.monotonic_ns()
+
+    def parsed(self, frame):
+        """Start tracing frame, using the arrival time from receive()"""
+        if not self.enabled or frame is None:
+            return
+        slot = frame & self.mask
+        self.frames[slot] = frame
+        stamps = self.stamps
+        stamps[STAGE_RECEIVE][slot] = self.last_receive_ns
+        stamps[STAGE_PARSED][slot] = time.monotonic_ns()
+        stamps[STAGE_SETPOINT][slot] = 0
+
+    def setpoint(self, frame):
+        """A new speed setpoint derived from frame is ready for the bus"""
+        if not self.enabled or frame is None:
+            return
+        slot = frame & self.mask
+        if self.frames[slot] == frame:
+            self.stamps[STAGE_SETPOINT][slot] = time.monotonic_ns()
+            self.published_frame = frame
+
+    def take_published(self):
+        """Frame of the newest unwritten setpoint, or None"""
+        frame = self.published_frame
+        self.published_frame = None
+        return frame
+
+    def bus_start(self, frame):
+        if self.enabled and frame is not None:
+            self.stamps[STAGE_BUS_START][frame & self.mask] = time.monotonic_ns()
+
+    def bus_done(self, frame):
+        if not self.enabled or frame is None:
+            return
+        slot = frame & self.mask
+        now = time.monotonic_ns()
+        if self.frames[slot] != frame or not self.stamps[STAGE_SETPOINT][slot]:
+            return
+        self.stamps[STAGE_BUS_DONE][slot] = now
+        stamps = self.stamps
+        with self.lock:
+            for name, start, end in INTERVALS:
+                if stamps[start][slot]:
+                    self.histograms[name].record(stamps[end][slot] - stamps[start][slot])
+            self.completed += 1
+            # Count the frame once even if several buses report completion
+            stamps[STAGE_SETPOINT][slot] = 0
+
+    def report(self):
+        """Latency summary per interval (p50/p99/max in microseconds)"""
+        with self.lock:
+            summary = {"frames": self.completed}
+            for name, histogram in self.histograms.items():
+                summary[name] = {
+                    "count": histogram.total,
+                    "p50_us": histogram.percentile(50) / 1000,
+                    "p99_us": histogram.percentile(99) / 1000,
+                    "max_us": histogram.max_value / 1000,
+                }
+        return summary
+
+    def format_report(self):
+        summary = self.report()
+        lines = [f"Latency trace: {summary['frames']} frames"]
+        for name, _, _ in INTERVALS:
+            stats = summary[name]
+            lines.append(f"  {name:<22} n={stats['count']:<7} p50={stats['p50_us']:.1f}us "
+                         f"p99={stats['p99_us']:.1f}us max={stats['max_us']:.1f}us")
+        return "\n".join(lines)
+
+    def print_report(self):
+        print(self.format_report())
+
+    def reset(self):
+        with self.lock:
+            for histogram in self.histograms.values():
+                histogram.reset()
+            self.completed = 0
+
+
+# Shared by NetworkHandler, InputHandler and DynamixelController
+tracer = LatencyTracer()
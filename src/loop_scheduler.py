@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+import math
+import time
+
+class LoopScheduler:
+    """Fixed-rate scheduler sleeping until absolute deadlines (start + n * period).
+
+    Overrunning ticks are counted and the schedule skips to the next future
+    period instead of bursting to catch up.
+    """
+    def __init__(self, rate_hz):
+        self.rate_hz = rate_hz
+        self.period_ns = int(1_000_000_000 / rate_hz)
+        self.next_deadline_ns = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.ticks = 0
+        self.overruns = 0
+        self.missed_periods = 0
+        self.jitter_min_ns = None
+        self.jitter_max_ns = 0
+        self._jitter_sum_ns = 0
+        self._jitter_sq_sum = 0.0
+        self.start_ns = None
+
+    def start(self):
+        now = time.monotonic_ns()
+        self.start_ns = now
+        self.next_deadline_ns = now + self.period_ns
+
+    def wait_next_tick(self):
+        """Sleep until the next deadline and record wake-up jitter"""
+        if self.next_deadline_ns is None:
+            self.start()
+
+        now = time.monotonic_ns()
+        deadline = self.next_deadline_ns
+
+        if now >= deadline:
+            # Work took longer than one period: count it and skip missed slots
+            self.overruns += 1
+            missed = (now - deadline) // self.period_ns
+            self.missed_periods += missed
+            deadline += missed * self.period_ns
+            jitter = now - deadline
+        else:
+            time.sleep((deadline - now) / 1_000_000_000)
+            jitter = time.monotonic_ns() - deadline
+
+        self.ticks += 1
+        self._jitter_sum_ns += jitter
+        self._jitter_sq_sum += float(jitter) * jitter
+        if self.jitter_min_ns is None or jitter < self.jitter_min_ns:
+            self.jitter_min_ns = jitter
+        if jitter > self.jitter_max_ns:
+            self.jitter_max_ns = jitter
+
+        self.next_deadline_ns = deadline + self.period_ns
+
+    def run(self, tick, should_stop):
+        """Call tick() once per period until should_stop() returns True"""
+        self.start()
+        while not should_stop():
+            tick()
+            self.wait_next_tick()
+
+    def get_stats(self):
+        elapsed_s = 0.0
+        if self.start_ns is not None:
+            elapsed_s = (time.monotonic_ns() - self.start_ns) / 1_000_000_000
+        mean_ns = self._jitter_sum_ns / self.ticks if self.ticks else 0.0
+        variance = self._jitter_sq_sum / self.ticks - mean_ns * mean_ns if self.ticks else 0.0
+        return {
+            "rate_hz": self.rate_hz,
+            "ticks": self.ticks,
+            "achieved_hz": self.ticks / elapsed_s if elapsed_s > 0 else 0.0,
+            "overruns": self.overruns,
+            "missed_periods": self.missed_periods,
+            "jitter_min_us": (self.jitter_min_ns or 0) / 1000,
+            "jitter_mean_us": mean_ns / 1000,
+            "jitter_std_us": math.sqrt(max(variance, 0.0)) / 1000,
+            "jitter_max_us": self.jitter_max_ns / 1000,
+        }
+
+    def print_stats(self):
+        stats = self.get_stats()
+        print(f"Control loop: {stats['ticks']} ticks at {stats['achieved_hz']:.1f} Hz "
+              f"(target {stats['rate_hz']} Hz)")
+        print(f"Overruns: {stats['overruns']}, missed periods: {stats['missed_periods']}")
+        print(f"Jitter (us): min={stats['jitter_min_us']:.1f} mean={stats['jitter_mean_us']:.1f} "
+              f"std={stats['jitter_std_us']:.1f} max={stats['jitter_max_us']:.1f}")
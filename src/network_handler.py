@@ -1,8 +1,21 @@
 #!/usr/bin/env python3
+import selectors
 import socket
 import threading
 import time
-from config.config import UDP_IP, UDP_PORT, UDP_LISTEN_INTERVAL
+from config.config import (
+    UDP_IP, UDP_PORT, UDP_SELECT_TIMEOUT, UDP_RECV_BUFFER_SIZE, UDP_BINARY_PROTOCOL, UDP_CAPTURE_FILE,
+)
+from . import udp_protocol
+from .latency_tracer import tracer
+from .async_logger import logger
+from .udp_capture import UdpCaptureWriter
+
+# Messages where only the newest datagram per target ID matters. OBJECT_SELECTED
+# also locks on its target, so it is never coalesced away.
+COORD_PREFIXES = (b'SELECTED_COORDS:',)
+# Status sends must not block even before the listener makes the socket non-blocking
+SEND_FLAGS = getattr(socket, 'MSG_DONTWAIT', 0)
 
 class NetworkHandler:
     def __init__(self, input_handler):
@@ -12,59 +25,170 @@ class NetworkHandler:
         self.running = False
         self.thread = None
         self.connected = False
-        print(f"UDP client initialized for server {UDP_IP}:{UDP_PORT}")
+        # Set when the server acknowledges PROTOCOL_OFFER; until then it speaks text only
+        self.binary_protocol = False
+        self.selector = None
+        self.datagrams_received = 0
+        self.datagrams_coalesced = 0
+        self.datagrams_rejected = 0  # binary datagrams before the server acknowledged the format
+        self.capture = None
+        logger.info("UDP client initialized for server %s:%d", UDP_IP, UDP_PORT)
+        if UDP_CAPTURE_FILE:
+            self.start_capture(UDP_CAPTURE_FILE)
+    
+    def start_capture(self, path):
+        """Record every datagram from the server with its arrival time (see src/udp_capture.py)"""
+        self.stop_capture()
+        self.capture = UdpCaptureWriter(path)
+        logger.info("Capturing UDP session to %s", path)
+    
+    def stop_capture(self):
+        capture = self.capture
+        if capture is not None:
+            self.capture = None
+            capture.close()
+            logger.info("Captured %d datagrams to %s", capture.messages, capture.path)
     
     def connect_to_server(self):
-        print(f"Setting up UDP client for server at {UDP_IP}:{UDP_PORT}")
+        logger.info("Setting up UDP client for server at %s:%d", UDP_IP, UDP_PORT)
         try:
             # Send a simple "hi" message to the server
             self.sock.sendto(b"hi", self.server_address)
-            print("Sent 'hi' message to server")
+            logger.info("Sent 'hi' message to server")
+            
+            if UDP_BINARY_PROTOCOL:
+                # Offer the binary format; it is used both ways once the server acknowledges
+                self.sock.sendto(udp_protocol.PROTOCOL_OFFER, self.server_address)
+                logger.info("Offered binary protocol to server")
             
             self.sock.settimeout(None)  # Remove any timeout
             self.connected = True
-            print("UDP client ready to receive messages from server")
+            logger.info("UDP client ready to receive messages from server")
             return True
         except Exception as e:
-            print(f"Failed to setup UDP client: {e}")
+            logger.error("Failed to setup UDP client: %s", e)
             return False
     
     def start_udp_listener(self):
         if not self.connected:
-            print("Not connected to server, UDP listener not started")
+            logger.warning("Not connected to server, UDP listener not started")
             return
             
         self.sock.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.sock, selectors.EVENT_READ)
         self.running = True
         self.thread = threading.Thread(target=self._udp_listener_thread)
         self.thread.daemon = True
         self.thread.start()
-        print("UDP listener started")
+        logger.info("UDP listener started")
     
     def _udp_listener_thread(self):
+        # Block in epoll/select until a datagram is ready; the timeout only
+        # bounds how long stop() waits for the thread to notice
         while self.running:
-            self._udp_listener()
-            time.sleep(UDP_LISTEN_INTERVAL)
+            if self.selector.select(timeout=UDP_SELECT_TIMEOUT):
+                self._udp_listener()
     
     def _udp_listener(self):
-        try:
-            data, addr = self.sock.recvfrom(1024)
+        """Drain all pending datagrams and dispatch them, newest coordinates per target only"""
+        pending_coords = {}
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(UDP_RECV_BUFFER_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                # Socket closed by stop()
+                return
+            received_ns = time.monotonic_ns()
+            
             # Only accept messages from the configured server
-            if addr[0] == UDP_IP:
-                self.input_handler.on_udp_message(data)
-        except BlockingIOError:
-            pass
+            if addr[0] != UDP_IP:
+                continue
+            self.datagrams_received += 1
+            if self.capture is not None:
+                self.capture.write(received_ns, data)
+            
+            if data == udp_protocol.PROTOCOL_ACK:
+                self.binary_protocol = True
+                logger.info("Server acknowledged binary protocol")
+                continue
+            if data == b'LATENCY_QUERY':
+                self._send_latency_report()
+                continue
+            if not self.binary_protocol and udp_protocol.is_binary(data):
+                self.datagrams_rejected += 1
+                logger.warning("Binary message from a server that has not acknowledged the binary protocol",
+                               interval=5.0)
+                continue
+            
+            key = self._coalesce_key(data)
+            if key is not None:
+                if key in pending_coords:
+                    self.datagrams_coalesced += 1
+                pending_coords[key] = (data, received_ns)
+                continue
+            
+            # Keep ordering relative to mode changes and button events
+            self._dispatch_coords(pending_coords)
+            tracer.receive(received_ns)
+            self.input_handler.on_udp_message(data)
+        
+        self._dispatch_coords(pending_coords)
+    
+    def _coalesce_key(self, data):
+        """Target key for coordinate messages (latest wins), None for everything else"""
+        if udp_protocol.is_binary(data):
+            if data[2] in (udp_protocol.MSG_COORDS, udp_protocol.MSG_DETECTION):
+                return data[3:5]  # target_id field
+            return None
+        if data.startswith(COORD_PREFIXES):
+            # SELECTED_COORDS:ID:<id>:...
+            target_id = data.split(b':', 3)[2:3]
+            return target_id[0] if target_id else b''
+        return None
+    
+    def _dispatch_coords(self, pending_coords):
+        for data, received_ns in pending_coords.values():
+            tracer.receive(received_ns)
+            self.input_handler.on_udp_message(data)
+        pending_coords.clear()
+    
+    def _send_latency_report(self):
+        try:
+            self.sock.sendto(tracer.format_report().encode(), self.server_address)
+        except OSError as e:
+            logger.error("Failed to send latency report: %s", e)
     
     def send_status_to_server(self, status):
-        if self.connected:
-            try:
-                self.sock.sendto(status.encode(), self.server_address)
-            except Exception as e:
-                print(f"Failed to send status to server: {e}")
+        """Send a status message (str or bytes-like) without blocking; False if it was not sent"""
+        if not self.connected:
+            return False
+        if isinstance(status, str):
+            status = status.encode()
+        try:
+            self.sock.sendto(status, SEND_FLAGS, self.server_address)
+            return True
+        except BlockingIOError:
+            # Socket buffer full: drop rather than stall the caller
+            return False
+        except Exception as e:
+            logger.error("Failed to send status to server: %s", e, interval=1.0)
+            return False
+    
+    def send_binary_status(self, data):
+        """Send a binary MSG_STATUS datagram, only to a server that acknowledged the binary protocol"""
+        if not self.binary_protocol:
+            return False
+        return self.send_status_to_server(data)
     
     def stop(self):
         self.running = False
         if self.thread:
             self.thread.join()
+        if self.selector:
+            self.selector.close()
+        self.stop_capture()
         self.sock.close()
-        print("UDP client disconnected")
\ No newline at end of file
+        logger.info("UDP client disconnected")
\ No newline at end of file
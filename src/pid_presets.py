@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Named PID gain sets for AUTO tracking, stored as JSON.
+
+Built-in presets are always available; entries in PID_PRESETS_FILE add to
+or override them. Gains map pixel error to motor velocity units.
+"""
+import json
+import os
+
+from config.config import PID_PRESETS_FILE
+from .async_logger import logger
+
+DEFAULT_PRESETS = {
+    'default': {'kp': 0.2, 'ki': 0.1, 'kd': 0.02, 'output_limit': 30.0,
+                'derivative_cutoff_hz': 5.0, 'slew_rate': 300.0},
+    'smooth_motion': {'kp': 0.12, 'ki': 0.04, 'kd': 0.015, 'output_limit': 20.0,
+                      'derivative_cutoff_hz': 3.0, 'slew_rate': 100.0},
+    'aggressive': {'kp': 0.3, 'ki': 0.2, 'kd': 0.03, 'output_limit': 60.0,
+                   'derivative_cutoff_hz': 8.0, 'slew_rate': 0.0},
+    'precise': {'kp': 0.2, 'ki': 0.05, 'kd': 0.025, 'output_limit': 25.0,
+                'derivative_cutoff_hz': 5.0, 'slew_rate': 200.0},
+}
+
+GAIN_KEYS = ('kp', 'ki', 'kd', 'output_limit', 'derivative_cutoff_hz', 'slew_rate')
+
+
+class PIDPresets:
+    def __init__(self, path=PID_PRESETS_FILE):
+        self.path = path
+        self.presets = {name: dict(gains) for name, gains in DEFAULT_PRESETS.items()}
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to load PID presets from %s: %s", self.path, e)
+            return
+        for name, gains in stored.items():
+            self.presets[name] = {key: float(value) for key, value in gains.items() if key in GAIN_KEYS}
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump(self.presets, f, indent=2, sort_keys=True)
+
+    def names(self):
+        return sorted(self.presets)
+
+    def get_preset(self, name):
+        if name not in self.presets:
+            raise KeyError(f"Unknown PID preset '{name}' (available: {', '.join(self.names())})")
+        return dict(self.presets[name])
+
+    def set_preset(self, name, **gains):
+        preset = dict(self.presets.get(name, DEFAULT_PRESETS['default']))
+        preset.update({key: float(value) for key, value in gains.items() if key in GAIN_KEYS})
+        self.presets[name] = preset
+
+    def apply_preset(self, name, pid, motor_id=None):
+        """Load a preset into a MultiAxisPID (all axes, or only motor_id)"""
+        pid.set_gains(motor_id, **self.get_preset(name))
+        if motor_id is None:
+            logger.info("Applied PID preset '%s'", name)
+        else:
+            logger.info("Applied PID preset '%s' to motor %s", name, motor_id)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""PID control for AUTO tracking and an offline auto-tuner.
+
+PIDController turns the pixel error of the tracked object into a motor
+velocity command at the control-loop rate. PIDAutoTuner identifies the
+camera axis with a relay-feedback experiment on a simulated (or recorded)
+plant, derives gains and reports the closed-loop step response.
+
+    python -m src.pid_tuner --rule tyreus-luyben --save-preset tuned
+"""
+import argparse
+import math
+from collections import deque
+
+from config.config import (
+    CONTROL_LOOP_RATE_HZ, VISION_FRAME_RATE, VELOCITY_UNIT_DEG_S,
+    CAMERA_HFOV_DEG, PREDICTOR_LATENCY_S,
+)
+
+
+class PIDController:
+    """Single-axis PID with anti-windup, filtered derivative and output slew limiting"""
+    def __init__(self, kp=0.0, ki=0.0, kd=0.0, output_limit=30.0, derivative_cutoff_hz=5.0,
+                 slew_rate=None):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.output_limit = output_limit
+        self.derivative_cutoff_hz = derivative_cutoff_hz
+        self.slew_rate = slew_rate  # max output change per second, None = unlimited
+        self.reset()
+
+    def set_gains(self, kp=None, ki=None, kd=None, output_limit=None, derivative_cutoff_hz=None,
+                  slew_rate=None):
+        if kp is not None:
+            self.kp = kp
+        if ki is not None:
+            self.ki = ki
+        if kd is not None:
+            self.kd = kd
+        if output_limit is not None:
+            self.output_limit = output_limit
+        if derivative_cutoff_hz is not None:
+            self.derivative_cutoff_hz = derivative_cutoff_hz
+        if slew_rate is not None:
+            self.slew_rate = slew_rate or None
+
+    def reset(self):
+        self.integral = 0.0
+        self.derivative = 0.0
+        self.last_error = None
+        self.output = 0.0
+
+    def update(self, error, dt):
+        if dt <= 0:
+            return self.output
+
+        # Derivative of the error through a first-order low-pass filter
+        if self.last_error is None:
+            raw_derivative = 0.0
+        else:
+            raw_derivative = (error - self.last_error) / dt
+        self.last_error = error
+        if self.derivative_cutoff_hz:
+            alpha = dt / (dt + 1.0 / (2.0 * math.pi * self.derivative_cutoff_hz))
+            self.derivative += alpha * (raw_derivative - self.derivative)
+        else:
+            self.derivative = raw_derivative
+
+        proportional = self.kp * error
+        derivative = self.kd * self.derivative
+        limit = self.output_limit
+
+        # Conditional integration: stop integrating while saturated in the
+        # same direction, and clamp the integral term to the output range
+        candidate = self.integral + self.ki * error * dt
+        unsaturated = proportional + candidate + derivative
+        if -limit < unsaturated < limit or (unsaturated > 0) != (error > 0):
+            self.integral = max(-limit, min(limit, candidate))
+
+        output = max(-limit, min(limit, proportional + self.integral + derivative))
+
+        if self.slew_rate:
+            max_step = self.slew_rate * dt
+            output = max(self.output - max_step, min(self.output + max_step, output))
+        self.output = output
+        return output
+
+
+class MultiAxisPID:
+    """One PIDController per motor ID, sharing a gain set"""
+    def __init__(self, axis_ids, **gains):
+        self.axes = {axis_id: PIDController(**gains) for axis_id in axis_ids}
+
+    def __getitem__(self, axis_id):
+        return self.axes[axis_id]
+
+    def set_gains(self, axis_id=None, **gains):
+        for current_id, pid in self.axes.items():
+            if axis_id is None or current_id == axis_id:
+                pid.set_gains(**gains)
+
+    def update(self, errors, dt):
+        return {axis_id: self.axes[axis_id].update(error, dt) for axis_id, error in errors.items()}
+
+    def reset(self):
+        for pid in self.axes.values():
+            pid.reset()
+
+
+class CameraAxisPlant:
+    """Pixel error of a static target seen by a camera on one velocity-controlled axis.
+
+    The motor follows its velocity command through a first-order lag, the
+    image is sampled at the camera frame rate and reaches the controller
+    after a fixed pipeline delay.
+    """
+    def __init__(self, degrees_per_pixel, motor_time_constant=0.05, delay_s=PREDICTOR_LATENCY_S,
+                 frame_rate=VISION_FRAME_RATE, velocity_unit_deg_s=VELOCITY_UNIT_DEG_S):
+        self.degrees_per_pixel = degrees_per_pixel
+        self.motor_time_constant = motor_time_constant
+        self.delay_s = delay_s
+        self.frame_period = 1.0 / frame_rate
+        self.velocity_unit_deg_s = velocity_unit_deg_s
+        self.reset(0.0)
+
+    def reset(self, initial_error):
+        self.error = float(initial_error)
+        self.velocity = 0.0
+        self.time = 0.0
+        self.next_frame = 0.0
+        self.frames = deque()
+        self.observed = float(initial_error)
+
+    def step(self, command, dt):
+        """Advance by dt with a velocity command; returns the error the controller sees"""
+        if self.motor_time_constant > 0:
+            self.velocity += (command - self.velocity) * min(dt / self.motor_time_constant, 1.0)
+        else:
+            self.velocity = command
+        # Positive commands pan towards objects left of center (negative error)
+        self.error += self.velocity * self.velocity_unit_deg_s / self.degrees_per_pixel * dt
+        self.time += dt
+
+        if self.time >= self.next_frame:
+            self.frames.append((self.time + self.delay_s, self.error))
+            self.next_frame += self.frame_period
+        while self.frames and self.frames[0][0] <= self.time:
+            self.observed = self.frames.popleft()[1]
+        return self.observed
+
+    @classmethod
+    def from_recording(cls, times, commands, errors, frame_rate=VISION_FRAME_RATE, max_delay_s=0.5):
+        """Fit gain and delay of an integrating plant to a recorded AUTO session.
+
+        times/commands/errors are equal-length sequences of control ticks:
+        seconds, motor velocity command and the observed pixel error.
+        """
+        best = None
+        dt_values = [t1 - t0 for t0, t1 in zip(times, times[1:])]
+        dt = sum(dt_values) / len(dt_values)
+        max_lag = int(max_delay_s / dt)
+        for lag in range(0, max_lag + 1):
+            # d(error)/dt = gain * command(t - delay)
+            numerator = denominator = 0.0
+            for i in range(lag + 1, len(times)):
+                rate = (errors[i] - errors[i - 1]) / (times[i] - times[i - 1])
+                u = commands[i - 1 - lag]
+                numerator += rate * u
+                denominator += u * u
+            if denominator == 0:
+                continue
+            gain = numerator / denominator
+            residual = 0.0
+            for i in range(lag + 1, len(times)):
+                rate = (errors[i] - errors[i - 1]) / (times[i] - times[i - 1])
+                residual += (rate - gain * commands[i - 1 - lag]) ** 2
+            if best is None or residual < best[0]:
+                best = (residual, gain, lag * dt)
+        if best is None or best[1] == 0:
+            raise ValueError("Recording has no motion to identify a plant from")
+        _, gain, delay = best
+        return cls(degrees_per_pixel=VELOCITY_UNIT_DEG_S / abs(gain), motor_time_constant=0.0,
+                   delay_s=delay, frame_rate=frame_rate)
+
+
+class PIDAutoTuner:
+    """Relay-feedback identification and step-response evaluation on a plant"""
+    # Ultimate gain/period tuning rules: (Kp/Ku, Ti/Tu, Td/Tu)
+    RULES = {
+        'ziegler-nichols': (0.6, 0.5, 0.125),
+        'tyreus-luyben': (1 / 2.2, 2.2, 1 / 6.3),
+    }
+
+    def __init__(self, plant, rate_hz=CONTROL_LOOP_RATE_HZ, output_limit=30.0):
+        self.plant = plant
+        self.dt = 1.0 / rate_hz
+        self.output_limit = output_limit
+
+    def relay_experiment(self, relay_amplitude=None, hysteresis=2.0, duration_s=20.0):
+        """Return (ultimate gain Ku, ultimate period Tu) from relay-induced oscillation"""
+        d = relay_amplitude or self.output_limit / 2
+        self.plant.reset(0.0)
+        command = d
+        crossings = []
+        peaks = []
+        current_peak = 0.0
+        observed = 0.0
+        for i in range(int(duration_s / self.dt)):
+            observed = self.plant.step(command, self.dt)
+            if abs(observed) > abs(current_peak):
+                current_peak = observed
+            # Relay with hysteresis: push the observed error back towards zero
+            if (command > 0 and observed > hysteresis) or (command < 0 and observed < -hysteresis):
+                command = -command
+                crossings.append(i * self.dt)
+                peaks.append(abs(current_peak))
+                current_peak = 0.0
+
+        if len(crossings) < 6:
+            raise RuntimeError("Relay experiment did not produce a sustained oscillation")
+        # Ignore the start-up transient
+        periods = [b - a for a, b in zip(crossings[2::2], crossings[4::2])]
+        amplitude = sum(peaks[3:]) / len(peaks[3:])
+        ultimate_period = sum(periods) / len(periods)
+        ultimate_gain = 4.0 * d / (math.pi * math.sqrt(max(amplitude ** 2 - hysteresis ** 2, 1e-9)))
+        return ultimate_gain, ultimate_period
+
+    def gains_from_relay(self, ultimate_gain, ultimate_period, rule='tyreus-luyben'):
+        kp_ratio, ti_ratio, td_ratio = self.RULES[rule]
+        kp = kp_ratio * ultimate_gain
+        ti = ti_ratio * ultimate_period
+        td = td_ratio * ultimate_period
+        return {'kp': kp, 'ki': kp / ti if ti else 0.0, 'kd': kp * td}
+
+    def step_response(self, gains, step_px=200.0, duration_s=5.0, settle_band=0.05):
+        """Closed-loop response to a target appearing step_px off center"""
+        pid = PIDController(output_limit=self.output_limit, **gains)
+        self.plant.reset(step_px)
+        observed = step_px
+        settle_limit = abs(step_px) * settle_band
+        settling_time = None
+        overshoot = 0.0
+        steps = int(duration_s / self.dt)
+        for i in range(steps):
+            # Error > 0 (object right of center) needs a negative command
+            command = -pid.update(observed, self.dt)
+            observed = self.plant.step(command, self.dt)
+            error = self.plant.error
+            if (error > 0) != (step_px > 0):
+                overshoot = max(overshoot, abs(error) / abs(step_px))
+            if abs(error) > settle_limit:
+                settling_time = None
+            elif settling_time is None:
+                settling_time = (i + 1) * self.dt
+        return {
+            'settling_time_s': settling_time,
+            'overshoot_pct': overshoot * 100.0,
+            'final_error_px': self.plant.error,
+        }
+
+    def tune(self, rule='tyreus-luyben'):
+        ultimate_gain, ultimate_period = self.relay_experiment()
+        gains = self.gains_from_relay(ultimate_gain, ultimate_period, rule)
+        report = self.step_response(gains)
+        report.update(ultimate_gain=ultimate_gain, ultimate_period_s=ultimate_period, gains=gains)
+        return report
+
+
+def load_recording(path):
+    """Read a CSV of time,command,error rows (header optional)"""
+    times, commands, errors = [], [], []
+    with open(path) as f:
+        for line in f:
+            fields = line.strip().split(',')
+            try:
+                t, command, error = (float(v) for v in fields[:3])
+            except ValueError:
+                continue
+            times.append(t)
+            commands.append(command)
+            errors.append(error)
+    return times, commands, errors
+
+
+def main():
+    from src.pid_presets import PIDPresets
+
+    parser = argparse.ArgumentParser(description="Auto-tune the AUTO mode PID controller")
+    parser.add_argument('--rule', choices=sorted(PIDAutoTuner.RULES), default='tyreus-luyben')
+    parser.add_argument('--recording', help="CSV of time,command,error from a recorded session")
+    parser.add_argument('--delay', type=float, default=PREDICTOR_LATENCY_S, help="Pipeline delay in seconds")
+    parser.add_argument('--width', type=int, default=800, help="Camera width in pixels")
+    parser.add_argument('--save-preset', help="Store the tuned gains under this preset name")
+    args = parser.parse_args()
+
+    if args.recording:
+        plant = CameraAxisPlant.from_recording(*load_recording(args.recording))
+        print(f"Identified plant: {plant.degrees_per_pixel:.4f} deg/px, delay {plant.delay_s * 1000:.0f} ms")
+    else:
+        plant = CameraAxisPlant(CAMERA_HFOV_DEG / args.width, delay_s=args.delay)
+
+    tuner = PIDAutoTuner(plant)
+    report = tuner.tune(args.rule)
+    gains = report['gains']
+    print(f"Ultimate gain Ku={report['ultimate_gain']:.4f}, period Tu={report['ultimate_period_s']:.3f} s")
+    print(f"Gains ({args.rule}): kp={gains['kp']:.4f} ki={gains['ki']:.4f} kd={gains['kd']:.4f}")
+    settling = report['settling_time_s']
+    print(f"Step response: settling time {'n/a' if settling is None else f'{settling:.2f} s'}, "
+          f"overshoot {report['overshoot_pct']:.1f}%")
+
+    if args.save_preset:
+        presets = PIDPresets()
+        presets.set_preset(args.save_preset, **gains)
+        presets.save()
+        print(f"Saved preset '{args.save_preset}' to {presets.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Opt-in real-time execution mode (Linux).
+
+Pins threads to cores, requests SCHED_FIFO priorities, locks the process
+memory with mlockall() and takes the cyclic garbage collector off the hot
+path: objects alive after startup are frozen out of collection, automatic
+collection is disabled and the control loop runs a collection of what it
+allocated since at a fixed interval instead. Every step that the platform
+or the process permissions do not allow is logged and skipped.
+"""
+import ctypes
+import ctypes.util
+import gc
+import os
+import time
+
+from config.config import (
+    REALTIME_CONTROL_CORES, REALTIME_NETWORK_CORES, REALTIME_CONTROL_PRIORITY,
+    REALTIME_NETWORK_PRIORITY, REALTIME_GC_INTERVAL_S,
+)
+from .async_logger import logger
+
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+
+
+def pin_thread(thread=None, cores=None, priority=None, name="main"):
+    """Set CPU affinity and SCHED_FIFO priority of a thread (None: the calling thread).
+
+    Returns True if everything requested was applied.
+    """
+    tid = 0 if thread is None else thread.native_id
+    ok = True
+    if cores:
+        try:
+            os.sched_setaffinity(tid, cores)
+        except (AttributeError, OSError) as e:
+            logger.warning("Could not pin %s thread to cores %s: %s", name, sorted(cores), e)
+            ok = False
+    if priority:
+        try:
+            os.sched_setscheduler(tid, os.SCHED_FIFO, os.sched_param(priority))
+        except (AttributeError, OSError) as e:
+            logger.warning("SCHED_FIFO %d not permitted for %s thread (%s); using the default scheduler",
+                           priority, name, e)
+            ok = False
+    if ok:
+        logger.info("%s thread: cores %s, SCHED_FIFO %s", name, sorted(cores) if cores else "any", priority)
+    return ok
+
+
+def lock_memory():
+    """mlockall(MCL_CURRENT | MCL_FUTURE) so page faults cannot stall the loop"""
+    path = ctypes.util.find_library('c')
+    try:
+        libc = ctypes.CDLL(path, use_errno=True)
+        if libc.mlockall(MCL_CURRENT | MCL_FUTURE) == 0:
+            logger.info("Process memory locked")
+            return True
+        error = ctypes.get_errno()
+        logger.warning("mlockall failed: %s (raise RLIMIT_MEMLOCK or grant CAP_IPC_LOCK)", os.strerror(error))
+    except (OSError, AttributeError) as e:
+        logger.warning("mlockall not available: %s", e)
+    return False
+
+
+def unlock_memory():
+    try:
+        ctypes.CDLL(ctypes.util.find_library('c')).munlockall()
+    except (OSError, AttributeError):
+        pass
+
+
+class RealtimeMode:
+    def __init__(self, control_cores=REALTIME_CONTROL_CORES, network_cores=REALTIME_NETWORK_CORES,
+                 control_priority=REALTIME_CONTROL_PRIORITY, network_priority=REALTIME_NETWORK_PRIORITY,
+                 gc_interval_s=REALTIME_GC_INTERVAL_S):
+        self.control_cores = control_cores
+        self.network_cores = network_cores
+        self.control_priority = control_priority
+        self.network_priority = network_priority
+        self.gc_interval_s = gc_interval_s
+        self.active = False
+        self.memory_locked = False
+        self.next_collection = 0.0
+        self.collections = 0
+        self.collected = 0
+        self.collect_max_ns = 0
+
+    def pin_control(self, threads=()):
+        """Pin the calling (control) thread and the given bus I/O threads"""
+        pin_thread(None, self.control_cores, self.control_priority, "control")
+        for thread in threads:
+            if thread is not None:
+                pin_thread(thread, self.control_cores, self.control_priority, thread.name)
+
+    def pin_network(self, thread):
+        if thread is not None:
+            pin_thread(thread, self.network_cores, self.network_priority, "network")
+
+    def start(self):
+        """Lock memory and take the GC off the hot path; call once startup allocations are done"""
+        self.memory_locked = lock_memory()
+        gc.collect()
+        # Everything alive now is long-lived: keep it out of every future collection
+        gc.freeze()
+        gc.disable()
+        self.next_collection = time.monotonic() + self.gc_interval_s
+        self.active = True
+
+    def collect_if_due(self):
+        """Scheduled collection; called from the control loop after its tick"""
+        now = time.monotonic()
+        if not self.active or now < self.next_collection:
+            return
+        self.next_collection = now + self.gc_interval_s
+        start = time.perf_counter_ns()
+        # Frozen startup objects are skipped, so a full pass only scans what the loop allocated
+        self.collected += gc.collect()
+        elapsed = time.perf_counter_ns() - start
+        self.collections += 1
+        if elapsed > self.collect_max_ns:
+            self.collect_max_ns = elapsed
+
+    def stop(self):
+        if not self.active:
+            return
+        self.active = False
+        gc.unfreeze()
+        gc.enable()
+        if self.memory_locked:
+            unlock_memory()
+            self.memory_locked = False
+
+    def stats(self):
+        return {
+            'memory_locked': self.memory_locked,
+            'gc_collections': self.collections,
+            'gc_collected': self.collected,
+            'gc_collect_max_us': self.collect_max_ns / 1000,
+        }
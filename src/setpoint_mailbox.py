@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Versioned setpoint mailbox between the input side and the control loop.
+
+The input side (keyboard callback, UDP listener, PID step) publishes the
+latest speeds or position offsets; the control loop reads them without
+taking a lock. The record is guarded by a sequence counter (seqlock): the
+writer makes it odd, writes the fields and makes it even again, and a reader
+retries until it read the same even sequence before and after the fields.
+The sequence doubles as a version, so the reader acts on a setpoint exactly
+when the version moved and can never clear a newer one the way resetting a
+change flag could. Several writers in one process are serialized by a write
+lock; readers never wait for it.
+
+With a name, the record lives in multiprocessing.shared_memory so the
+network/vision side can run in another process than the bus loop. Only one
+process may write. CPython issues no memory barriers, so across processes
+on weakly ordered CPUs (e.g. the Kria's Cortex-A53) the sequence check
+relies on the order in which the stores become visible.
+"""
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+
+# What the last publication changed
+SPEEDS = 0
+OFFSETS = 1
+
+SEQUENCE = struct.Struct('<Q')
+# kind, horizontal speed, vertical speed, pan offset, tilt offset
+FIELDS = struct.Struct('<Biiii')
+SIZE = SEQUENCE.size + FIELDS.size
+
+
+class SetpointMailbox:
+    def __init__(self, name=None, create=True):
+        """name=None keeps the record in process memory; otherwise create or attach to shared memory"""
+        self.shm = None
+        if name is None:
+            self.buffer = bytearray(SIZE)
+        else:
+            self.shm = shared_memory.SharedMemory(name, create=create, size=SIZE)
+            self.buffer = self.shm.buf
+            if create:
+                self.buffer[:SIZE] = bytes(SIZE)
+        self.owner = create
+        self.write_lock = threading.RLock()
+        self.sequence = SEQUENCE.unpack_from(self.buffer)[0]
+        # Writer-side copy, so publishing one pair carries the other along
+        self.speeds = (0, 0)
+        self.offsets = (0, 0)
+
+    @property
+    def version(self):
+        """Number of setpoints published so far"""
+        return SEQUENCE.unpack_from(self.buffer)[0] >> 1
+
+    def publish_speeds(self, horizontal, vertical):
+        with self.write_lock:
+            self.speeds = (horizontal, vertical)
+            self._write(SPEEDS)
+
+    def publish_offsets(self, pan, tilt):
+        with self.write_lock:
+            self.offsets = (pan, tilt)
+            self._write(OFFSETS)
+
+    def _write(self, kind):
+        sequence = self.sequence + 1
+        SEQUENCE.pack_into(self.buffer, 0, sequence)  # odd: write in progress
+        FIELDS.pack_into(self.buffer, SEQUENCE.size, kind, *self.speeds, *self.offsets)
+        SEQUENCE.pack_into(self.buffer, 0, sequence + 1)
+        self.sequence = sequence + 1
+
+    def read(self):
+        """(version, kind, horizontal, vertical, pan, tilt) of the latest setpoint; never blocks on a writer"""
+        buffer = self.buffer
+        while True:
+            sequence = SEQUENCE.unpack_from(buffer)[0]
+            if not sequence & 1:
+                fields = FIELDS.unpack_from(buffer, SEQUENCE.size)
+                if SEQUENCE.unpack_from(buffer)[0] == sequence:
+                    return (sequence >> 1,) + fields
+            # A writer is mid-update: yield the GIL so it can finish instead of
+            # spinning for a whole switch interval
+            time.sleep(0)
+
+    def close(self):
+        if self.shm is not None:
+            self.buffer = None
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+            self.shm = None
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Periodic binary status uplink from the tracker to the vision server.
+
+Samples the present positions and velocities, mode, bound flags and the last
+acted-on FRAME at a fixed rate and sends them as MSG_STATUS datagrams (see
+src/udp_protocol.py). When the sample rate is above the datagram rate, several
+samples share one datagram. Samples are packed in place into a preallocated
+buffer and sent with a non-blocking sendto, so the control loop never waits
+on the network; a full socket buffer drops the datagram.
+"""
+import math
+import time
+
+from config.config import STATUS_UPLINK_RATE_HZ, STATUS_UPLINK_MAX_DATAGRAM_HZ
+from . import udp_protocol
+
+# Keep datagrams under a typical Ethernet MTU
+MAX_DATAGRAM_SIZE = 1400
+
+
+class StatusUplink:
+    def __init__(self, send, n_axes, rate_hz=STATUS_UPLINK_RATE_HZ,
+                 max_datagram_hz=STATUS_UPLINK_MAX_DATAGRAM_HZ):
+        """send(buffer) -> bool transmits one datagram without blocking"""
+        self.send = send
+        self.n_axes = n_axes
+        self.period = 1.0 / rate_hz
+        self.sample = udp_protocol.status_sample(n_axes)
+        self.flag_bytes = udp_protocol.status_flag_bytes(n_axes)
+        batch = max(1, math.ceil(rate_hz / max_datagram_hz))
+        batch_limit = (MAX_DATAGRAM_SIZE - udp_protocol.STATUS.size) // self.sample.size
+        self.batch = min(batch, batch_limit, 255)
+        self.buffer = bytearray(udp_protocol.STATUS.size + self.batch * self.sample.size)
+        self.view = memoryview(self.buffer)
+        self.count = 0
+        self.next_sample = 0.0
+        self.samples = 0
+        self.datagrams_sent = 0
+        self.datagrams_dropped = 0
+
+    def tick(self, controller, input_handler, now=None):
+        """Take a sample if one is due; called once per control tick"""
+        if now is None:
+            now = time.monotonic()
+        if now < self.next_sample:
+            return
+        self.next_sample += self.period
+        if self.next_sample < now:
+            # Fell behind (stalled loop): resume from now rather than bursting
+            self.next_sample = now + self.period
+
+        flags = 0
+        for i in range(self.n_axes):
+            if controller.bound_exceeded[i] or controller.recovering[i]:
+                flags |= 1 << i
+        frame = input_handler.last_frame
+        velocities = [min(max(v, -32768), 32767) for v in controller.present_velocity]
+        self.sample.pack_into(
+            self.buffer, udp_protocol.STATUS.size + self.count * self.sample.size,
+            int(now * 1000) & 0xFFFFFFFF,
+            udp_protocol.NO_FRAME if frame is None else frame & 0xFFFFFFFF,
+            udp_protocol.MODE_VALUES.get(input_handler.mode, udp_protocol.MODE_UNKNOWN),
+            flags.to_bytes(self.flag_bytes, 'little'),
+            *controller.present_position, *velocities,
+        )
+        self.samples += 1
+        self.count += 1
+        if self.count == self.batch:
+            self.flush()
+
+    def flush(self):
+        """Send the samples collected so far"""
+        if not self.count:
+            return
+        udp_protocol.STATUS.pack_into(self.buffer, 0, udp_protocol.MAGIC, udp_protocol.VERSION,
+                                      udp_protocol.MSG_STATUS, self.count, self.n_axes)
+        size = udp_protocol.STATUS.size + self.count * self.sample.size
+        self.count = 0
+        if self.send(self.view[:size]):
+            self.datagrams_sent += 1
+        else:
+            self.datagrams_dropped += 1
+
+    def stats(self):
+        return {
+            'samples': self.samples,
+            'samples_per_datagram': self.batch,
+            'datagrams_sent': self.datagrams_sent,
+            'datagrams_dropped': self.datagrams_dropped,
+        }
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Constant-velocity Kalman predictor for tracked vision targets.
+
+Each target ID gets a preallocated slot holding an independent 2-state
+(position, velocity) filter per image axis. Time between observations comes
+from the FRAME counter and the camera frame rate, so network jitter does not
+show up as target velocity. Updates are constant time and allocation free.
+"""
+import time
+
+from config.config import (
+    VISION_FRAME_RATE, PREDICTOR_MAX_TARGETS, PREDICTOR_LATENCY_S,
+    PREDICTOR_PROCESS_NOISE, PREDICTOR_MEASUREMENT_NOISE, PREDICTOR_MAX_FRAME_GAP,
+)
+from .target_slots import TargetSlots
+
+# Per-axis filter state layout: position, velocity, P00, P01, P11
+POS, VEL, P00, P01, P11 = range(5)
+INITIAL_VELOCITY_VARIANCE = 1.0e6  # (px/s)^2, velocity unknown on first sight
+
+
+class TargetPredictor:
+    def __init__(self, max_targets=PREDICTOR_MAX_TARGETS, latency_s=PREDICTOR_LATENCY_S,
+                 frame_rate=VISION_FRAME_RATE, process_noise=PREDICTOR_PROCESS_NOISE,
+                 measurement_noise=PREDICTOR_MEASUREMENT_NOISE):
+        self.max_targets = max_targets
+        self.latency_s = latency_s
+        self.frame_period = 1.0 / frame_rate
+        self.q = process_noise
+        self.r = measurement_noise
+        self.slots = TargetSlots(max_targets)
+        self.last_frames = [0] * max_targets
+        self.last_times = [0.0] * max_targets
+        self.x_state = [[0.0] * 5 for _ in range(max_targets)]
+        self.y_state = [[0.0] * 5 for _ in range(max_targets)]
+
+    def _reset_axis(self, state, measurement):
+        state[POS] = float(measurement)
+        state[VEL] = 0.0
+        state[P00] = self.r
+        state[P01] = 0.0
+        state[P11] = INITIAL_VELOCITY_VARIANCE
+
+    def _step_axis(self, state, measurement, dt):
+        # Predict with constant velocity and white acceleration noise q
+        pos, vel, p00, p01, p11 = state
+        dt2 = dt * dt
+        pos += vel * dt
+        p00 += dt * (2.0 * p01 + dt * p11) + self.q * dt2 * dt2 / 4.0
+        p01 += dt * p11 + self.q * dt2 * dt / 2.0
+        p11 += self.q * dt2
+
+        # Correct with the position measurement
+        s = p00 + self.r
+        k0 = p00 / s
+        k1 = p01 / s
+        innovation = measurement - pos
+        state[POS] = pos + k0 * innovation
+        state[VEL] = vel + k1 * innovation
+        state[P00] = (1.0 - k0) * p00
+        state[P01] = (1.0 - k0) * p01
+        state[P11] = p11 - k1 * p01
+
+    def update(self, target_id, x, y, frame=None):
+        """Fuse one observation; returns (x, y, vx, vy) extrapolated to actuation time.
+
+        Positions are in pixels and velocities in pixels per second.
+        """
+        key = target_id if target_id is not None else 0
+        now = time.monotonic()
+        slot = self.slots.get(key)
+        new_target = slot is None
+        if new_target:
+            slot = self.slots.add(key, now)
+        else:
+            self.slots.touch(slot, now)
+
+        if frame is not None:
+            dt = (frame - self.last_frames[slot]) * self.frame_period
+            gap_ok = 0 < frame - self.last_frames[slot] <= PREDICTOR_MAX_FRAME_GAP
+        else:
+            dt = now - self.last_times[slot]
+            gap_ok = 0.0 < dt <= PREDICTOR_MAX_FRAME_GAP * self.frame_period
+
+        x_state = self.x_state[slot]
+        y_state = self.y_state[slot]
+        if new_target or not gap_ok:
+            # New target, out-of-order frame or long dropout: restart the filter
+            self._reset_axis(x_state, x)
+            self._reset_axis(y_state, y)
+        else:
+            self._step_axis(x_state, x, dt)
+            self._step_axis(y_state, y, dt)
+
+        if frame is not None:
+            self.last_frames[slot] = frame
+        self.last_times[slot] = now
+
+        horizon = self.latency_s
+        return (x_state[POS] + x_state[VEL] * horizon,
+                y_state[POS] + y_state[VEL] * horizon,
+                x_state[VEL], y_state[VEL])
+
+    def reset(self):
+        self.slots.clear()
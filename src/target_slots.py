@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Target ID to preallocated slot mapping for the per-target tables.
+
+The frame sequencer, target predictor and target table keep their per-target
+state in fixed arrays. An ID keeps its slot for as long as it is in use, so
+two live IDs never share one. A new ID takes a free slot; with all slots
+taken, it reuses the one unused for longest, or none if that one was used
+more recently than the caller's idle limit. Lookups are a dict access; only
+taking over a slot in a full table scans the slots.
+"""
+from array import array
+
+
+class TargetSlots:
+    def __init__(self, max_targets):
+        self.max_targets = max_targets
+        self.slots = {}  # target ID -> slot
+        self.target_ids = [None] * max_targets
+        self.last_used = array('d', [0.0] * max_targets)
+        self.free = list(range(max_targets - 1, -1, -1))
+        self.evictions = 0
+
+    def get(self, key):
+        """Slot of an ID in use, None otherwise"""
+        return self.slots.get(key)
+
+    def add(self, key, now, min_idle_s=0.0):
+        """Slot for a new ID, or None when every slot was used within min_idle_s"""
+        if self.free:
+            slot = self.free.pop()
+        else:
+            last_used = self.last_used
+            slot = min(range(self.max_targets), key=last_used.__getitem__)
+            if now - last_used[slot] < min_idle_s:
+                return None
+            del self.slots[self.target_ids[slot]]
+            self.evictions += 1
+        self.slots[key] = slot
+        self.target_ids[slot] = key
+        self.last_used[slot] = now
+        return slot
+
+    def touch(self, slot, now):
+        self.last_used[slot] = now
+
+    def clear(self):
+        self.slots.clear()
+        self.target_ids = [None] * self.max_targets
+        self.free = list(range(self.max_targets - 1, -1, -1))
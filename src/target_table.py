@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Multi-target table and target selection for AUTO mode.
+
+The vision server may report several objects per frame, each with its own ID.
+Each ID gets its own preallocated slot holding its last position, velocity,
+size, confidence and time of the last report. Targets not reported for
+max_age_s are stale; a new ID takes over a stale slot only once the table is
+full. The selection is updated on every report in constant time: the
+reported target's cost under the policy is compared against the cached cost
+of the followed target, and it only takes over when it is better by
+switch_margin (or the followed target went stale), so the servos do not
+thrash between objects. A locked ID (OBJECT_SELECTED) overrides the policy
+until that target is lost.
+"""
+import math
+import time
+from array import array
+
+from config.config import (
+    TARGET_SELECTION, TARGET_MAX_AGE_S, TARGET_SWITCH_MARGIN, PREDICTOR_MAX_TARGETS, VISION_FRAME_RATE,
+)
+from .async_logger import logger
+from .target_slots import TargetSlots
+
+POLICIES = ('locked', 'nearest', 'largest', 'confident')
+# Weight of a new finite-difference velocity sample
+VELOCITY_SMOOTHING = 0.5
+
+
+class TargetTable:
+    def __init__(self, policy=TARGET_SELECTION, max_targets=PREDICTOR_MAX_TARGETS, max_age_s=TARGET_MAX_AGE_S,
+                 switch_margin=TARGET_SWITCH_MARGIN, frame_rate=VISION_FRAME_RATE):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown target selection policy '{policy}' (available: {', '.join(POLICIES)})")
+        self.policy = policy
+        self.max_targets = max_targets
+        self.max_age_s = max_age_s
+        self.switch_margin = switch_margin
+        self.frame_period = 1.0 / frame_rate
+        self.slots = TargetSlots(max_targets)
+        self.last_times = self.slots.last_used  # time of the last report
+        self.x = array('d', [0.0] * max_targets)
+        self.y = array('d', [0.0] * max_targets)
+        self.vx = array('d', [0.0] * max_targets)
+        self.vy = array('d', [0.0] * max_targets)
+        self.sizes = array('d', [0.0] * max_targets)
+        self.confidences = array('d', [0.0] * max_targets)
+        self.costs = array('d', [0.0] * max_targets)
+        self.last_frames = array('q', [0] * max_targets)
+        self.center_x = 0.0
+        self.center_y = 0.0
+        self.selected = None  # slot of the followed target
+        self.locked_id = None
+        self.lock_time = 0.0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.reports = 0
+        self.ignored = 0  # reports of targets that are not followed
+        self.switches = 0
+        self.overflows = 0  # new targets turned away while every slot held a live one
+        self.slots.evictions = 0  # stale targets whose slot was taken over
+
+    def set_center(self, x, y):
+        self.center_x = x
+        self.center_y = y
+
+    def lock(self, target_id):
+        """Follow this ID regardless of the policy until it is not reported for max_age_s"""
+        self.locked_id = target_id if target_id is not None else 0
+        self.lock_time = time.monotonic()
+
+    def unlock(self):
+        self.locked_id = None
+
+    @property
+    def selected_id(self):
+        return self.slots.target_ids[self.selected] if self.selected is not None else None
+
+    def state(self, target_id, now=None):
+        """(x, y, vx, vy, age_s) of a target still in the table, None otherwise"""
+        if now is None:
+            now = time.monotonic()
+        slot = self.slots.get(target_id if target_id is not None else 0)
+        if slot is None:
+            return None
+        age = now - self.last_times[slot]
+        if age > self.max_age_s:
+            return None
+        return self.x[slot], self.y[slot], self.vx[slot], self.vy[slot], age
+
+    def _cost(self, slot):
+        # Lower is better; 'locked' never prefers another target
+        if self.policy == 'nearest':
+            return math.hypot(self.x[slot] - self.center_x, self.y[slot] - self.center_y)
+        if self.policy == 'largest':
+            return -self.sizes[slot]
+        if self.policy == 'confident':
+            return -self.confidences[slot]
+        return 0.0
+
+    def update(self, target_id, x, y, frame=None, size=0.0, confidence=0.0, now=None):
+        """Record one report; True if this target is the one to follow"""
+        if now is None:
+            now = time.monotonic()
+        key = target_id if target_id is not None else 0
+        self.reports += 1
+
+        slot = self.slots.get(key)
+        if slot is None:
+            # New target: only a stale one gives up its slot
+            slot = self.slots.add(key, now, self.max_age_s)
+            if slot is None:
+                self.overflows += 1
+                return False
+            if self.selected == slot:
+                self.selected = None
+            restart = True
+        else:
+            restart = now - self.last_times[slot] > self.max_age_s
+        if restart:
+            # New target, or one reported again after going stale
+            self.vx[slot] = 0.0
+            self.vy[slot] = 0.0
+        else:
+            if frame is not None and frame > self.last_frames[slot]:
+                dt = (frame - self.last_frames[slot]) * self.frame_period
+            else:
+                dt = now - self.last_times[slot]
+            if dt > 0.0:
+                self.vx[slot] += VELOCITY_SMOOTHING * ((x - self.x[slot]) / dt - self.vx[slot])
+                self.vy[slot] += VELOCITY_SMOOTHING * ((y - self.y[slot]) / dt - self.vy[slot])
+        self.x[slot] = x
+        self.y[slot] = y
+        self.sizes[slot] = size
+        self.confidences[slot] = confidence
+        self.last_times[slot] = now
+        if frame is not None:
+            self.last_frames[slot] = frame
+        cost = self._cost(slot)
+        self.costs[slot] = cost
+        return self._select(slot, key, cost, now)
+
+    def _select(self, slot, key, cost, now):
+        locked = self.locked_id
+        if locked is not None:
+            if key == locked:
+                return self._follow(slot)
+            locked_slot = self.slots.get(locked)
+            seen = self.last_times[locked_slot] if locked_slot is not None else 0.0
+            if now - max(seen, self.lock_time) <= self.max_age_s:
+                self.ignored += 1
+                return False
+            logger.info("Locked target %d lost", locked)
+            self.locked_id = None
+
+        selected = self.selected
+        if selected == slot:
+            return True
+        if (selected is None or now - self.last_times[selected] > self.max_age_s
+                or cost < self.costs[selected] - self.switch_margin * abs(self.costs[selected])):
+            return self._follow(slot)
+        self.ignored += 1
+        return False
+
+    def _follow(self, slot):
+        if self.selected != slot:
+            self.selected = slot
+            self.switches += 1
+            if logger.debug_enabled:
+                logger.debug("Following target %d", self.slots.target_ids[slot])
+        return True
+
+    def reset(self):
+        self.slots.clear()
+        self.selected = None
+        self.locked_id = None
+
+    def stats(self):
+        return {
+            'reports': self.reports,
+            'ignored': self.ignored,
+            'switches': self.switches,
+            'evictions': self.slots.evictions,
+            'overflows': self.overflows,
+        }
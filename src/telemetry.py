@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Per-tick telemetry recorder for post-mortem analysis of tracking runs.
+
+Every control tick is stored as one row of a preallocated NumPy structured
+ring buffer: timestamp, present positions, commanded velocities (or goal
+positions in position-tracking mode), mode and the last target coordinates
+and FRAME. The buffer can live in a memory-mapped .npy
+file, which the OS writes back in bulk; load_telemetry() returns the recorded
+rows in order as plain arrays.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from config.config import AXES, TELEMETRY_ENABLED, TELEMETRY_CAPACITY
+from .udp_protocol import MODE_VALUES
+
+MODE_UNKNOWN = 255
+NO_FRAME = -1
+
+
+def telemetry_dtype(n_axes):
+    return np.dtype([
+        ('seq', np.uint64),  # 0 marks an unused row
+        ('t_ns', np.int64),
+        ('position', np.int32, (n_axes,)),
+        ('velocity', np.int32, (n_axes,)),
+        ('goal_position', np.int32, (n_axes,)),
+        ('mode', np.uint8),
+        ('target_x', np.int32),
+        ('target_y', np.int32),
+        ('frame', np.int64),
+    ])
+
+
+class TelemetryRecorder:
+    def __init__(self, n_axes=len(AXES), capacity=TELEMETRY_CAPACITY, enabled=TELEMETRY_ENABLED):
+        self.n_axes = n_axes
+        self.capacity = capacity
+        self.enabled = enabled
+        self.path = None
+        self._allocate(np.zeros(capacity, dtype=telemetry_dtype(n_axes)))
+        # Latest target, written by the UDP thread and copied into each row
+        self.target_x = 0
+        self.target_y = 0
+        self.frame = NO_FRAME
+
+    def _allocate(self, buffer):
+        self.buffer = buffer
+        # Column views, so a tick writes into existing memory field by field
+        self._seq = buffer['seq']
+        self._t_ns = buffer['t_ns']
+        self._position = buffer['position']
+        self._velocity = buffer['velocity']
+        self._goal_position = buffer['goal_position']
+        self._mode = buffer['mode']
+        self._target_x = buffer['target_x']
+        self._target_y = buffer['target_y']
+        self._frame = buffer['frame']
+        self.index = 0
+        self.seq = 0
+
+    def resize(self, n_axes):
+        """Re-allocate the ring buffer (dropping its rows) for an axis table of n_axes"""
+        if n_axes == self.n_axes:
+            return
+        self.n_axes = n_axes
+        if self.path is not None:
+            self.open(self.path)
+        else:
+            self._allocate(np.zeros(self.capacity, dtype=telemetry_dtype(n_axes)))
+
+    def open(self, path):
+        """Back the ring buffer with a memory-mapped .npy file at path"""
+        self.close()
+        self.path = path
+        self._allocate(np.lib.format.open_memmap(
+            path, mode='w+', dtype=telemetry_dtype(self.n_axes), shape=(self.capacity,)
+        ))
+        self.enabled = True
+
+    def close(self):
+        if self.path is not None:
+            self.buffer.flush()
+            self.path = None
+            self._allocate(np.zeros(self.capacity, dtype=self.buffer.dtype))
+
+    def target(self, x, y, frame=None):
+        self.target_x = x
+        self.target_y = y
+        if frame is not None:
+            self.frame = frame
+
+    def begin_tick(self, positions):
+        """Start the row for this tick with the positions just read from the bus"""
+        i = self.index
+        self._t_ns[i] = time.monotonic_ns()
+        self._position[i] = positions
+
+    def end_tick(self, velocities, mode, goal_positions=None):
+        """Complete the row with the commanded velocities or goal positions and move to the next one"""
+        i = self.index
+        if goal_positions is not None:
+            self._goal_position[i] = goal_positions
+        else:
+            self._velocity[i] = velocities
+        self._mode[i] = MODE_VALUES.get(mode, MODE_UNKNOWN)
+        self._target_x[i] = self.target_x
+        self._target_y[i] = self.target_y
+        self._frame[i] = self.frame
+        self.seq += 1
+        self._seq[i] = self.seq
+        i += 1
+        if i == self.capacity:
+            i = 0
+            if self.path is not None:
+                # One bulk write-back per pass over the ring
+                self.buffer.flush()
+        self.index = i
+
+    def snapshot(self):
+        """Recorded rows, oldest first, as a dict of arrays"""
+        return rows_in_order(self.buffer)
+
+
+def rows_in_order(buffer):
+    used = buffer[buffer['seq'] > 0]
+    used = used[np.argsort(used['seq'], kind='stable')]
+    return {name: np.array(used[name]) for name in used.dtype.names}
+
+
+def load_telemetry(path):
+    """Load a recording written through TelemetryRecorder.open()"""
+    return rows_in_order(np.load(path, mmap_mode='r'))
+
+
+def summarize(data):
+    rows = len(data['seq'])
+    if rows < 2:
+        return f"{rows} rows"
+    duration = (data['t_ns'][-1] - data['t_ns'][0]) / 1e9
+    lines = [f"{rows} rows over {duration:.2f} s ({(rows - 1) / duration:.0f} Hz)"]
+    for axis in range(data['position'].shape[1]):
+        position = data['position'][:, axis]
+        velocity = data['velocity'][:, axis]
+        line = (f"  axis {axis}: position {position.min()}..{position.max()}, "
+                f"velocity {velocity.min()}..{velocity.max()}")
+        goal = data['goal_position'][:, axis]
+        if goal.any():
+            line += f", goal position {goal.min()}..{goal.max()}"
+        lines.append(line)
+    frames = data['frame'][data['frame'] != NO_FRAME]
+    if len(frames):
+        lines.append(f"  frames {frames.min()}..{frames.max()}")
+    return "\n".join(lines)
+
+
+# Shared by DynamixelController (which sizes it for its axis table) and InputHandler
+telemetry = TelemetryRecorder()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a telemetry recording")
+    parser.add_argument("path", help=".npy file written with TELEMETRY_FILE")
+    args = parser.parse_args()
+    print(summarize(load_telemetry(args.path)))
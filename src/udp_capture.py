@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Compact on-disk format for captured UDP sessions.
+
+A capture is an 8-byte magic followed by one record per datagram: arrival
+time (time.monotonic_ns, int64), payload length (uint16) and the payload.
+"""
+import struct
+
+CAPTURE_MAGIC = b"UDPCAP1\n"
+RECORD = struct.Struct('<qH')
+
+
+class UdpCaptureWriter:
+    def __init__(self, path):
+        self.path = path
+        # Buffered so the listener thread only copies into memory per datagram
+        self.file = open(path, 'wb', buffering=1 << 16)
+        self.file.write(CAPTURE_MAGIC)
+        self.messages = 0
+
+    def write(self, received_ns, data):
+        if self.file.closed:
+            return
+        self.file.write(RECORD.pack(received_ns, len(data)))
+        self.file.write(data)
+        self.messages += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def read_capture(path):
+    """Yield (received_ns, data) for every datagram in a capture file"""
+    with open(path, 'rb') as f:
+        if f.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f"{path} is not a UDP capture file")
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            received_ns, length = RECORD.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            yield received_ns, data
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Compact binary UDP message format shared with the vision server.
+
+Every message starts with a fixed 3-byte header (magic, version, type) and has
+a fixed little-endian layout per type, so it can be decoded with a single
+struct.unpack_from() on the received buffer. The magic byte is not valid
+ASCII, which lets the receiver tell binary and text messages apart from the
+first byte alone.
+"""
+import struct
+
+MAGIC = 0xA5
+VERSION = 1
+
+# Message types
+MSG_COORDS = 0x01       # target_id:u16, x:i16, y:i16, frame:u32
+MSG_MODE = 0x02         # mode:u8
+MSG_BUTTON = 0x03       # button:u8
+MSG_TOUCH_MISS = 0x04   # no payload
+MSG_STATUS = 0x05       # count:u8, n_axes:u8, then count status samples (tracker -> server)
+MSG_DETECTION = 0x06    # target_id:u16, x:i16, y:i16, frame:u32, width:u16, height:u16, confidence:u8 (percent)
+
+HEADER = struct.Struct('<BBB')
+COORDS = struct.Struct('<BBBHhhI')
+DETECTION = struct.Struct('<BBBHhhIHHB')
+MODE = struct.Struct('<BBBB')
+BUTTON = struct.Struct('<BBBB')
+STATUS = struct.Struct('<BBBBB')
+
+# Status sample: time_ms:u32 (monotonic, wraps), frame:u32 (last acted-on FRAME),
+# mode:u8, bound_flags: ceil(n_axes / 8) bytes, little-endian (bit i: axis i out
+# of bounds or homing; one byte up to 8 axes), then present position i32 and
+# present velocity i16 per axis
+NO_FRAME = 0xFFFFFFFF
+MODE_UNKNOWN = 0xFF
+
+MODE_CODES = {0: "MANUAL", 1: "AUTO"}
+MODE_VALUES = {name: code for code, name in MODE_CODES.items()}
+
+BUTTON_CODES = {0: 'up', 1: 'down', 2: 'left', 3: 'right', 4: 'stop'}
+BUTTON_VALUES = {name: code for code, name in BUTTON_CODES.items()}
+
+# Capability handshake sent after the plain "hi" in connect_to_server;
+# servers that understand it reply with PROTOCOL_ACK
+PROTOCOL_OFFER = b"PROTOCOL:BIN:%d" % VERSION
+PROTOCOL_ACK = b"PROTOCOL_ACK:BIN:%d" % VERSION
+
+
+def is_binary(data):
+    return len(data) >= HEADER.size and data[0] == MAGIC
+
+
+def pack_coords(target_id, x, y, frame):
+    return COORDS.pack(MAGIC, VERSION, MSG_COORDS, target_id, x, y, frame)
+
+
+def pack_detection(target_id, x, y, frame, width, height, confidence):
+    return DETECTION.pack(MAGIC, VERSION, MSG_DETECTION, target_id, x, y, frame, width, height, confidence)
+
+
+def pack_mode(mode):
+    return MODE.pack(MAGIC, VERSION, MSG_MODE, MODE_VALUES[mode])
+
+
+def pack_button(button):
+    return BUTTON.pack(MAGIC, VERSION, MSG_BUTTON, BUTTON_VALUES[button])
+
+
+def pack_touch_miss():
+    return HEADER.pack(MAGIC, VERSION, MSG_TOUCH_MISS)
+
+
+def status_flag_bytes(n_axes):
+    return (n_axes + 7) // 8
+
+
+def status_sample(n_axes):
+    return struct.Struct(f'<IIB{status_flag_bytes(n_axes)}s{n_axes}i{n_axes}h')
+
+
+def unpack_status(data):
+    """Decode a status datagram into a list of sample dicts"""
+    _, _, _, count, n_axes = STATUS.unpack_from(data)
+    sample = status_sample(n_axes)
+    samples = []
+    for offset in range(STATUS.size, STATUS.size + count * sample.size, sample.size):
+        fields = sample.unpack_from(data, offset)
+        samples.append({
+            'time_ms': fields[0],
+            'frame': None if fields[1] == NO_FRAME else fields[1],
+            'mode': MODE_CODES.get(fields[2]),
+            'bound_flags': int.from_bytes(fields[3], 'little'),
+            'position': list(fields[4:4 + n_axes]),
+            'velocity': list(fields[4 + n_axes:]),
+        })
+    return samples
@@ -0,0 +1,24 @@
+import pytest
+
+from src.async_logger import logger
+
+
+# Write the queued log records at the end of every test phase, while its output is
+# still captured (trylast: inside pytest's capture wrappers); otherwise the drain
+# thread may write them while pytest reports the result
+@pytest.hookimpl(hookwrapper=True, trylast=True)
+def pytest_runtest_setup(item):
+    yield
+    logger.flush()
+
+
+@pytest.hookimpl(hookwrapper=True, trylast=True)
+def pytest_runtest_call(item):
+    yield
+    logger.flush()
+
+
+@pytest.hookimpl(hookwrapper=True, trylast=True)
+def pytest_runtest_teardown(item, nextitem):
+    yield
+    logger.flush()
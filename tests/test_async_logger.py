@@ -0,0 +1,75 @@
+import atexit
+import io
+import threading
+
+from src.async_logger import AsyncLogger
+
+
+def make_logger(**kwargs):
+    return AsyncLogger(level='INFO', stream=io.StringIO(), **kwargs)
+
+
+def test_records_are_formatted_in_order_and_filtered_by_level():
+    log = make_logger()
+    log.debug("hidden")
+    log.info("motor %d at %d", 1, 2048)
+    log.warning("bad format %d", "x")
+    log.stop()
+    lines = log.stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("INFO    motor 1 at 2048")
+    assert "WARNING" in lines[1] and "format error" in lines[1]
+
+
+def test_interval_and_sample_limit_a_call_site():
+    log = make_logger()
+    for _ in range(10):
+        log.info("sampled", sample=5)
+    for _ in range(10):
+        log.info("limited", interval=60.0)
+    log.stop()
+    text = log.stream.getvalue()
+    assert text.count("sampled") == 2
+    assert text.count("limited") == 1
+    assert log.suppressed == 8 + 9
+    assert "[4 similar suppressed]" in text
+
+
+def test_full_queue_drops_and_reports():
+    log = make_logger(capacity=3)
+    log.running = True
+    log.thread = threading.current_thread()  # keep records queued, as if the drain thread were busy
+    for i in range(5):
+        log.info("record %d", i)
+    assert log.stats()['dropped'] == 2
+    log.thread = None
+    log.stop()
+    assert "dropped 2 messages" in log.stream.getvalue()
+
+
+def test_exit_hook_registered_once(monkeypatch):
+    registered = []
+    monkeypatch.setattr(atexit, 'register', registered.append)
+    log = make_logger()
+    for _ in range(3):
+        log.info("restart")
+        log.stop()
+    assert registered == [log.stop]
+
+
+def test_call_sites_are_shared_safely_between_threads():
+    log = make_logger(capacity=100000)
+
+    def spam():
+        for _ in range(2000):
+            log.info("shared", sample=100)
+
+    threads = [threading.Thread(target=spam) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.stop()
+    [site] = log.sites.values()
+    assert site[0] == 8000
+    assert log.stream.getvalue().count("shared") + log.suppressed == 8000
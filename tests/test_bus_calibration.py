@@ -0,0 +1,53 @@
+from config.config import BAUDRATE
+from src import dynamixel_controller
+from src.bus_calibration import BusCalibrator, load_bus_calibration, save_bus_calibration
+from src.bus_port import BusPort
+from src.bus_simulator import BusSimulator, FakePortHandler
+from src.dynamixel_controller import DynamixelController
+
+AXES = [
+    {'name': 'pan', 'id': 1, 'port': 'fake', 'limits': [0, 4000], 'role': 'horizontal'},
+    {'name': 'tilt', 'id': 2, 'port': 'fake', 'limits': [0, 4000], 'role': 'vertical'},
+]
+
+
+def test_calibration_file_round_trip(tmp_path):
+    path = str(tmp_path / 'bus_calibration.json')
+    assert load_bus_calibration(path) == {}
+    save_bus_calibration({'a': {'baudrate': 1000000}}, path)
+    save_bus_calibration({'b': {'baudrate': 57600}}, path)
+    assert load_bus_calibration(path) == {'a': {'baudrate': 1000000}, 'b': {'baudrate': 57600}}
+
+
+def test_scan_finds_motors_at_their_rate():
+    simulator = BusSimulator((1, 2), baudrate=57600, use_pty=False)
+    port = BusPort('fake', (1, 2), port_handler=FakePortHandler(simulator))
+    assert port.open(BAUDRATE)
+    try:
+        assert port.call(BusCalibrator(port).scan) == {57600: [1, 2]}
+    finally:
+        port.close()
+
+
+def test_stale_calibration_falls_back_to_the_default_rate(monkeypatch):
+    # Calibrated to 1 Mbps, but the motors were moved back to BAUDRATE since
+    simulator = BusSimulator((1, 2), baudrate=BAUDRATE, use_pty=False, initial_positions=(1000, 1100))
+    monkeypatch.setattr(dynamixel_controller, 'load_bus_calibration', lambda: {'fake': {'baudrate': 1000000}})
+    controller = DynamixelController(axes=AXES, port_handler=FakePortHandler(simulator))
+    try:
+        assert controller.initialize()
+        assert controller.ports[0].baudrate == BAUDRATE
+        assert controller.read_present_positions() == {0: 1000, 1: 1100}
+    finally:
+        controller.cleanup()
+
+
+def test_stale_calibration_scans_other_rates(monkeypatch):
+    simulator = BusSimulator((1, 2), baudrate=57600, use_pty=False, initial_positions=(1000, 1100))
+    monkeypatch.setattr(dynamixel_controller, 'load_bus_calibration', lambda: {'fake': {'baudrate': 1000000}})
+    controller = DynamixelController(axes=AXES, port_handler=FakePortHandler(simulator))
+    try:
+        assert controller.initialize()
+        assert controller.ports[0].baudrate == 57600
+    finally:
+        controller.cleanup()
@@ -0,0 +1,251 @@
+import threading
+
+import pytest
+from serial import SerialException
+
+from config.config import DXL_ID_1, DXL_ID_2, dxl_limit_points_1, dxl_limit_points_2
+from src.bus_port import (
+    BusPort, BusWorker, PRIORITY_BACKGROUND, PRIORITY_CONTROL, PRIORITY_EMERGENCY, PRIORITY_NORMAL,
+)
+from src.bus_simulator import (
+    ADDR_GOAL_VELOCITY, INST_SYNC_WRITE, BusSimulator, FakePortHandler,
+)
+from src.dynamixel_controller import DynamixelController
+from src.input_handler import InputHandler
+
+
+class SyncWriteFailingPortHandler(FakePortHandler):
+    """Fake port whose sync write packets never make it onto the bus"""
+    def writePort(self, packet):
+        if packet[7] == INST_SYNC_WRITE:
+            return 0
+        return super().writePort(packet)
+
+
+class UnopenablePortHandler(FakePortHandler):
+    """Fake port whose adapter is missing"""
+    def openPort(self):
+        return False
+
+
+class DisconnectedPortHandler(FakePortHandler):
+    def openPort(self):
+        raise SerialException("could not open port")
+
+
+def open_port(simulator, dxl_ids=(1, 2), port_handler=None, **kwargs):
+    port = BusPort('fake', dxl_ids, port_handler=port_handler or FakePortHandler(simulator), **kwargs)
+    assert port.open(simulator.baudrate)
+    return port
+
+
+def goal_velocity(simulator, dxl_id):
+    return simulator.motors[dxl_id].read_value(ADDR_GOAL_VELOCITY, 4, signed=True)
+
+
+@pytest.fixture
+def simulator():
+    return BusSimulator((1, 2), use_pty=False, initial_positions=(1000, -200))
+
+
+def test_sync_read_positions(simulator):
+    port = open_port(simulator)
+    try:
+        assert port.call(port.read_present_positions) == {1: 1000, 2: -200}
+        assert port.read_failures == 0
+    finally:
+        port.close()
+
+
+def test_sync_read_includes_velocities(simulator):
+    port = open_port(simulator, read_velocities=True)
+    try:
+        for dxl_id in (1, 2):
+            assert port.call(port.start_velocity_mode, dxl_id)
+        port.call(port.set_goal_velocities, {1: 40, 2: -25})
+        port.call(port.read_present_positions)
+        assert port.present_velocities == {1: 40, 2: -25}
+    finally:
+        port.close()
+
+
+def test_sync_read_falls_back_to_per_id_reads(simulator):
+    # Motor 3 does not answer, which breaks the sync read's chain of replies
+    port = open_port(simulator, dxl_ids=(1, 2, 3))
+    try:
+        assert port.call(port.read_present_positions) == {1: 1000, 2: -200, 3: None}
+        assert port.read_failures == 1
+    finally:
+        port.close()
+
+
+def test_sync_write_velocities(simulator):
+    port = open_port(simulator)
+    try:
+        port.call(port.set_goal_velocities, {1: 50, 2: -30})
+        assert (goal_velocity(simulator, 1), goal_velocity(simulator, 2)) == (50, -30)
+        assert port.last_velocities == {1: 50, 2: -30}
+    finally:
+        port.close()
+
+
+def test_sync_write_falls_back_to_per_id_writes(simulator):
+    port = open_port(simulator, port_handler=SyncWriteFailingPortHandler(simulator))
+    try:
+        port.call(port.set_goal_velocities, {1: 50, 2: -30})
+        assert (goal_velocity(simulator, 1), goal_velocity(simulator, 2)) == (50, -30)
+        assert port.last_velocities == {1: 50, 2: -30}
+    finally:
+        port.close()
+
+
+def test_unchanged_goal_velocities_are_not_written_again(simulator):
+    port = open_port(simulator)
+    try:
+        port.queue_goal_velocities({1: 10, 2: 10})
+        port.call(lambda: None)
+        writes = simulator.stats['rx_packets']
+        port.queue_goal_velocities({1: 10, 2: 10})
+        port.call(lambda: None)
+        assert simulator.stats['rx_packets'] == writes
+        assert port.writes_suppressed == 2
+    finally:
+        port.close()
+
+
+def test_worker_runs_by_priority_then_fifo():
+    worker = BusWorker('test')
+    order = []
+    worker.submit(order.append, 'normal 1', priority=PRIORITY_NORMAL)
+    worker.submit(order.append, 'background', priority=PRIORITY_BACKGROUND)
+    worker.submit(order.append, 'control', priority=PRIORITY_CONTROL)
+    worker.submit(order.append, 'normal 2', priority=PRIORITY_NORMAL)
+    worker.submit(order.append, 'emergency', priority=PRIORITY_EMERGENCY)
+    worker.start()
+    worker.stop()
+    assert order == ['emergency', 'control', 'normal 1', 'normal 2', 'background']
+    assert worker.executed == 5
+
+
+def test_worker_coalesces_by_key():
+    worker = BusWorker('test')
+    calls = []
+    first = worker.submit(calls.append, 1, key='goal', future=True)
+    second = worker.submit(calls.append, 2, key='goal', future=True)
+    worker.submit(calls.append, 'other', key='other')
+    worker.start()
+    worker.stop()
+    # Latest work runs once, in the first command's queue position; both callers get its result
+    assert calls == [2, 'other']
+    assert worker.coalesced == 1
+    assert first.done() and second.done()
+    # After it ran, the key queues a new command again
+    worker.start()
+    worker.submit(calls.append, 3, key='goal', future=True).result(timeout=1.0)
+    worker.stop()
+    assert calls == [2, 'other', 3]
+
+
+def test_worker_discard_and_errors():
+    worker = BusWorker('test')
+    errors = []
+    worker.on_error = errors.append
+    discarded = worker.submit(lambda: 1, key='goal', future=True)
+    worker.discard('goal')
+    failed = worker.submit(lambda: 1 / 0, future=True)
+    worker.start()
+    worker.stop()
+    assert discarded.cancelled()
+    with pytest.raises(ZeroDivisionError):
+        failed.result()
+    assert len(errors) == 1
+
+
+def test_worker_call_waits_for_result():
+    worker = BusWorker('test')
+    assert worker.call(threading.current_thread) is threading.current_thread()  # not started: inline
+    worker.start()
+    try:
+        assert worker.call(threading.current_thread) is worker.thread
+    finally:
+        worker.stop()
+
+
+def test_out_of_bounds_stop_is_published_through_the_mailbox():
+    simulator = BusSimulator((DXL_ID_1, DXL_ID_2), use_pty=False,
+                             initial_positions=(sum(dxl_limit_points_1) / 2, sum(dxl_limit_points_2) / 2))
+    controller = DynamixelController(port_handler=FakePortHandler(simulator))
+    input_handler = InputHandler()
+    try:
+        assert controller.initialize()
+        input_handler._set_speeds(20, 10)
+        version = input_handler.setpoints.version
+        simulator.set_motor_position(DXL_ID_1, dxl_limit_points_1[1] + 100)
+        controller.check_bounds_and_stop(input_handler)
+        new_version, _, horizontal, vertical, _, _ = input_handler.setpoints.read()
+        assert new_version > version
+        assert (horizontal, vertical) == (0, 0)
+        assert (input_handler.horizontal_speed, input_handler.vertical_speed) == (0, 0)
+    finally:
+        controller.cleanup()
+        input_handler.setpoints.close()
+
+
+def cleanup_finishes(controller, timeout=2.0):
+    thread = threading.Thread(target=controller.cleanup, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+@pytest.mark.parametrize('port_handler_class', [UnopenablePortHandler, DisconnectedPortHandler])
+def test_cleanup_after_failed_open(simulator, port_handler_class):
+    controller = DynamixelController(port_handler=port_handler_class(simulator))
+    try:
+        assert not controller.initialize()
+    except SerialException:
+        pass
+    assert cleanup_finishes(controller)
+
+
+def test_cleanup_when_only_one_port_failed_to_open(simulator):
+    axes = [
+        {'name': 'pan', 'id': 1, 'port': 'a', 'limits': [0, 4000], 'role': 'horizontal'},
+        {'name': 'tilt', 'id': 2, 'port': 'b', 'limits': [0, 4000], 'role': 'vertical'},
+    ]
+    # Port a opens on the simulator, port b's adapter is missing
+    controller = DynamixelController(axes=axes, port_handler={
+        'a': FakePortHandler(simulator), 'b': UnopenablePortHandler(simulator),
+    })
+    assert not controller.initialize()
+    assert controller.ports[0].worker.running and not controller.ports[1].worker.running
+    controller.set_goal_velocities({0: 30})
+    assert cleanup_finishes(controller)
+    assert goal_velocity(simulator, 1) == 0
+
+
+def test_heads_on_separate_ports_may_reuse_ids():
+    heads = {name: BusSimulator((1, 2), use_pty=False, initial_positions=positions)
+             for name, positions in (('a', (1000, 1100)), ('b', (3000, 3100)))}
+    axes = [{'name': f'{role}_{name}', 'id': dxl_id, 'port': name, 'limits': [0, 4000], 'role': role}
+            for name in heads for dxl_id, role in ((1, 'horizontal'), (2, 'vertical'))]
+    controller = DynamixelController(axes=axes, port_handler={
+        name: FakePortHandler(simulator) for name, simulator in heads.items()
+    })
+    try:
+        assert controller.initialize()
+        assert controller.read_present_positions() == {0: 1000, 1: 1100, 2: 3000, 3: 3100}
+        controller.set_goal_velocities({0: 10, 1: 20, 2: 30, 3: 40}, None)
+        for port in controller.ports:
+            port.call(lambda: None)
+        assert [goal_velocity(heads[name], dxl_id) for name in heads for dxl_id in (1, 2)] == [10, 20, 30, 40]
+        with pytest.raises(ValueError):
+            controller.read_present_position(1)
+    finally:
+        controller.cleanup()
+
+
+def test_duplicate_id_on_one_port_is_rejected():
+    axes = [{'name': name, 'id': 1, 'port': 'a', 'limits': [0, 4000], 'role': None} for name in ('zoom', 'focus')]
+    with pytest.raises(ValueError):
+        DynamixelController(axes=axes)
@@ -0,0 +1,32 @@
+import pytest
+
+from config.config import POSITION_UNIT_DEG
+from src.camera_calibration import CameraCalibration
+
+
+def test_center_needs_no_move_and_edges_span_the_field_of_view():
+    calibration = CameraCalibration(640, 480, hfov_deg=60.0, vfov_deg=40.0, distortion_k1=0.0)
+    assert calibration.offsets(320, 240) == (0, 0)
+    pan, tilt = calibration.offsets(0, 480)
+    # Left edge: pan left (positive) by half the field of view; bottom edge: tilt down
+    assert pan * POSITION_UNIT_DEG == pytest.approx(30.0, abs=POSITION_UNIT_DEG)
+    assert tilt * POSITION_UNIT_DEG == pytest.approx(20.0, abs=POSITION_UNIT_DEG)
+    assert calibration.offsets(640, 0) == (-pan, -tilt)
+
+
+def test_out_of_frame_pixels_are_clamped():
+    calibration = CameraCalibration(640, 480)
+    assert calibration.offsets(-50, 1000) == calibration.offsets(0, 480)
+
+
+def test_barrel_distortion_shrinks_edge_offsets():
+    plain = CameraCalibration(640, 480, hfov_deg=60.0, distortion_k1=0.0)
+    barrel = CameraCalibration(640, 480, hfov_deg=60.0, distortion_k1=-0.1)
+    assert abs(barrel.offsets(0, 240)[0]) < abs(plain.offsets(0, 240)[0])
+
+
+def test_rebuild_follows_the_resolution():
+    calibration = CameraCalibration(640, 480)
+    calibration.rebuild(1280, 720)
+    assert calibration.offsets(640, 360) == (0, 0)
+    assert len(calibration.pan_offsets) == 1281
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from src.frame_sequencer import FrameSequencer
+
+NETWORK_DELAY_S = 0.02
+
+
+def stream(camera_fps, seconds=10.0, jitter_s=0.005, hiccup=None, seed=1):
+    """(arrival time, FRAME, capture time) of a camera stream, in arrival order"""
+    rng = random.Random(seed)
+    arrivals = []
+    for frame in range(int(camera_fps * seconds)):
+        capture = 100.0 + frame / camera_fps
+        arrival = capture + NETWORK_DELAY_S + rng.random() * jitter_s
+        if hiccup is not None and hiccup[0] <= arrival < hiccup[1]:
+            # Held back in the network, then delivered as one burst
+            arrival = hiccup[1] + rng.random() * 0.002
+        arrivals.append((arrival, frame, capture))
+    arrivals.sort()
+    return arrivals
+
+
+def run(sequencer, arrivals):
+    return [(arrival, frame, capture) for arrival, frame, capture in arrivals
+            if sequencer.accept(0, frame, now=arrival)]
+
+
+@pytest.mark.parametrize('camera_fps', [15, 25, 28, 30, 33, 40])
+def test_camera_rate_mismatch_accepts_every_frame(camera_fps):
+    sequencer = FrameSequencer(frame_rate=30, max_age_s=0.1)
+    arrivals = stream(camera_fps)
+    assert len(run(sequencer, arrivals)) == len(arrivals)
+    assert sequencer.late == 0
+
+
+@pytest.mark.parametrize('camera_fps', [25, 30])
+def test_burst_after_hiccup_drops_stale_frames(camera_fps):
+    sequencer = FrameSequencer(frame_rate=30, max_age_s=0.1)
+    accepted = run(sequencer, stream(camera_fps, hiccup=(103.0, 104.0)))
+    assert sequencer.late + sequencer.out_of_order > 0
+    assert sequencer.reseeds == 0
+    # Nothing acted on was held back by more than max_age_s
+    assert max(arrival - capture - NETWORK_DELAY_S for arrival, _, capture in accepted) < 0.1
+    # Tracking continues after the burst
+    assert accepted[-1][1] == int(camera_fps * 10) - 1
+
+
+def test_lasting_latency_increase_reseeds():
+    sequencer = FrameSequencer(frame_rate=30, max_age_s=0.1)
+    arrivals = [(arrival + 0.3 if arrival > 104.0 else arrival, frame, capture)
+                for arrival, frame, capture in stream(30)]
+    accepted = run(sequencer, arrivals)
+    assert sequencer.reseeds == 1
+    assert sequencer.late < 30
+    assert accepted[-1][1] == 299
+
+
+def test_duplicates_and_out_of_order():
+    sequencer = FrameSequencer(frame_rate=30)
+    assert sequencer.accept(1, 10, now=1.0)
+    assert not sequencer.accept(1, 10, now=1.01)
+    assert sequencer.accept(1, 12, now=1.07)
+    assert not sequencer.accept(1, 11, now=1.08)
+    assert sequencer.duplicates == 1
+    assert sequencer.out_of_order == 1
+    assert sequencer.gaps == 1 and sequencer.missing == 1
+
+
+def test_vision_server_restart():
+    sequencer = FrameSequencer(frame_rate=30)
+    for frame in range(1000, 1030):
+        assert sequencer.accept(0, frame, now=frame / 30)
+    # FRAME counter starts over: a large backward jump is a restart, not reordering
+    assert sequencer.accept(0, 0, now=1030 / 30)
+    assert sequencer.accept(0, 1, now=1031 / 30)
+    assert sequencer.restarts == 1
+    # A small backward jump after a long silence is a restart as well
+    assert sequencer.accept(0, 0, now=1031 / 30 + 2.0)
+    assert sequencer.restarts == 2
+
+
+def test_targets_are_independent():
+    sequencer = FrameSequencer(frame_rate=30)
+    assert sequencer.accept(1, 50, now=1.0)
+    assert sequencer.accept(2, 7, now=1.0)
+    assert sequencer.accept(1, 51, now=1.033)
+    assert sequencer.accept(2, 8, now=1.033)
+    assert sequencer.accept(None, 3, now=1.04)
+
+
+def test_colliding_ids_keep_their_own_slots():
+    # 3 and 19 used to share slot 3 of a 16-slot table and restarted each other
+    sequencer = FrameSequencer(max_targets=16)
+    for frame in range(20):
+        now = 1.0 + frame / 30
+        assert sequencer.accept(3, frame, now=now)
+        assert sequencer.accept(19, frame, now=now)
+    assert sequencer.restarts == 0
+
+
+def test_limits_follow_the_constructor_frame_rate():
+    # 200 frames back spans 13 s of a 15 fps camera (a restart) but under 7 s at 30 fps
+    slow = FrameSequencer(frame_rate=15)
+    fast = FrameSequencer(frame_rate=30)
+    assert slow.restart_gap == 150 and fast.restart_gap == 300
+    for sequencer in (slow, fast):
+        assert sequencer.accept(0, 1000, now=1.0)
+        sequencer.accept(0, 800, now=1.1)
+    assert slow.restarts == 1 and slow.out_of_order == 0
+    assert fast.restarts == 0 and fast.out_of_order == 1
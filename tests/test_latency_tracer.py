@@ -0,0 +1,56 @@
+import pytest
+
+from config.config import DXL_ID_1, DXL_ID_2
+from src import input_handler as input_handler_module
+from src import udp_protocol
+from src.input_handler import InputHandler
+from src.latency_tracer import LatencyHistogram, LatencyTracer
+from src.pid_tuner import MultiAxisPID
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    tracer = LatencyTracer(slots=64, enabled=True)
+    monkeypatch.setattr(input_handler_module, 'tracer', tracer)
+    return tracer
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.record(value * 1000)
+    assert histogram.total == 1000
+    assert histogram.percentile(50) == pytest.approx(500000, rel=0.05)
+    assert histogram.percentile(99) == pytest.approx(990000, rel=0.05)
+    assert histogram.max_value == 1000000
+
+
+def test_frame_is_traced_through_every_stage():
+    tracer = LatencyTracer(slots=64, enabled=True)
+    tracer.receive()
+    tracer.parsed(7)
+    tracer.setpoint(7)
+    assert tracer.take_published() == 7
+    tracer.bus_start(7)
+    tracer.bus_done(7)
+    # A second bus reporting the same frame does not count it again
+    tracer.bus_done(7)
+    report = tracer.report()
+    assert report['frames'] == 1
+    assert all(report[name]['count'] == 1 for name in ('receive->parsed', 'parsed->setpoint', 'receive->bus_done'))
+
+
+def test_pid_tick_traces_the_setpoint_of_a_new_frame(tracer):
+    handler = InputHandler()
+    handler.mode = "AUTO"
+    handler.pid = MultiAxisPID((DXL_ID_1, DXL_ID_2))
+    handler.pid.set_gains(DXL_ID_1, kp=1.0, ki=1.0, kd=0.0)
+    handler.on_udp_message(udp_protocol.pack_coords(0, handler.camera_width - 10, handler.camera_height // 2, 5))
+    # The frame only updates the PID error; the tick publishes the setpoint
+    assert tracer.take_published() is None
+    handler.update_auto_control(0.01)
+    assert handler.setpoints.version > 0
+    assert tracer.take_published() == 5
+    # The integral keeps the speed changing, but that is no longer frame 5's latency
+    handler.update_auto_control(0.01)
+    assert tracer.take_published() is None
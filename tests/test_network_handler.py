@@ -0,0 +1,62 @@
+from config.config import UDP_IP
+from src import udp_protocol
+from src.input_handler import InputHandler
+from src.network_handler import NetworkHandler
+
+
+class FakeSocket:
+    """Non-blocking UDP socket stand-in: queued datagrams in, sent datagrams recorded"""
+    def __init__(self, datagrams=()):
+        self.datagrams = list(datagrams)
+        self.sent = []
+
+    def recvfrom(self, size):
+        if not self.datagrams:
+            raise BlockingIOError
+        return self.datagrams.pop(0), (UDP_IP, 8081)
+
+    def sendto(self, data, *args):
+        self.sent.append(bytes(data))
+
+    def close(self):
+        pass
+
+
+def make_handler(*datagrams):
+    input_handler = InputHandler()
+    input_handler.mode = "AUTO"
+    network_handler = NetworkHandler(input_handler)
+    network_handler.sock.close()
+    network_handler.sock = FakeSocket(datagrams)
+    network_handler.connected = True
+    return network_handler
+
+
+def test_binary_is_accepted_only_after_the_server_acknowledges():
+    network_handler = make_handler(udp_protocol.pack_coords(0, 10, 20, 1))
+    try:
+        network_handler._udp_listener()
+        assert network_handler.datagrams_rejected == 1
+        assert network_handler.input_handler.last_frame is None
+        network_handler.sock.datagrams = [udp_protocol.PROTOCOL_ACK, udp_protocol.pack_coords(0, 10, 20, 2)]
+        network_handler._udp_listener()
+        assert network_handler.binary_protocol
+        assert network_handler.input_handler.last_frame == 2
+        # Text is accepted either way
+        network_handler.sock.datagrams = [b"SELECTED_COORDS:ID:0:X:10:Y:20:FRAME:3"]
+        network_handler._udp_listener()
+        assert network_handler.input_handler.last_frame == 3
+    finally:
+        network_handler.input_handler.setpoints.close()
+
+
+def test_binary_status_waits_for_the_acknowledgement():
+    network_handler = make_handler()
+    try:
+        status = b'\xa5\x01\x05'
+        assert not network_handler.send_binary_status(status)
+        network_handler.binary_protocol = True
+        assert network_handler.send_binary_status(status)
+        assert network_handler.sock.sent == [status]
+    finally:
+        network_handler.input_handler.setpoints.close()
@@ -0,0 +1,65 @@
+import pytest
+
+from src.pid_presets import DEFAULT_PRESETS, PIDPresets
+from src.pid_tuner import CameraAxisPlant, MultiAxisPID, PIDAutoTuner, PIDController
+
+
+def test_output_and_integral_are_limited():
+    pid = PIDController(kp=1.0, ki=10.0, output_limit=30.0)
+    for _ in range(100):
+        output = pid.update(100.0, 0.01)
+    assert output == 30.0
+    # Anti-windup: the integral did not grow while saturated, so the output recovers at once
+    assert pid.integral <= 30.0
+    assert pid.update(-20.0, 0.01) < 30.0
+
+
+def test_slew_rate_limits_output_steps():
+    pid = PIDController(kp=1.0, output_limit=100.0, slew_rate=100.0)
+    assert pid.update(50.0, 0.01) == pytest.approx(1.0)
+    assert pid.update(50.0, 0.01) == pytest.approx(2.0)
+
+
+def test_multi_axis_gains_per_motor():
+    pid = MultiAxisPID((1, 2), kp=1.0)
+    pid.set_gains(2, kp=2.0)
+    assert pid.update({1: 5.0, 2: 5.0}, 0.01) == {1: 5.0, 2: 10.0}
+    pid.reset()
+    assert pid[1].output == 0.0
+
+
+def test_auto_tuner_settles_a_simulated_axis():
+    tuner = PIDAutoTuner(CameraAxisPlant(degrees_per_pixel=62.2 / 640, delay_s=0.05))
+    report = tuner.tune()
+    assert report['gains']['kp'] > 0
+    assert report['settling_time_s'] is not None
+    assert abs(report['final_error_px']) < 10.0
+
+
+def test_plant_identified_from_a_recording():
+    plant = CameraAxisPlant(degrees_per_pixel=0.1, motor_time_constant=0.0, delay_s=0.0, frame_rate=100)
+    times, commands, errors = [], [], []
+    for i in range(200):
+        command = 10.0 if (i // 50) % 2 == 0 else -10.0
+        times.append(i * 0.01)
+        commands.append(command)
+        errors.append(plant.step(command, 0.01))
+    fitted = CameraAxisPlant.from_recording(times, commands, errors, frame_rate=100)
+    assert fitted.degrees_per_pixel == pytest.approx(0.1, rel=0.1)
+
+
+def test_presets_file_overrides_and_adds(tmp_path):
+    path = str(tmp_path / 'pid_presets.json')
+    presets = PIDPresets(path)
+    presets.set_preset('default', kp=0.5)
+    presets.set_preset('tuned', kp=0.7, unknown=1.0)
+    presets.save()
+
+    loaded = PIDPresets(path)
+    assert loaded.get_preset('default')['kp'] == 0.5
+    assert loaded.get_preset('tuned') == dict(DEFAULT_PRESETS['default'], kp=0.7)
+    pid = MultiAxisPID((1, 2))
+    loaded.apply_preset('tuned', pid, motor_id=2)
+    assert (pid[1].kp, pid[2].kp) == (0.0, 0.7)
+    with pytest.raises(KeyError):
+        loaded.get_preset('missing')
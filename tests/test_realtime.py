@@ -0,0 +1,25 @@
+import gc
+
+from src.realtime import RealtimeMode, pin_thread
+
+
+def test_unpermitted_steps_are_skipped():
+    # Core 1000 does not exist and SCHED_FIFO needs privileges the tests may not have
+    assert pin_thread(None, {1000}, None, "test") is False
+
+
+def test_gc_is_scheduled_while_active_and_restored_on_stop():
+    realtime = RealtimeMode(control_cores=None, network_cores=None, control_priority=None,
+                            network_priority=None, gc_interval_s=0.0)
+    assert gc.isenabled()
+    realtime.start()
+    try:
+        assert not gc.isenabled()
+        realtime.collect_if_due()
+        realtime.collect_if_due()
+        assert realtime.stats()['gc_collections'] == 2
+    finally:
+        realtime.stop()
+    assert gc.isenabled()
+    assert gc.get_freeze_count() == 0
+    assert not realtime.memory_locked
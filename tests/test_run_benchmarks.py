@@ -0,0 +1,37 @@
+import json
+
+from benchmarks.run_benchmarks import DEFAULT_BASELINE, compare, run_all
+from src.async_logger import logger
+
+
+def results(meta=None, **values):
+    units = {'loop_rate': 'hz'}
+    return {'meta': meta or {'machine': 'x86_64', 'python': '3.11', 'quick': True},
+            'results': {name: {'value': value, 'unit': units.get(name, 'ns')} for name, value in values.items()}}
+
+
+def test_regressions_follow_the_unit_direction():
+    baseline = results(parse=100.0, loop_rate=1000.0, read=50.0)
+    lines, regressions = compare(results(parse=120.0, loop_rate=850.0, read=40.0, new=1.0), baseline, 0.1)
+    assert regressions == ['parse', 'loop_rate']
+    assert any(line.startswith('new') and line.endswith('new') for line in lines)
+    assert not any(line.startswith('Note') for line in lines)
+
+
+def test_mismatched_baseline_is_noted():
+    lines, _ = compare(results(parse=100.0), results({'machine': 'aarch64', 'quick': False}, parse=100.0), 0.1)
+    assert lines[0].startswith('Note:')
+
+
+def test_committed_baseline_covers_every_benchmark():
+    with open(DEFAULT_BASELINE) as f:
+        baseline = json.load(f)
+    assert baseline['meta']['quick']
+    level = logger.level
+    logger.set_level('WARNING')
+    try:
+        current = run_all(quick=True)
+    finally:
+        logger.set_level(level)
+    assert set(current['results']) == set(baseline['results'])
+    assert all(result['unit'] == baseline['results'][name]['unit'] for name, result in current['results'].items())
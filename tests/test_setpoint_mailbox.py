@@ -0,0 +1,97 @@
+import os
+import threading
+
+from src.input_handler import InputHandler
+from src.setpoint_mailbox import OFFSETS, SPEEDS, SetpointMailbox
+
+
+def test_every_publication_gets_a_new_version():
+    mailbox = SetpointMailbox()
+    assert mailbox.read() == (0, SPEEDS, 0, 0, 0, 0)
+    mailbox.publish_speeds(10, -5)
+    assert mailbox.read() == (1, SPEEDS, 10, -5, 0, 0)
+    # Publishing the same values again is still a new setpoint
+    mailbox.publish_speeds(10, -5)
+    assert mailbox.version == 2
+
+
+def test_publishing_one_pair_carries_the_other():
+    mailbox = SetpointMailbox()
+    mailbox.publish_speeds(10, -5)
+    mailbox.publish_offsets(100, -40)
+    assert mailbox.read() == (2, OFFSETS, 10, -5, 100, -40)
+    mailbox.publish_speeds(0, 0)
+    assert mailbox.read() == (3, SPEEDS, 0, 0, 100, -40)
+
+
+def test_setpoint_published_while_acting_is_not_lost():
+    mailbox = SetpointMailbox()
+    mailbox.publish_speeds(1, 1)
+    acted_on, *_ = mailbox.read()
+    # Published after the reader took its copy, before it finished acting on it;
+    # clearing a change flag at this point would have swallowed it
+    mailbox.publish_speeds(2, 2)
+    version, _, horizontal, vertical, _, _ = mailbox.read()
+    assert version != acted_on
+    assert (horizontal, vertical) == (2, 2)
+
+
+def test_concurrent_reads_are_never_torn():
+    mailbox = SetpointMailbox()
+    stop = threading.Event()
+    torn = []
+
+    def write():
+        value = 0
+        while not stop.is_set():
+            value += 1
+            mailbox.publish_speeds(value, -value)
+
+    def read():
+        last_version = 0
+        for _ in range(20000):
+            version, _, horizontal, vertical, _, _ = mailbox.read()
+            if horizontal != -vertical or version < last_version:
+                torn.append((version, horizontal, vertical))
+            last_version = version
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        read()
+    finally:
+        stop.set()
+        writer.join()
+    assert not torn
+
+
+def test_shared_memory_attach():
+    name = f"setpoints_test_{os.getpid()}"
+    owner = SetpointMailbox(name)
+    try:
+        reader = SetpointMailbox(name, create=False)
+        try:
+            owner.publish_offsets(7, 8)
+            assert reader.read() == (1, OFFSETS, 0, 0, 7, 8)
+        finally:
+            reader.close()
+    finally:
+        owner.close()
+
+
+def test_auto_speeds_are_published_under_the_write_lock():
+    input_handler = InputHandler()
+    try:
+        # A keyboard step in progress holds the lock; the UDP thread's update must wait for it
+        with input_handler.setpoints.write_lock:
+            thread = threading.Thread(target=input_handler._center_object, args=(0, 0))
+            thread.start()
+            thread.join(0.1)
+            assert thread.is_alive()
+            assert (input_handler.horizontal_speed, input_handler.vertical_speed) == (0, 0)
+        thread.join()
+        _, _, horizontal, vertical, _, _ = input_handler.setpoints.read()
+        assert horizontal > 0 and vertical < 0
+        assert (input_handler.horizontal_speed, input_handler.vertical_speed) == (horizontal, vertical)
+    finally:
+        input_handler.setpoints.close()
@@ -0,0 +1,48 @@
+from src import udp_protocol
+from src.status_uplink import StatusUplink
+
+
+class Controller:
+    bound_exceeded = [0, 0]
+    recovering = [0, 0]
+    present_position = [1000, 2000]
+    present_velocity = [40000, -3]
+
+
+class Input:
+    last_frame = None
+    mode = "MANUAL"
+
+
+def test_samples_are_batched_per_datagram():
+    sent = []
+    uplink = StatusUplink(lambda data: sent.append(bytes(data)) or True, 2, rate_hz=100, max_datagram_hz=25)
+    assert uplink.batch == 4
+    for tick in range(10):
+        uplink.tick(Controller, Input, now=1.0 + tick * 0.01)
+    assert len(sent) == 2
+    uplink.flush()
+    assert [len(udp_protocol.unpack_status(data)) for data in sent] == [4, 4, 2]
+    sample = udp_protocol.unpack_status(sent[0])[0]
+    assert sample['frame'] is None and sample['mode'] == "MANUAL"
+    # Velocities saturate to the 16-bit field
+    assert sample['velocity'] == [32767, -3]
+
+
+def test_ticks_between_samples_are_skipped():
+    sent = []
+    uplink = StatusUplink(lambda data: sent.append(bytes(data)) or True, 2, rate_hz=10, max_datagram_hz=10)
+    for tick in range(10):
+        uplink.tick(Controller, Input, now=1.0 + tick * 0.01)
+    assert uplink.samples == 1
+    # After a stall it resumes from now instead of sending a burst of catch-up samples
+    for tick in range(5):
+        uplink.tick(Controller, Input, now=10.0 + tick * 0.01)
+    assert uplink.samples == 2
+
+
+def test_failed_sends_are_counted_as_dropped():
+    uplink = StatusUplink(lambda data: False, 2, rate_hz=10, max_datagram_hz=10)
+    uplink.tick(Controller, Input, now=1.0)
+    assert uplink.stats()['datagrams_dropped'] == 1
+    assert uplink.stats()['datagrams_sent'] == 0
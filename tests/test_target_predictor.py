@@ -0,0 +1,32 @@
+import pytest
+
+from src.target_predictor import TargetPredictor
+
+
+def test_constant_velocity_is_learned_from_the_frame_counter():
+    predictor = TargetPredictor(latency_s=0.1, frame_rate=30)
+    for frame in range(60):
+        x, y, vx, vy = predictor.update(0, 100 + 3 * frame, 200, frame)
+    assert vx == pytest.approx(90.0, rel=0.02)
+    assert vy == pytest.approx(0.0, abs=1e-6)
+    # Extrapolated by the latency: 100 + 3 * 59 + 90 * 0.1
+    assert x == pytest.approx(286.0, abs=1.0)
+
+
+def test_long_gap_restarts_the_filter():
+    predictor = TargetPredictor(frame_rate=30)
+    for frame in range(30):
+        predictor.update(0, 100 + 3 * frame, 200, frame)
+    assert predictor.update(0, 500, 200, 1000)[2] == 0.0
+    # Out-of-order frames restart it as well
+    assert predictor.update(0, 400, 200, 999)[2] == 0.0
+
+
+def test_colliding_ids_keep_their_own_slots():
+    # 3 and 19 used to share slot 3 of a 16-slot table and reset each other's filter
+    predictor = TargetPredictor(max_targets=16)
+    for frame in range(20):
+        predictor.update(3, 100 + 3 * frame, 300, frame)
+        predictor.update(19, 500, 300, frame)
+    assert predictor.update(3, 160, 300, 20)[2] == pytest.approx(90.0, rel=0.05)
+    assert predictor.update(19, 500, 300, 20)[2] == pytest.approx(0.0, abs=1e-6)
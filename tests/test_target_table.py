@@ -0,0 +1,129 @@
+import pytest
+
+from src import udp_protocol
+from src.input_handler import InputHandler
+from src.network_handler import NetworkHandler
+from src.target_slots import TargetSlots
+from src.target_table import TargetTable
+
+FRAME_S = 1 / 30
+
+
+def stream(table, reports, frames=20, start=1.0):
+    """Feed every (target_id, x, y, size, confidence) once per frame; returns the followed ID per frame"""
+    followed = []
+    for frame in range(frames):
+        now = start + frame * FRAME_S
+        for target_id, x, y, size, confidence in reports:
+            table.update(target_id, x, y, frame, size, confidence, now=now)
+        followed.append(table.selected_id)
+    return followed
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        TargetTable('biggest')
+
+
+def test_locked_policy_stays_on_first_target():
+    table = TargetTable('locked')
+    followed = stream(table, [(tid, 100 * tid, 300, 0, 0.0) for tid in range(8)])
+    assert set(followed) == {0}
+    assert table.switches == 1
+
+
+@pytest.mark.parametrize('policy, expected', [('nearest', 1), ('largest', 2), ('confident', 0)])
+def test_policies(policy, expected):
+    table = TargetTable(policy)
+    table.set_center(400, 300)
+    followed = stream(table, [(0, 100, 300, 100, 0.9), (1, 395, 300, 400, 0.5), (2, 600, 300, 900, 0.4)])
+    assert followed[-1] == expected
+
+
+def test_switch_margin_prevents_thrashing():
+    table = TargetTable('nearest', switch_margin=0.2)
+    table.set_center(400, 300)
+    for frame in range(40):
+        now = 1.0 + frame * FRAME_S
+        table.update(1, 410, 300, frame, now=now)
+        # Alternates between slightly nearer and slightly farther than target 1
+        table.update(2, 391 if frame % 2 else 412, 300, frame, now=now)
+    assert table.switches == 1
+    assert table.selected_id == 1
+
+
+def test_colliding_ids_keep_their_own_slots():
+    # 3 and 19 used to share slot 3 of a 16-slot table
+    table = TargetTable('locked', max_targets=16)
+    followed = stream(table, [(3, 100, 300, 0, 0.0), (19, 500, 300, 0, 0.0)])
+    assert set(followed) == {3}
+    assert table.switches == 1
+    assert table.stats()['evictions'] == 0
+    assert table.state(19, now=1.0 + 19 * FRAME_S)[:2] == (500, 300)
+
+
+def test_full_table_only_evicts_stale_targets():
+    table = TargetTable('locked', max_targets=4, max_age_s=0.5)
+    for target_id in range(4):
+        table.update(target_id, 0, 0, now=1.0)
+    assert not table.update(9, 0, 0, now=1.1)
+    assert table.overflows == 1
+    assert table.state(9, now=1.1) is None
+    # Once the others are stale, the newcomer gets a slot and the selection
+    assert table.update(9, 0, 0, now=2.0)
+    assert table.selected_id == 9
+    assert table.stats()['evictions'] == 1
+
+
+def test_lock_overrides_policy_until_lost():
+    table = TargetTable('nearest', max_age_s=0.5)
+    table.set_center(400, 300)
+    stream(table, [(1, 400, 300, 0, 0.0), (5, 700, 300, 0, 0.0)])
+    table.lock(5)
+    table.lock_time = 0.0
+    assert table.update(5, 700, 300, now=2.0)
+    assert not table.update(1, 400, 300, now=2.01)
+    # Target 5 is no longer reported: the policy takes over again
+    assert table.update(1, 400, 300, now=2.6)
+    assert table.locked_id is None
+    assert table.selected_id == 1
+
+
+def test_velocity_from_frame_counter():
+    table = TargetTable('locked')
+    for frame in range(10):
+        table.update(0, 100 + 3 * frame, 200, frame, now=1.0 + frame * 0.05)
+    x, y, vx, vy, age = table.state(0, now=1.5)
+    assert x == 127
+    assert vx == pytest.approx(90.0, rel=0.01)
+    assert vy == 0.0
+
+
+def test_slots_reuse_longest_unused():
+    slots = TargetSlots(2)
+    assert slots.add(7, now=1.0) == 0
+    assert slots.add(8, now=2.0) == 1
+    slots.touch(0, now=3.0)
+    assert slots.add(9, now=4.0) == 1
+    assert slots.get(8) is None and slots.get(9) == 1
+    assert slots.add(10, now=4.5, min_idle_s=2.0) is None
+
+
+def test_object_selected_locks_and_is_not_coalesced():
+    input_handler = InputHandler()
+    input_handler.mode = "AUTO"
+    network_handler = NetworkHandler(input_handler)
+    try:
+        assert network_handler._coalesce_key(b"OBJECT_SELECTED:ID:4:X:10:Y:20:FRAME:1") is None
+        assert network_handler._coalesce_key(b"SELECTED_COORDS:ID:4:X:10:Y:20:FRAME:2") == b'4'
+        detection = udp_protocol.pack_detection(4, 10, 20, 3, 40, 60, 87)
+        assert network_handler._coalesce_key(detection) == detection[3:5]
+        input_handler.on_udp_message(b"SELECTED_COORDS:ID:1:X:400:Y:300:FRAME:1")
+        input_handler.on_udp_message(b"OBJECT_SELECTED:ID:4:X:10:Y:20:FRAME:1")
+        assert input_handler.targets.locked_id == 4
+        assert input_handler.targets.selected_id == 4
+        input_handler.on_udp_message(udp_protocol.pack_touch_miss())
+        assert input_handler.targets.locked_id is None
+    finally:
+        network_handler.sock.close()
+        input_handler.setpoints.close()
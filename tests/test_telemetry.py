@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from src.bus_simulator import BusSimulator, FakePortHandler
+from src.dynamixel_controller import DynamixelController
+from src.input_handler import InputHandler
+from src.telemetry import NO_FRAME, TelemetryRecorder, load_telemetry, telemetry
+
+THREE_AXES = [
+    {'name': 'pan', 'id': 1, 'port': 'fake', 'limits': [0, 4000], 'role': 'horizontal'},
+    {'name': 'tilt', 'id': 2, 'port': 'fake', 'limits': [0, 4000], 'role': 'vertical'},
+    {'name': 'zoom', 'id': 3, 'port': 'fake', 'limits': [0, 4000], 'role': None},
+]
+
+
+def run_ticks(controller, input_handler, ticks):
+    for _ in range(ticks):
+        controller.check_bounds_and_stop(input_handler)
+        controller.update_motor_speeds(input_handler)
+
+
+@pytest.fixture
+def three_axis_rig():
+    simulator = BusSimulator((1, 2, 3), use_pty=False, initial_positions=(2000, 1500, 1000))
+    controller = DynamixelController(axes=THREE_AXES, port_handler=FakePortHandler(simulator))
+    input_handler = InputHandler()
+    yield controller, input_handler
+    controller.cleanup()
+    input_handler.setpoints.close()
+
+
+def test_ring_buffer_wraps_oldest_first():
+    recorder = TelemetryRecorder(n_axes=2, capacity=4, enabled=True)
+    for tick in range(6):
+        recorder.target(tick, -tick, tick + 100)
+        recorder.begin_tick([tick, 2 * tick])
+        recorder.end_tick([10 * tick, -10 * tick], "AUTO")
+    data = recorder.snapshot()
+    assert list(data['position'][:, 0]) == [2, 3, 4, 5]
+    assert list(data['velocity'][:, 1]) == [-20, -30, -40, -50]
+    assert list(data['frame']) == [102, 103, 104, 105]
+
+
+def test_resize_and_memory_mapped_recording(tmp_path):
+    path = str(tmp_path / 'telemetry.npy')
+    recorder = TelemetryRecorder(n_axes=2, capacity=8, enabled=False)
+    recorder.open(path)
+    recorder.resize(3)
+    recorder.begin_tick([1, 2, 3])
+    recorder.end_tick([0, 0, 0], "MANUAL", goal_positions=[4, 5, 6])
+    recorder.close()
+    data = load_telemetry(path)
+    assert data['position'].shape == (1, 3)
+    assert list(data['goal_position'][0]) == [4, 5, 6]
+    assert data['frame'][0] == NO_FRAME
+
+
+def test_controller_sizes_telemetry_for_its_axes(three_axis_rig):
+    controller, input_handler = three_axis_rig
+    assert controller.initialize()
+    assert telemetry.n_axes == 3
+    input_handler._set_speeds(20, -10)
+    run_ticks(controller, input_handler, 5)
+    i = telemetry.index - 1
+    # The motors are moving, so compare against the positions the tick read
+    assert list(telemetry.buffer['position'][i]) == list(controller.present_position)
+    assert list(telemetry.buffer['velocity'][i]) == [20, -10, 0]
+
+
+def test_position_tracking_records_goal_positions(three_axis_rig):
+    controller, input_handler = three_axis_rig
+    controller.position_tracking = True
+    assert controller.initialize()
+    input_handler.setpoints.publish_offsets(100, -50)
+    run_ticks(controller, input_handler, 2)
+    row = telemetry.buffer[telemetry.index - 1]
+    assert list(row['goal_position']) == [2100, 1450, 1000]
+    assert not np.any(row['velocity'])
@@ -0,0 +1,51 @@
+import pytest
+
+from src import udp_protocol
+from src.status_uplink import StatusUplink
+
+
+class Controller:
+    def __init__(self, n_axes):
+        self.bound_exceeded = [0] * n_axes
+        self.recovering = [0] * n_axes
+        self.present_position = list(range(100, 100 + n_axes))
+        self.present_velocity = [-5] * n_axes
+
+
+class Input:
+    last_frame = 42
+    mode = "AUTO"
+
+
+def test_binary_messages_are_recognized():
+    assert udp_protocol.is_binary(udp_protocol.pack_coords(1, 2, 3, 4))
+    assert not udp_protocol.is_binary(b"SELECTED_COORDS:ID:0:X:273:Y:306:FRAME:388")
+
+
+def test_detection_layout():
+    data = udp_protocol.pack_detection(7, -10, 300, 123456, 40, 60, 87)
+    assert len(data) == udp_protocol.DETECTION.size
+    assert udp_protocol.DETECTION.unpack(data)[2:] == (udp_protocol.MSG_DETECTION, 7, -10, 300, 123456, 40, 60, 87)
+    # The detection extends the coordinate layout, so the target fields sit at the same offsets
+    assert data[3:udp_protocol.COORDS.size] == udp_protocol.pack_coords(7, -10, 300, 123456)[3:]
+
+
+@pytest.mark.parametrize('n_axes', [2, 8, 9, 12, 16])
+def test_status_flags_cover_every_axis(n_axes):
+    controller = Controller(n_axes)
+    controller.bound_exceeded[n_axes - 1] = 1
+    controller.recovering[1] = 1
+    sent = []
+    uplink = StatusUplink(lambda data: sent.append(bytes(data)) or True, n_axes, rate_hz=10, max_datagram_hz=10)
+    uplink.tick(controller, Input, now=1.0)
+    [sample] = udp_protocol.unpack_status(sent[0])
+    assert sample['bound_flags'] == (1 << (n_axes - 1)) | 0b10
+    assert sample['position'] == controller.present_position
+    assert sample['velocity'] == controller.present_velocity
+    assert (sample['frame'], sample['mode']) == (42, "AUTO")
+
+
+def test_status_sample_size_unchanged_up_to_eight_axes():
+    # time, frame, mode, one flag byte, then i32 position and i16 velocity per axis
+    assert udp_protocol.status_sample(2).size == 4 + 4 + 1 + 1 + 2 * 6
+    assert udp_protocol.status_sample(9).size == 4 + 4 + 1 + 2 + 9 * 6